@@ -1,259 +1,805 @@
 import os
 import subprocess
+import threading
+import time
 import tkinter as tk
 from tkinter import ttk
 from datetime import datetime
-import time
+
+from git_automation import core
+from git_automation.autocommit import AutoCommitter, PushCoalescer
+from git_automation.batch import FAILED, format_results, run_batch, select_repos
+from git_automation.branches import describe_branch
+from git_automation.clones import CLONED, PROFILES, RESUMED, CloneQueue
+from git_automation.daemon import SKIPPED_UNCHANGED, SyncDaemon, SyncPolicies
+from git_automation.dashboard import Dashboard
+from git_automation.discovery import DEFAULT_INDEX_PATH, cached_repos
+from git_automation.executor import JobExecutor
+from git_automation.gitcmd import GitCancelled, format_progress
+from git_automation.logsink import LogSink
+from git_automation.maintenance import format_maintenance, improved, run_maintenance
+from git_automation.mirrors import MirrorCache
+from git_automation.picker import SearchPicker
+from git_automation.pipeline import STAGING_TARGETED, commit_and_push, describe_error, publish_to_branches
+from git_automation.refs import read_head
+from git_automation.search import SearchIndex, load_recent, save_recent
+from git_automation.status import entry_category, format_entry, iter_status, refresh_paths
+from git_automation.virtual_list import VirtualList
+from git_automation.watcher import RepoWatcher
+
+# Base path for repositories
+base_path = "C:/Users/shsa0222/Desktop/DevOps"  # Change this to your base path
+
+FILE_FILTERS = ["all", "modified", "added", "deleted", "renamed", "untracked", "conflicted"]
+FILE_SORT_KEYS = {
+    "path": lambda e: e.path,
+    "status": lambda e: (e.xy, e.path),
+}
+PROGRESS_INTERVAL_MS = 100
 
 
 def log_message(message, status="INFO"):
-    """Logs a message with a timestamp and status to the side panel."""
+    """Logs a message with a timestamp and status to the side panel. Safe to call from any thread."""
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    log_text.insert(tk.END, f"[{timestamp}] [{status}] {message}\n")
-    log_text.see(tk.END)  # Auto-scroll
+    log_sink.write(f"[{timestamp}] [{status}] {message}")
 
 
-def calculate_combobox_width(items):
-    """Calculate the appropriate width for the combobox based on the longest item."""
-    max_item_length = max(len(item) for item in items) if items else 20  # Default to 20 if empty
-    return max_item_length + 2  # Add padding for readability
+def get_git_repos(base_path, on_repos=None):
+    """Returns a list of Git repository directories from the base path."""
+    return core.get_git_repos(base_path, index_path=DEFAULT_INDEX_PATH, on_repos=on_repos)
 
 
-def get_git_repos(base_path):
-    """Returns a list of Git repository directories from the base path."""
-    repos = []
-    for root, dirs, files in os.walk(base_path):
-        if '.git' in dirs:  # Check if it's a git repository
-            repos.append(root)  # Add the full path of the repository
-    return repos
+def repo_search_key(repo_path):
+    """Repositories are searched by their path below the base path."""
+    return os.path.relpath(repo_path, base_path)
+
+
+def scan_repos():
+    """Shows last session's repositories, then streams a fresh scan into the picker. Runs in the background."""
+    start_time = time.monotonic()
+    # The search index over the cached list is built here rather than on the Tk thread
+    executor.post(repo_picker.set_index, SearchIndex(cached_repos(DEFAULT_INDEX_PATH, base_path), repo_search_key))
+    repos = get_git_repos(base_path, on_repos=lambda found: executor.post(add_repos, found))
+    return repos, time.monotonic() - start_time
+
+
+def add_repos(found):
+    """Adds repositories found by the running scan to the repository picker."""
+    repo_picker.add_items(found)
+
+
+def on_scan_done(future):
+    """Installs the finished scan, which also drops cached repositories that no longer exist."""
+    repo_label.config(text="Select Repository:")
+    try:
+        repos, seconds = future.result()
+    except OSError as e:
+        log_message(f"Error scanning {base_path}: {e}", "ERROR")
+        return
+    repo_picker.sync_items(repos)
+    log_message(f"Found {len(repos)} repositories in {seconds:.2f}s.")
 
 
 def get_branches(repo_path):
     """Returns a list of branches in the selected Git repository."""
     try:
-        result = subprocess.run(
-            ["git", "branch", "--list"],
-            cwd=repo_path,
-            capture_output=True,
-            text=True
-        )
-        branches = result.stdout.strip().split("\n")
-        branches = [branch.strip().replace("* ", "") for branch in branches]
-        return branches
-    except subprocess.CalledProcessError as e:
+        return core.get_branches(repo_path)
+    except (OSError, ValueError, subprocess.CalledProcessError) as e:
         log_message(f"Error fetching branches: {e}", "ERROR")
         return []
 
 
 def get_modified_files(repo_path):
-    """Gets the list of modified files in the selected Git repository."""
+    """Gets the list of modified files (StatusEntry records) in the selected Git repository."""
     try:
-        result = subprocess.run(
-            ["git", "status", "--short"],
-            cwd=repo_path,
-            capture_output=True,
-            text=True
-        )
-        files = result.stdout.strip().split("\n")
-        return [f.strip() for f in files if f]  # Filter out empty lines
-    except subprocess.CalledProcessError as e:
-        log_message(f"Error fetching modified files: {e}", "ERROR")
+        return core.get_modified_files(repo_path)
+    except (OSError, subprocess.CalledProcessError) as e:
+        log_message(f"Error fetching modified files: {describe_error(e)}", "ERROR")
         return []
 
 
+def render_modified_files():
+    """Hands the selected repository's modified_entries to the virtual list; only the visible rows are drawn."""
+    file_list.set_items(modified_entries.get(repo_var.get(), {}).values())
+    update_file_count()
+
+
+def update_file_count():
+    """Shows how many modified files are listed and how many match the filter."""
+    shown, total = file_list.counts()
+    count = f"{total}" if shown == total else f"{shown} of {total}"
+    file_list_label.config(text=f"Modified Files ({count}):")
+
+
+def apply_file_view(event=None):
+    """Applies the status filter and sort order chosen for the modified files list."""
+    category = file_filter_var.get()
+    file_list.set_filter(None if category == "all" else lambda e: entry_category(e) == category)
+    file_list.set_sort(FILE_SORT_KEYS[file_sort_var.get()])
+    update_file_count()
+
+
 def refresh_modified_files():
-    """Refresh the list of modified files displayed."""
+    """Refreshes the list of modified files in the background."""
     selected_repo = repo_var.get()
     if not os.path.isdir(selected_repo):
         log_message("Invalid repository path.", "ERROR")
         return
+    executor.submit(get_modified_files, selected_repo,
+                    on_done=lambda future: on_modified_files(selected_repo, future))
 
-    modified_files = get_modified_files(selected_repo)
 
-    # Clear the text area and update with new files
-    file_list_text.delete("1.0", tk.END)
-    if modified_files:
-        for file in modified_files:
-            file_list_text.insert(tk.END, f"{file}\n")
-    else:
-        file_list_text.insert(tk.END, "No modified files found.\n")
+def on_modified_files(repo_path, future):
+    """Shows a finished status query if its repository is still selected."""
+    global modified_entries
+    if repo_var.get() != repo_path:
+        return
+    modified_entries = {repo_path: {entry.path: entry for entry in future.result()}}  # get_modified_files logs errors
+    render_modified_files()
     log_message("Modified files list refreshed.", "INFO")
 
 
+def on_watched_change(repo_path, changed_paths):
+    """Watcher thread: re-queries status for the changed paths and hands the result to the GUI."""
+    entries = modified_entries.get(repo_path)  # Snapshot; only the GUI thread rebinds it
+    try:
+        if changed_paths is None or entries is None:  # Nothing to merge into until a full status arrived
+            updated = {e.path: e for e in iter_status(repo_path, optional_locks=False)}
+        else:
+            updated = refresh_paths(repo_path, entries, changed_paths, optional_locks=False)
+    except (OSError, subprocess.CalledProcessError) as e:
+        log_message(f"Error fetching modified files: {describe_error(e)}", "ERROR")
+        return
+    executor.post(apply_watched_entries, repo_path, updated)
+
+
+def apply_watched_entries(repo_path, entries):
+    """Shows status computed by the watcher if the repository is still selected."""
+    global modified_entries
+    if watcher is None or watcher.repo_path != repo_path:
+        return
+    modified_entries = {repo_path: entries}
+    render_modified_files()
+
+
+def replace_watcher(old, new):
+    """Background job: stops old and starts new (RepoWatcher or AutoCommitter; either may be None).
+
+    Both can take a while: start lists ignored files and registers a watch on
+    every directory, stop waits for a running status query.
+    """
+    if old is not None:
+        old.stop()
+    if new is not None:
+        new.start()
+
+
+def restart_watcher():
+    """Watches the selected repository while Live Updates is enabled."""
+    global watcher
+    old, watcher = watcher, None
+    selected_repo = repo_var.get()
+    if live_var.get() and os.path.isdir(selected_repo):
+        watcher = RepoWatcher(selected_repo, lambda paths: on_watched_change(selected_repo, paths), log=log_message)
+    new = watcher
+    watch_executor.submit(replace_watcher, old, new, on_done=lambda future: on_watcher_started(new, future))
+
+
+def on_watcher_started(new, future):
+    """Reports a watcher started by restart_watcher."""
+    global watcher
+    try:
+        future.result()
+    except (OSError, ValueError) as e:
+        if watcher is new:
+            watcher = None
+        log_message(f"Could not watch repository: {e}", "ERROR")
+        return
+    if new is not None and watcher is new:
+        log_message(f"Watching {new.repo_path} for changes ({new.backend_name}).", "INFO")
+
+
+def restart_auto_commit():
+    """Auto-commits the selected repository in coalesced bursts while Auto-Commit is enabled."""
+    global auto_committer
+    old, auto_committer = auto_committer, None
+    selected_repo = repo_var.get()
+    if auto_commit_var.get() and os.path.isdir(selected_repo):
+        commit_message = commit_msg_text.get("1.0", tk.END).strip()
+        try:
+            checked_out, _ = read_head(selected_repo)
+        except OSError:
+            checked_out = None
+        # Commits land on the checkout, so push its branch rather than the one picked in the dropdown
+        auto_committer = AutoCommitter(
+            selected_repo, checked_out or "HEAD", commit_message=commit_message or None,
+            coalescer=push_coalescer, log=log_message,
+            on_commit=lambda committed: committed and executor.post(refresh_modified_files)
+        )
+    new = auto_committer
+    watch_executor.submit(replace_watcher, old, new, on_done=lambda future: on_auto_commit_started(old, new, future))
+
+
+def on_auto_commit_started(old, new, future):
+    """Reports the auto-committer swapped by restart_auto_commit."""
+    global auto_committer
+    if old is not None:
+        log_message(f"Auto-commit stopped: {old.summary()}.")
+    try:
+        future.result()
+    except (OSError, ValueError) as e:
+        if auto_committer is new:
+            auto_committer = None
+        log_message(f"Could not start auto-commit: {e}", "ERROR")
+
+
+def default_branch(repo_path, branches):
+    """Returns the checked-out branch; "main" or the first branch only on a detached HEAD.
+
+    Any other branch is published to with plumbing, so it must be picked explicitly.
+    """
+    try:
+        checked_out, _ = read_head(repo_path)
+    except OSError:
+        checked_out = None
+    if checked_out is not None:
+        return checked_out
+    if "main" in branches:
+        return "main"
+    return branches[0] if branches else ""
+
+
 def update_branch_dropdown(event):
     """Update branch dropdown based on repository selection."""
     selected_repo = repo_var.get()
+    branches = (get_branches(selected_repo) or []) if os.path.isdir(selected_repo) else []
+    # Usable right away; on_branch_metadata reorders it by recent activity once the metadata is in
+    branch_picker.set_items(branches)
     if os.path.isdir(selected_repo):
-        branches = get_branches(selected_repo)
-        branch_dropdown["values"] = branches
-        if branches:
-            branch_var.set("main" if "main" in branches else branches[0])
-            branch_dropdown.config(state="readonly")
-        else:
-            branch_var.set("")
-            branch_dropdown["values"] = []
+        branch_var.set(default_branch(selected_repo, branches))
         refresh_modified_files()  # Refresh modified files for the new repository
     else:
         branch_var.set("")
-        branch_dropdown["values"] = []
-
+    branch_details.clear()
+    branch_info_var.set("")
+    if os.path.isdir(selected_repo):
+        executor.submit(index_branches, selected_repo,
+                        on_done=lambda future: on_branch_metadata(selected_repo, future))
+    restart_watcher()
+    restart_auto_commit()
 
-def generate_and_push():
-    """Stages, commits, and pushes changes to the selected branch of the repository."""
-    try:
-        # Disable the button
-        button.config(state=tk.DISABLED)
 
-        # Clear the log
-        log_text.delete("1.0", tk.END)
+def index_branches(repo_path):
+    """Returns the repository's BranchInfo records, most recent first, and a SearchIndex over their names."""
+    branches = core.get_branch_metadata(repo_path, False)
+    return branches, SearchIndex(branch.name for branch in branches)
 
-        # Get the selected repository and branch
-        selected_repo = repo_var.get()
-        branch = branch_var.get()
 
-        if not os.path.isdir(selected_repo):
-            raise Exception(f"The selected path '{selected_repo}' is not valid.")
+def on_branch_metadata(repo_path, future):
+    """Fills the branch picker, ordered by recent activity, once the branch metadata is in."""
+    if repo_var.get() != repo_path:
+        return  # Another repository was selected meanwhile
+    try:
+        branches, index = future.result()
+    except (OSError, ValueError, subprocess.CalledProcessError) as e:
+        log_message(f"Error fetching branch details: {describe_error(e)}", "ERROR")
+        return  # The picker keeps the unordered list update_branch_dropdown seeded it with
+    branch_details.clear()
+    branch_details.update((branch.name, branch) for branch in branches)
+    branch_picker.set_index(index)
+    show_branch_info()
+
+
+def show_branch_info(event=None):
+    """Shows the selected branch's upstream, divergence and last commit date."""
+    branch = branch_details.get(branch_var.get())
+    if branch is None:
+        branch_info_var.set("")
+        return
+    date = datetime.fromtimestamp(branch.date).strftime("%Y-%m-%d %H:%M") if branch.date else "unknown"
+    branch_info_var.set(f"{describe_branch(branch)} (last commit {date})")
 
-        log_message(f"Selected repository path: {selected_repo}")
-        log_message(f"Target branch: {branch}")
 
-        # Get the commit message
-        commit_message = commit_msg_text.get("1.0", tk.END).strip()
-        if not commit_message:  # Use default message if none provided
-            commit_message = "Automatic commit: Updated repository"
+def generate_and_push():
+    """Stages, commits, and pushes changes to the selected branch in the background."""
+    # Disable the button
+    button.config(state=tk.DISABLED)
 
-        log_message("Process started.")
-        start_time = time.time()
+    # Clear the log
+    log_sink.clear()
 
-        # Stage all changes
-        log_message("Staging all changes in the repository...")
-        subprocess.run(["git", "add", "."], cwd=selected_repo, check=True)
-        log_message("All changes staged successfully.", "SUCCESS")
+    # Get the selected repository, branch and commit message
+    selected_repo = repo_var.get()
+    branch = branch_var.get()
+    commit_message = commit_msg_text.get("1.0", tk.END).strip()
 
-        # Check if there are any changes to commit
-        check_status = subprocess.run(
-            ["git", "diff", "--cached", "--exit-code"], cwd=selected_repo, capture_output=True
-        )
+    if not os.path.isdir(selected_repo):
+        log_message(f"An error occurred: The selected path '{selected_repo}' is not valid.", "ERROR")
+        button.config(state=tk.NORMAL)
+        return
+    try:
+        checked_out, _ = read_head(selected_repo)
+    except (OSError, ValueError) as e:
+        log_message(f"An error occurred: {e}", "ERROR")
+        button.config(state=tk.NORMAL)
+        return
 
-        if check_status.returncode == 0:
-            log_message("No changes to commit. Exiting.", "INFO")
-            log_message("Process completed successfully.", "SUCCESS")
-            return  # No changes to commit, exit early
-
-        # Commit the changes
-        log_message(f"Committing changes with message: '{commit_message}'...")
-        subprocess.run(
-            ["git", "commit", "-m", commit_message],
-            cwd=selected_repo,
-            check=True
+    # Registered only once nothing can fail before on_push_done releases the job
+    cancel = start_network_job()
+    stream = {"cancel": cancel, "on_progress": lambda progress: set_latest_progress(selected_repo, progress)}
+    branches = [branch] + [b for b in extra_branches_var.get().split() if b != branch]
+    if len(branches) > 1 or branch != checked_out:
+        # Commit onto branches that are not checked out with plumbing, then push them all at once
+        executor.submit(
+            publish_to_branches, selected_repo, branches, commit_message,
+            log=log_message, stream=stream, on_done=on_push_done
         )
-        log_message(f"Changes committed with message: '{commit_message}'", "SUCCESS")
+        return
+    executor.submit(
+        commit_and_push, selected_repo, branch, commit_message,
+        log=log_message, staging=STAGING_TARGETED, fast=fast_var.get(), stream=stream, on_done=on_push_done
+    )
 
-        # Push the changes
-        log_message(f"Pushing changes to branch: {branch}...")
-        subprocess.run(["git", "push", "origin", branch], cwd=selected_repo, check=True)
-        log_message(f"Changes pushed to branch '{branch}' successfully!", "SUCCESS")
 
-        elapsed_time = time.time() - start_time
-        log_message(f"Process completed successfully in {elapsed_time:.2f} seconds!", "SUCCESS")
+def on_push_done(future):
+    """Reports the outcome of a generate_and_push job and re-enables the button."""
+    try:
+        future.result()
+    except GitCancelled:
+        log_message("Push cancelled. The commit is kept locally and will go out with the next push.", "WARNING")
+    except subprocess.TimeoutExpired as e:
+        log_message(f"Push timed out: {e}", "ERROR")
     except subprocess.CalledProcessError as e:
-        log_message(f"Git operation failed: {e}", "ERROR")
+        log_message(f"Git operation failed: {describe_error(e)}", "ERROR")
     except Exception as e:
         log_message(f"An error occurred: {e}", "ERROR")
     finally:
+        finish_network_job()
         # Re-enable the button
         button.config(state=tk.NORMAL)
 
 
-def clone_repository():
-    """Clones a GitHub repository into the base path."""
+def start_network_job():
+    """Registers a running push or clone and returns the cancel Event shared by all of them."""
+    global network_jobs, cancel_event
+    if network_jobs == 0:
+        cancel_event = threading.Event()
+        progress_bar["value"] = 0
+        progress_var.set("Starting...")
+        cancel_button.config(state=tk.NORMAL)
+        root.after(PROGRESS_INTERVAL_MS, show_progress)
+    network_jobs += 1
+    return cancel_event
+
+
+def finish_network_job():
+    """Unregisters a push or clone; resets the progress display when none are left."""
+    global network_jobs
+    network_jobs -= 1
+    if network_jobs == 0:
+        cancel_button.config(state=tk.DISABLED)
+        progress_var.set("")
+        progress_bar["value"] = 0
+        latest_progress.clear()
+
+
+def set_latest_progress(label, progress):
+    """Records a transfer's newest progress; called from git reader threads."""
+    latest_progress["current"] = (label, progress)
+
+
+def show_progress():
+    """Shows the most recent transfer progress while network jobs are running."""
+    if network_jobs == 0:
+        return
+    current = latest_progress.get("current")
+    if current is not None:
+        label, progress = current
+        progress_bar["value"] = progress.percent
+        progress_var.set(f"{os.path.basename(label.rstrip('/'))}: {format_progress(progress)}")
+    root.after(PROGRESS_INTERVAL_MS, show_progress)
+
+
+def cancel_network_jobs():
+    """Stops every running push and clone; partial clones are removed, local commits are kept."""
+    cancel_event.set()
+    progress_var.set("Cancelling...")
+    cancel_button.config(state=tk.DISABLED)
+
+
+def run_batch_job(repos, selection, commit_message):
+    """Background job: selects repositories and runs the pipeline on each of them."""
+    targets = select_repos(repos, selection)
+    log_message(f"Batch started on {len(targets)} of {len(repos)} repositories ('{selection}').")
+
+    def report(result):
+        status = "ERROR" if result.outcome == FAILED else "INFO"
+        log_message(f"{result.repo}: {result.outcome} ({result.duration:.2f}s)", status)
+
+    return run_batch(targets, commit_message, on_result=report)
+
+
+def batch_generate_and_push():
+    """Runs Generate and Push on every repository matching the batch selection."""
+    selection = batch_var.get().strip() or "all"
+    commit_message = commit_msg_text.get("1.0", tk.END).strip()
+    batch_button.config(state=tk.DISABLED)
+    executor.submit(
+        run_batch_job, repo_picker.items(), selection, commit_message,
+        on_done=on_batch_done
+    )
+
+
+def on_batch_done(future):
+    """Logs the per-repository result table of a batch run."""
     try:
-        repo_url = clone_url_text.get("1.0", tk.END).strip()
-        if not repo_url:
-            log_message("Please enter a valid GitHub repository URL.", "ERROR")
-            return
-
-        # Clone the repository into the base path
-        log_message(f"Cloning repository from {repo_url} into {base_path}...")
-        subprocess.run(["git", "clone", repo_url], cwd=base_path, check=True)
-        log_message(f"Repository cloned successfully from {repo_url}!", "SUCCESS")
-
-        # Refresh the repository dropdown with the new repo
-        new_repos = get_git_repos(base_path)
-        repo_dropdown["values"] = new_repos
-        log_message("Repository list updated.", "INFO")
-    except subprocess.CalledProcessError as e:
-        log_message(f"Git clone operation failed: {e}", "ERROR")
+        results = future.result()
+        failed = sum(1 for r in results if r.outcome == FAILED)
+        log_message("Batch results:\n" + format_results(results), "ERROR" if failed else "SUCCESS")
     except Exception as e:
-        log_message(f"An error occurred while cloning: {e}", "ERROR")
+        log_message(f"An error occurred during the batch run: {e}", "ERROR")
+    finally:
+        batch_button.config(state=tk.NORMAL)
 
 
-# GUI setup
-root = tk.Tk()
-root.title("Git Automation Tool")
+def clone_repository():
+    """Clones every GitHub repository URL entered (one per line) into the base path."""
+    repo_urls = clone_url_text.get("1.0", tk.END).split()
+    if not repo_urls:
+        log_message("Please enter a valid GitHub repository URL.", "ERROR")
+        return
 
-# Base path for repositories
-base_path = "C:/Users/shsa0222/Desktop/DevOps"  # Change this to your base path
+    clone_button.config(state=tk.DISABLED)
+    mirror_cache = MirrorCache() if clone_mirror_var.get() else None
+    queue = CloneQueue(base_path, index_path=DEFAULT_INDEX_PATH, log=log_message, mirror_cache=mirror_cache,
+                       cancel=start_network_job())
+    sparse_patterns = clone_sparse_var.get().split()
+    executor.submit(queue.run, repo_urls, clone_profile_var.get(), sparse_patterns,
+                    on_progress=set_latest_progress, on_done=on_clone_done)
 
-# Repository selection frame
-repo_frame = tk.Frame(root)
-repo_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=10, pady=10)
 
-repo_label = tk.Label(repo_frame, text="Select Repository:")
-repo_label.pack(pady=5)
+def on_clone_done(future):
+    """Reports the outcome of a clone job and adds the new repositories to the dropdown."""
+    try:
+        results = future.result()
+        new_repos = [r.path for r in results if r.outcome in (CLONED, RESUMED)]
+        if clone_mirror_var.get():
+            stats = MirrorCache().stats()
+            log_message(f"Mirror cache hit rate {stats['hit_rate']:.0%} ({stats['hits']} hits, {stats['misses']} misses).")
+        if new_repos:
+            add_repos(new_repos)
+            log_message("Repository list updated.", "INFO")
+    except Exception as e:
+        log_message(f"An error occurred while cloning: {e}", "ERROR")
+    finally:
+        finish_network_job()
+        clone_button.config(state=tk.NORMAL)
+
 
-repo_var = tk.StringVar()
-repo_dropdown = ttk.Combobox(repo_frame, textvariable=repo_var, state="readonly")
-repos = get_git_repos(base_path)
-repo_dropdown["values"] = repos
-repo_dropdown["width"] = calculate_combobox_width(repos)
-repo_dropdown.pack(pady=5)
-repo_dropdown.bind("<<ComboboxSelected>>", update_branch_dropdown)
+def toggle_auto_sync():
+    """Starts or stops the background auto-sync of every repository under the base path."""
+    global sync_daemon
+    if auto_sync_var.get():
+        sync_daemon = SyncDaemon(base_path, SyncPolicies.load(), log=log_message, on_result=report_sync,
+                                 index_path=DEFAULT_INDEX_PATH)
+        sync_daemon.start()
+    elif sync_daemon is not None:
+        sync_daemon.stop(wait=False)
+        sync_daemon = None
 
-branch_label = tk.Label(repo_frame, text="Select Branch:")
-branch_label.pack(pady=5)
 
-branch_var = tk.StringVar()
-branch_dropdown = ttk.Combobox(repo_frame, textvariable=branch_var, state="readonly")
-branch_dropdown.pack(pady=5)
+def report_sync(result):
+    """Logs auto-sync cycles that did something; called from worker threads."""
+    if result.outcome != SKIPPED_UNCHANGED:
+        status = "ERROR" if result.outcome == FAILED else "INFO"
+        log_message(f"Auto-sync {result.repo}: {result.outcome} ({result.duration:.2f}s)", status)
 
-commit_msg_label = tk.Label(repo_frame, text="Commit Message:")
-commit_msg_label.pack(pady=5)
 
-commit_msg_text = tk.Text(repo_frame, height=3, width=40)
-commit_msg_text.pack(pady=5)
+def run_repo_maintenance():
+    """Packs refs and objects and writes commit-graphs in every repository, in the background."""
+    repos = repo_picker.items()
+    maintenance_button.config(state=tk.DISABLED)
+    log_message(f"Maintenance started on {len(repos)} repositories.")
 
-button = tk.Button(repo_frame, text="Generate and Push", command=generate_and_push)
-button.pack(pady=10)
+    def report(result):
+        if not result.error:
+            log_message(f"{result.repo}: maintained in {result.duration:.2f}s"
+                        f"{' (faster)' if improved(result) else ''}.")
 
-# Modified Files Section
-file_list_label = tk.Label(repo_frame, text="Modified Files:")
-file_list_label.pack(pady=5)
+    executor.submit(run_maintenance, repos, log=log_message, on_result=report, on_done=on_maintenance_done)
 
-file_list_text = tk.Text(repo_frame, height=10, width=40)
-file_list_text.pack(pady=5)
 
-refresh_button = tk.Button(repo_frame, text="Refresh Modified Files", command=refresh_modified_files)
-refresh_button.pack(pady=5)
+def on_maintenance_done(future):
+    """Logs the before/after latency table of a maintenance run."""
+    try:
+        results = future.result()
+        failed = any(r.error for r in results)
+        log_message("Maintenance results:\n" + format_maintenance(results), "ERROR" if failed else "SUCCESS")
+    except Exception as e:
+        log_message(f"An error occurred during maintenance: {e}", "ERROR")
+    finally:
+        maintenance_button.config(state=tk.NORMAL)
+
+
+def open_dashboard():
+    """Opens (or raises) the all-repositories dashboard window and refreshes it."""
+    global dashboard_window, dashboard_tree
+    if dashboard_window is None:
+        dashboard_window = tk.Toplevel(root)
+        dashboard_window.title("Repository Dashboard")
+        dashboard_window.protocol("WM_DELETE_WINDOW", close_dashboard)
+
+        columns = ("branch", "dirty", "ahead", "behind")
+        dashboard_tree = ttk.Treeview(dashboard_window, columns=columns, height=20)
+        dashboard_tree.heading("#0", text="Repository")
+        dashboard_tree.column("#0", width=400)
+        for column in columns:
+            dashboard_tree.heading(column, text=column.capitalize())
+            dashboard_tree.column(column, width=120 if column == "branch" else 60, anchor=tk.E)
+        dashboard_tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        refresh_dashboard_button = tk.Button(dashboard_window, text="Full Refresh",
+                                             command=lambda: refresh_dashboard(force=True))
+        refresh_dashboard_button.pack(pady=5)
+    else:
+        dashboard_window.lift()
+    refresh_dashboard()
+
 
-# Git Clone Section
-clone_label = tk.Label(repo_frame, text="Clone GitHub Repository:")
-clone_label.pack(pady=5)
+def close_dashboard():
+    """Closes the dashboard window; cached repository states are kept."""
+    global dashboard_window, dashboard_tree
+    dashboard_window.destroy()
+    dashboard_window = dashboard_tree = None
 
-clone_url_text = tk.Text(repo_frame, height=2, width=40)
-clone_url_text.pack(pady=5)
 
-clone_button = tk.Button(repo_frame, text="Clone Repository", command=clone_repository)
-clone_button.pack(pady=10)
+def refresh_dashboard(force=False):
+    """Recomputes the dashboard in the background, only for repositories that changed."""
+    repos = repo_picker.items()
+    executor.submit(
+        dashboard.refresh, repos, force,
+        on_state=lambda state, changed: executor.post(show_repo_state, state),
+        on_done=on_dashboard_done
+    )
 
-# Log section
-log_frame = tk.Frame(root, relief=tk.SUNKEN, borderwidth=1)
-log_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=10, pady=10)
 
-log_label = tk.Label(log_frame, text="Logs:")
-log_label.pack(pady=5)
+def show_repo_state(state):
+    """Inserts or updates one repository's row in the dashboard."""
+    if dashboard_tree is None:
+        return
+    if state.error:
+        values = ("error", "", "", "")
+    else:
+        values = (state.branch or "(detached)", state.dirty, state.ahead, state.behind)
+    if dashboard_tree.exists(state.repo):
+        dashboard_tree.item(state.repo, values=values)
+    else:
+        dashboard_tree.insert("", tk.END, iid=state.repo, text=state.repo, values=values)
 
-log_text = tk.Text(log_frame, height=25, width=60)
-log_text.pack(pady=5)
 
-root.mainloop()
+def on_dashboard_done(future):
+    """Logs how much of the dashboard had to be recomputed."""
+    try:
+        states = future.result()
+        if dashboard_tree is not None:
+            for repo in dashboard_tree.get_children():
+                if repo not in states:
+                    dashboard_tree.delete(repo)
+        count, recomputed, seconds = dashboard.last_refresh
+        log_message(f"Dashboard refreshed: {recomputed} of {count} repositories recomputed in {seconds:.2f} seconds.")
+    except Exception as e:
+        log_message(f"An error occurred while refreshing the dashboard: {e}", "ERROR")
+
+
+def on_close():
+    """Saves recent picks, stops running transfers, the watcher and the background executor and closes the window."""
+    cancel_event.set()
+    save_recent(repo_picker.recent, name="repos")
+    save_recent(branch_picker.recent, name="branches")
+    if sync_daemon is not None:
+        sync_daemon.stop(wait=False)
+    # Queued behind any start still pending, so no watcher is left running
+    watch_executor.submit(replace_watcher, auto_committer, None)
+    watch_executor.submit(replace_watcher, watcher, None)
+    watch_executor.shutdown(wait=True, cancel_pending=False)
+    push_coalescer.shutdown(wait=False)
+    executor.shutdown(wait=False)
+    root.destroy()
+
+
+if __name__ == "__main__":
+    # GUI setup
+    root = tk.Tk()
+    root.title("Git Automation Tool")
+    root.protocol("WM_DELETE_WINDOW", on_close)
+
+    # Background git jobs; results are delivered back on the Tk main thread
+    executor = JobExecutor()
+    # Watchers are started and stopped one at a time, in the order they were requested
+    watch_executor = JobExecutor(max_workers=1)
+
+    # Log lines are buffered and flushed to the log panel once per frame
+    log_sink = LogSink(max_lines=5000)
+
+    # Cached per-repository states for the dashboard window
+    dashboard = Dashboard()
+    dashboard_window = dashboard_tree = None
+
+    # Running pushes and clones share one cancel Event; their newest progress is shown periodically
+    network_jobs = 0
+    cancel_event = threading.Event()
+    latest_progress = {}
+
+    # Modified files of the selected repository ({repo: {path: entry}}, so a watcher never
+    # merges into another repository's status) and its live watcher
+    modified_entries = {}
+    watcher = None
+
+    # Repository selection frame
+    repo_frame = tk.Frame(root)
+    repo_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+    repo_label = tk.Label(repo_frame, text="Select Repository (scanning...):")
+    repo_label.pack(pady=5)
+
+    # Type to search; only the best matches are loaded into the dropdown. Filled by scan_repos.
+    repo_var = tk.StringVar()
+    repo_picker = SearchPicker(repo_frame, repo_var, update_branch_dropdown, key=repo_search_key,
+                               recent=load_recent(name="repos"))
+    repo_picker.pack(pady=5)
+
+    branch_label = tk.Label(repo_frame, text="Select Branch:")
+    branch_label.pack(pady=5)
+
+    branch_var = tk.StringVar()
+    branch_picker = SearchPicker(repo_frame, branch_var, show_branch_info, recent=load_recent(name="branches"))
+    branch_picker.pack(pady=5)
+
+    # Upstream and ahead/behind of the selected branch, keyed by branch name
+    branch_details = {}
+    branch_info_var = tk.StringVar()
+    branch_info_label = tk.Label(repo_frame, textvariable=branch_info_var)
+    branch_info_label.pack(pady=2)
+
+    commit_msg_label = tk.Label(repo_frame, text="Commit Message:")
+    commit_msg_label.pack(pady=5)
+
+    commit_msg_text = tk.Text(repo_frame, height=3, width=40)
+    commit_msg_text.pack(pady=5)
+
+    extra_branches_label = tk.Label(repo_frame, text="Also Publish To Branches (space-separated):")
+    extra_branches_label.pack(pady=5)
+
+    extra_branches_var = tk.StringVar()
+    extra_branches_entry = tk.Entry(repo_frame, textvariable=extra_branches_var, width=40)
+    extra_branches_entry.pack(pady=5)
+
+    fast_var = tk.BooleanVar(value=False)
+    fast_check = tk.Checkbutton(repo_frame, text="Fast Commit (no hooks, commits to selected branch)",
+                                variable=fast_var)
+    fast_check.pack(pady=5)
+
+    button = tk.Button(repo_frame, text="Generate and Push", command=generate_and_push)
+    button.pack(pady=10)
+
+    # Batch Section
+    batch_label = tk.Label(repo_frame, text="Batch Selection (all, dirty or a glob):")
+    batch_label.pack(pady=5)
+
+    batch_var = tk.StringVar(value="dirty")
+    batch_entry = tk.Entry(repo_frame, textvariable=batch_var, width=40)
+    batch_entry.pack(pady=5)
+
+    batch_button = tk.Button(repo_frame, text="Batch Generate and Push", command=batch_generate_and_push)
+    batch_button.pack(pady=5)
+
+    dashboard_button = tk.Button(repo_frame, text="Repository Dashboard", command=open_dashboard)
+    dashboard_button.pack(pady=5)
+
+    maintenance_button = tk.Button(repo_frame, text="Run Maintenance", command=run_repo_maintenance)
+    maintenance_button.pack(pady=5)
+
+    # Scheduled fetch/commit/push of every repository (policy in ~/.git_automation/sync_policy.json)
+    sync_daemon = None
+    auto_sync_var = tk.BooleanVar(value=False)
+    auto_sync_check = tk.Checkbutton(repo_frame, text="Auto-sync all repositories", variable=auto_sync_var,
+                                     command=toggle_auto_sync)
+    auto_sync_check.pack(pady=5)
+
+    # Modified Files Section
+    file_list_label = tk.Label(repo_frame, text="Modified Files:")
+    file_list_label.pack(pady=5)
+
+    file_view_frame = tk.Frame(repo_frame)
+    file_view_frame.pack(pady=5)
+
+    file_filter_var = tk.StringVar(value="all")
+    file_filter_dropdown = ttk.Combobox(
+        file_view_frame, textvariable=file_filter_var, values=FILE_FILTERS, state="readonly", width=12
+    )
+    file_filter_dropdown.pack(side=tk.LEFT, padx=5)
+    file_filter_dropdown.bind("<<ComboboxSelected>>", apply_file_view)
+
+    file_sort_var = tk.StringVar(value="path")
+    file_sort_dropdown = ttk.Combobox(
+        file_view_frame, textvariable=file_sort_var, values=list(FILE_SORT_KEYS), state="readonly", width=12
+    )
+    file_sort_dropdown.pack(side=tk.LEFT, padx=5)
+    file_sort_dropdown.bind("<<ComboboxSelected>>", apply_file_view)
+
+    file_list = VirtualList(repo_frame, height=10, width=40, formatter=format_entry,
+                            empty_text="No modified files found.")
+    file_list.set_sort(FILE_SORT_KEYS["path"])
+    file_list.pack(pady=5)
+
+    refresh_button = tk.Button(repo_frame, text="Refresh Modified Files", command=refresh_modified_files)
+    refresh_button.pack(pady=5)
+
+    live_var = tk.BooleanVar(value=False)
+    live_check = tk.Checkbutton(repo_frame, text="Live Updates", variable=live_var, command=restart_watcher)
+    live_check.pack(pady=5)
+
+    # Commits each burst of changes once it goes quiet; pushes for the same branch are merged
+    auto_committer = None
+    push_coalescer = PushCoalescer(log=log_message)
+    auto_commit_var = tk.BooleanVar(value=False)
+    auto_commit_check = tk.Checkbutton(repo_frame, text="Auto-Commit and Push Bursts", variable=auto_commit_var,
+                                       command=restart_auto_commit)
+    auto_commit_check.pack(pady=5)
+
+    # Git Clone Section
+    clone_label = tk.Label(repo_frame, text="Clone GitHub Repositories (one URL per line):")
+    clone_label.pack(pady=5)
+
+    clone_url_text = tk.Text(repo_frame, height=2, width=40)
+    clone_url_text.pack(pady=5)
+
+    clone_options_frame = tk.Frame(repo_frame)
+    clone_options_frame.pack(pady=5)
+
+    clone_profile_var = tk.StringVar(value="full")
+    clone_profile_dropdown = ttk.Combobox(
+        clone_options_frame, textvariable=clone_profile_var, values=list(PROFILES), state="readonly", width=10
+    )
+    clone_profile_dropdown.pack(side=tk.LEFT, padx=5)
+
+    clone_sparse_label = tk.Label(clone_options_frame, text="Sparse dirs:")
+    clone_sparse_label.pack(side=tk.LEFT)
+
+    clone_sparse_var = tk.StringVar()
+    clone_sparse_entry = tk.Entry(clone_options_frame, textvariable=clone_sparse_var, width=20)
+    clone_sparse_entry.pack(side=tk.LEFT, padx=5)
+
+    clone_mirror_var = tk.BooleanVar(value=False)
+    clone_mirror_check = tk.Checkbutton(repo_frame, text="Use local mirror cache", variable=clone_mirror_var)
+    clone_mirror_check.pack(pady=5)
+
+    clone_button = tk.Button(repo_frame, text="Clone Repository", command=clone_repository)
+    clone_button.pack(pady=10)
+
+    # Log section
+    log_frame = tk.Frame(root, relief=tk.SUNKEN, borderwidth=1)
+    log_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+    log_label = tk.Label(log_frame, text="Logs:")
+    log_label.pack(pady=5)
+
+    log_text = tk.Text(log_frame, height=25, width=60)
+    log_text.pack(pady=5)
+
+    progress_bar = ttk.Progressbar(log_frame, maximum=100, length=400)
+    progress_bar.pack(pady=5)
+
+    progress_var = tk.StringVar()
+    progress_label = tk.Label(log_frame, textvariable=progress_var)
+    progress_label.pack(pady=2)
+
+    cancel_button = tk.Button(log_frame, text="Cancel", command=cancel_network_jobs, state=tk.DISABLED)
+    cancel_button.pack(pady=5)
+
+    log_sink.attach(root, log_text)
+    executor.poll(root)
+    watch_executor.poll(root)
+    # Discovery runs after the window is drawn, so startup time does not grow with the workspace
+    executor.submit(scan_repos, on_done=on_scan_done)
+    root.mainloop()
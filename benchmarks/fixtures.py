@@ -0,0 +1,80 @@
+"""Synthetic multi-repository workspaces for the benchmarks.
+
+A workspace holds N working repositories spread over a deep directory tree,
+each with M branches, K modified and K untracked files, plus a local bare
+repository per working repo that serves as its push remote.
+"""
+import os
+import subprocess
+
+GIT_IDENTITY = ["-c", "user.name=Benchmark", "-c", "user.email=bench@example.invalid"]
+
+
+def _git(args, cwd, stdin=None):
+    subprocess.run(["git", *GIT_IDENTITY, *args], cwd=cwd, input=stdin, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def _tree_path(index, depth):
+    """Spreads files over a directory tree of the given depth."""
+    parts = [f"d{(index >> (2 * level)) % 4}" for level in range(depth)]
+    return os.path.join(*parts, f"file{index}.txt") if parts else f"file{index}.txt"
+
+
+def make_repo(workspace, name, group, branches=10, files=100, modified=10, untracked=10, depth=3):
+    """Creates one working repository with a bare remote and returns its path."""
+    remote = os.path.join(workspace, "remotes", f"{name}.git")
+    repo = os.path.join(workspace, "repos", f"group{group}", "nested", name)
+    os.makedirs(remote)
+    os.makedirs(repo)
+    _git(["init", "-q", "--bare", remote], workspace)
+    _git(["init", "-q", "-b", "main", repo], workspace)
+    _git(["config", "user.name", "Benchmark"], repo)
+    _git(["config", "user.email", "bench@example.invalid"], repo)
+    _git(["remote", "add", "origin", remote], repo)
+
+    for i in range(files):
+        path = os.path.join(repo, _tree_path(i, depth))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"line {i}\n")
+    _git(["add", "-A"], repo)
+    _git(["commit", "-q", "-m", "Initial commit"], repo)
+    _git(["push", "-q", "origin", "main"], repo)
+
+    # One update-ref process for all branches instead of one git branch call each
+    head = subprocess.run(["git", "rev-parse", "HEAD"], cwd=repo, capture_output=True,
+                          text=True, check=True).stdout.strip()
+    commands = "".join(f"create refs/heads/feature/b{i} {head}\n" for i in range(branches))
+    _git(["update-ref", "--stdin"], repo, stdin=commands.encode())
+
+    touch_files(repo, modified, files, depth)
+    for i in range(untracked):
+        with open(os.path.join(repo, f"untracked{i}.txt"), "w", encoding="utf-8") as f:
+            f.write("new\n")
+    return repo
+
+
+def touch_files(repo, count, files=None, depth=3, generation=0):
+    """Modifies count tracked files so the repository has something to commit."""
+    files = files or count
+    for i in range(min(count, files)):
+        with open(os.path.join(repo, _tree_path(i, depth)), "a", encoding="utf-8") as f:
+            f.write(f"change {generation}\n")
+
+
+def make_noise(workspace, dirs=200, depth=4):
+    """Adds non-repository directory trees that discovery has to walk through."""
+    for i in range(dirs):
+        path = os.path.join(workspace, "repos", "noise", *[f"n{(i >> (2 * level)) % 4}" for level in range(depth)], f"leaf{i}")
+        os.makedirs(path, exist_ok=True)
+
+
+def make_workspace(workspace, repos=20, branches=10, files=100, modified=10, untracked=10, depth=3, noise=200):
+    """Builds a complete synthetic workspace and returns the working repository paths."""
+    os.makedirs(workspace, exist_ok=True)
+    make_noise(workspace, noise, depth)
+    return [
+        make_repo(workspace, f"repo{i:04d}", i % 4, branches, files, modified, untracked, depth)
+        for i in range(repos)
+    ]
@@ -0,0 +1,199 @@
+"""Benchmarks for discovery, branch listing, status and the commit/push pipeline.
+
+Usage:
+    python benchmarks/run_benchmarks.py --repos 50 --output results.json
+    python benchmarks/run_benchmarks.py --compare results.json
+
+Builds a synthetic workspace in a temporary directory (see fixtures.py),
+times each operation, prints medians and percentiles and optionally writes
+the results as JSON and compares them with an earlier run.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import make_workspace, touch_files  # noqa: E402
+from git_automation import core, refs  # noqa: E402
+from git_automation.gitcmd import run_git  # noqa: E402
+from git_automation.pipeline import publish_to_branches  # noqa: E402
+from git_automation.plumbing import rev_parse  # noqa: E402
+from git_automation.search import SearchIndex  # noqa: E402
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of samples."""
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+def summarize(samples):
+    """Returns the statistics recorded for one benchmark, in milliseconds."""
+    ms = [s * 1000 for s in samples]
+    return {
+        "runs": len(ms),
+        "min_ms": min(ms),
+        "median_ms": statistics.median(ms),
+        "p90_ms": percentile(ms, 90),
+        "p95_ms": percentile(ms, 95),
+        "p99_ms": percentile(ms, 99),
+        "max_ms": max(ms),
+    }
+
+
+def measure(fn, repeat, setup=None):
+    """Times fn() repeat times, running the untimed setup() before each call."""
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run(args, workspace):
+    """Builds the workspace and runs every benchmark; returns {name: stats}."""
+    start = time.perf_counter()
+    repos = make_workspace(
+        workspace, args.repos, args.branches, args.files, args.modified, args.untracked, args.depth, args.noise
+    )
+    print(f"Workspace with {len(repos)} repositories built in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    base_path = os.path.join(workspace, "repos")
+    index_path = os.path.join(workspace, "repo_index.json")
+    sample_repo = repos[0]
+    results = {}
+
+    def remove_index():
+        if os.path.exists(index_path):
+            os.remove(index_path)
+
+    results["get_git_repos.cold"] = measure(
+        lambda: core.get_git_repos(base_path, index_path=index_path), args.repeat, remove_index)
+    results["get_git_repos.warm"] = measure(
+        lambda: core.get_git_repos(base_path, index_path=index_path), args.repeat)
+    results["get_branches.cold"] = measure(
+        lambda: core.get_branches(sample_repo), args.repeat, refs.clear_cache)
+    results["get_branches.warm"] = measure(lambda: core.get_branches(sample_repo), args.repeat)
+    results["get_branches.all_repos"] = measure(
+        lambda: [core.get_branches(r) for r in repos], args.repeat, refs.clear_cache)
+    results["get_modified_files"] = measure(lambda: core.get_modified_files(sample_repo), args.repeat)
+
+    # 20 revision lookups through a fresh git process each vs. the long-lived cat-file helper
+    lookups = ["HEAD", "HEAD^{tree}", "refs/heads/main", "refs/heads/missing"] * 5
+    results["rev_parse.subprocess"] = measure(
+        lambda: [run_git(["rev-parse", "--verify", "--quiet", rev], sample_repo, check=False) for rev in lookups],
+        args.repeat)
+    results["rev_parse.helper"] = measure(
+        lambda: [rev_parse(sample_repo, rev) for rev in lookups], args.repeat)
+
+    generation = [0]
+
+    def dirty_sample_repo():
+        generation[0] += 1
+        touch_files(sample_repo, args.modified, args.files, args.depth, generation[0])
+
+    for staging in ("all", "targeted"):
+        results[f"generate_and_push.{staging}"] = measure(
+            lambda: core.commit_and_push(sample_repo, "main", "Benchmark commit", staging=staging),
+            args.repeat, dirty_sample_repo)
+
+    # Publishing to branches that are not checked out: one push per branch vs. one atomic push
+    targets = [f"feature/b{i}" for i in range(min(3, args.branches))]
+    if targets:
+        results["publish.per_branch"] = measure(
+            lambda: [core.commit_and_push(sample_repo, b, "Benchmark commit", fast=True) for b in targets],
+            args.repeat, dirty_sample_repo)
+        results["publish.atomic"] = measure(
+            lambda: publish_to_branches(sample_repo, targets, "Benchmark commit"),
+            args.repeat, dirty_sample_repo)
+
+    # Type-ahead search: every prefix of a few queries against --search-entries synthetic paths
+    entries = [f"{os.path.relpath(repos[i % len(repos)], base_path)}/feature/b{i % args.branches}-{i}"
+               for i in range(args.search_entries)]
+    keystrokes = [query[:n] for query in ("repo1/feat", "b3-12", "rp1fb7") for n in range(1, len(query) + 1)]
+    results["search.build"] = measure(lambda: SearchIndex(entries), 1)
+    index = SearchIndex(entries)
+    results["search.keystroke"] = [
+        sample for query in keystrokes for sample in measure(lambda: index.search(query), args.repeat)
+    ]
+    results["search.linear_scan"] = [
+        sample for query in keystrokes
+        for sample in measure(lambda: [e for e in entries if query in e.lower()][:50], args.repeat)
+    ]
+    return {name: summarize(samples) for name, samples in results.items()}
+
+
+def git_version():
+    return subprocess.run(["git", "--version"], capture_output=True, text=True).stdout.strip()
+
+
+def print_table(results, previous=None):
+    """Prints the results, with the median change against previous results when given."""
+    header = f"{'Benchmark':<26} {'median':>10} {'p95':>10} {'p99':>10}"
+    if previous:
+        header += f" {'vs prev':>9}"
+    print(header)
+    for name, stats in results.items():
+        line = f"{name:<26} {stats['median_ms']:>8.2f}ms {stats['p95_ms']:>8.2f}ms {stats['p99_ms']:>8.2f}ms"
+        old = (previous or {}).get(name)
+        if old:
+            change = (stats["median_ms"] / old["median_ms"] - 1) * 100 if old["median_ms"] else 0.0
+            line += f" {change:>+8.1f}%"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repos", type=int, default=20, help="number of repositories (N)")
+    parser.add_argument("--branches", type=int, default=50, help="branches per repository (M)")
+    parser.add_argument("--files", type=int, default=500, help="tracked files per repository")
+    parser.add_argument("--modified", type=int, default=50, help="modified files per repository (K)")
+    parser.add_argument("--untracked", type=int, default=50, help="untracked files per repository (K)")
+    parser.add_argument("--depth", type=int, default=4, help="directory depth of files and noise trees")
+    parser.add_argument("--noise", type=int, default=500, help="non-repository leaf directories")
+    parser.add_argument("--search-entries", type=int, default=100000, help="entries in the type-ahead search index")
+    parser.add_argument("--repeat", type=int, default=10, help="timed runs per benchmark")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="compare medians with a previous JSON result file")
+    parser.add_argument("--workspace", help="build the workspace here instead of a temporary directory")
+    args = parser.parse_args(argv)
+
+    if args.workspace:
+        results = run(args, args.workspace)
+    else:
+        with tempfile.TemporaryDirectory(prefix="git-automation-bench-") as workspace:
+            results = run(args, workspace)
+
+    previous = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            previous = json.load(f)["results"]
+    print_table(results, previous)
+
+    if args.output:
+        report = {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "git": git_version(),
+            "parameters": {k: v for k, v in vars(args).items() if k not in ("output", "compare", "workspace")},
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,31 @@
+"""Reusable building blocks for the Git Automation Tool.
+
+The public functions are re-exported lazily so ``import git_automation``
+stays cheap and never pulls in tkinter.
+"""
+_EXPORTS = {
+    "DEFAULT_COMMIT_MESSAGE": "git_automation.core",
+    "clone": "git_automation.core",
+    "commit_and_push": "git_automation.core",
+    "get_branch_metadata": "git_automation.core",
+    "get_branches": "git_automation.core",
+    "get_git_repos": "git_automation.core",
+    "get_modified_files": "git_automation.core",
+    "run_batch": "git_automation.batch",
+    "select_repos": "git_automation.batch",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module 'git_automation' has no attribute '{name}'")
+    import importlib
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
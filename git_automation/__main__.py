@@ -0,0 +1,6 @@
+"""Allows ``python -m git_automation``."""
+import sys
+
+from git_automation.cli import main
+
+sys.exit(main())
@@ -0,0 +1,130 @@
+"""Debounced auto-commit with coalesced pushes for repositories written in bursts.
+
+AutoCommitter watches a repository with RepoWatcher and commits once the
+working tree has been quiet for quiet_window seconds, or max_latency seconds
+after the first change of a burst that never goes quiet. Every burst
+becomes one commit, however many files it wrote.
+
+PushCoalescer keeps at most one push running and one queued per
+(repository, branch). Requests that arrive while a push is running collapse
+into the single queued one, which picks up every commit made in the
+meantime. Remote round-trips therefore grow with bursts, not with writes.
+"""
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from git_automation.gitcmd import describe_error, no_log
+from git_automation.pipeline import STAGING_TARGETED, push, stage_and_commit
+from git_automation.watcher import RepoWatcher
+
+DEFAULT_QUIET_WINDOW = 5.0
+DEFAULT_MAX_LATENCY = 60.0
+
+
+class PushCoalescer:
+    """Merges push requests for the same repository and branch.
+
+    request() never blocks: it starts a push, or marks one as pending behind
+    the push already running for that key.
+    """
+
+    def __init__(self, max_workers=4, log=no_log, stream=None):
+        self.log = log
+        self.stream = stream
+        self.requested = 0
+        self.pushes = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+        self._running = set()
+        self._pending = set()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="git-push")
+
+    def request(self, repo_path, branch):
+        """Asks for branch to be pushed; returns False if merged into a push already queued or running."""
+        key = (repo_path, branch)
+        with self._lock:
+            self.requested += 1
+            if key in self._running:
+                self._pending.add(key)
+                return False
+            self._running.add(key)
+        self._pool.submit(self._run, key)
+        return True
+
+    def _run(self, key):
+        repo_path, branch = key
+        while True:
+            with self._lock:
+                self._pending.discard(key)
+                self.pushes += 1
+            try:
+                push(repo_path, branch, self.log, stream=self.stream)
+            except (subprocess.SubprocessError, OSError) as e:
+                with self._lock:
+                    self.failures += 1
+                self.log(f"Push of '{branch}' in {repo_path} failed: {describe_error(e)}", "ERROR")
+            with self._lock:
+                if key not in self._pending:
+                    self._running.discard(key)
+                    return
+
+    def shutdown(self, wait=True):
+        """Waits for running and queued pushes (when wait is True) and stops the workers."""
+        self._pool.shutdown(wait=wait)
+
+
+class AutoCommitter:
+    """Commits one repository once per burst of changes and pushes through a PushCoalescer.
+
+    on_commit(committed) is called on the watcher thread after every burst
+    with True when a commit was made.
+    """
+
+    def __init__(self, repo_path, branch="HEAD", quiet_window=DEFAULT_QUIET_WINDOW,
+                 max_latency=DEFAULT_MAX_LATENCY, commit_message=None, do_push=True, coalescer=None,
+                 log=no_log, on_commit=None, force_polling=False):
+        self.repo_path = repo_path
+        self.branch = branch
+        self.commit_message = commit_message
+        self.do_push = do_push
+        self.coalescer = coalescer or PushCoalescer(log=log)
+        self.log = log
+        self.on_commit = on_commit
+        self.bursts = 0
+        self.commits = 0
+        self._watcher = RepoWatcher(repo_path, self._on_burst, debounce=quiet_window, max_latency=max_latency,
+                                    force_polling=force_polling, log=log)
+
+    def start(self):
+        """Starts watching the repository."""
+        self._watcher.start()
+        self.log(f"Auto-commit watching {self.repo_path} ({self._watcher.backend_name}).")
+
+    def stop(self):
+        """Stops watching; pushes already requested still complete."""
+        self._watcher.stop()
+
+    def _on_burst(self, paths):
+        # Runs on the watcher thread, so bursts are committed one at a time
+        try:
+            committed = stage_and_commit(self.repo_path, self.commit_message, staging=STAGING_TARGETED)
+        except (subprocess.SubprocessError, OSError) as e:
+            self.log(f"Auto-commit failed in {self.repo_path}: {describe_error(e)}", "ERROR")
+            committed = False
+        if committed or paths is not None:
+            self.bursts += 1  # Index/HEAD-only events with nothing to commit are our own commits echoing back
+        if committed:
+            self.commits += 1
+            changed = f"{len(paths)} changed paths" if paths is not None else "changes"
+            self.log(f"Auto-commit: committed a burst of {changed} in {self.repo_path}.", "SUCCESS")
+            if self.do_push:
+                self.coalescer.request(self.repo_path, self.branch)
+        if self.on_commit is not None:
+            self.on_commit(committed)
+
+    def summary(self):
+        """Returns a one-line account of bursts, commits and pushes so far."""
+        c = self.coalescer
+        return (f"{self.bursts} bursts, {self.commits} commits, {c.requested} push requests, "
+                f"{c.pushes} pushes, {c.failures} failed")
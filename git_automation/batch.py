@@ -0,0 +1,135 @@
+"""Batch stage/commit/push across many repositories.
+
+Each worker thread drives its own git child processes, so the thread pool
+bounds how many git processes run at once without re-importing the GUI
+script the way a spawned process pool would on Windows. Pushes are further
+limited per remote host so a single server is not flooded.
+"""
+import fnmatch
+import os
+import subprocess
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+
+from git_automation.gitcmd import default_workers, describe_error, run_git
+from git_automation.pipeline import STAGING_TARGETED, push, stage_and_commit
+from git_automation.status import iter_status
+
+SKIPPED_CLEAN = "skipped-clean"
+COMMITTED = "committed"
+PUSHED = "pushed"
+FAILED = "failed"
+
+BatchResult = namedtuple("BatchResult", ["repo", "branch", "outcome", "duration", "error"])
+
+
+def is_dirty(repo_path):
+    """Returns True if the repository has staged, unstaged or untracked changes."""
+    try:
+        return next(iter_status(repo_path), None) is not None  # Stops git after the first entry
+    except (OSError, subprocess.CalledProcessError):
+        return False
+
+
+def select_repos(repos, selection="all", max_workers=None):
+    """Filters repos by "all", "dirty" or a glob matched against the path or folder name."""
+    if selection == "all":
+        return list(repos)
+    if selection == "dirty":
+        with ThreadPoolExecutor(max_workers=max_workers or default_workers()) as pool:
+            flags = list(pool.map(is_dirty, repos))
+        return [repo for repo, dirty in zip(repos, flags) if dirty]
+    return [
+        repo for repo in repos
+        if fnmatch.fnmatch(repo, selection) or fnmatch.fnmatch(os.path.basename(repo), selection)
+    ]
+
+
+def remote_key(repo_path, remote="origin"):
+    """Returns the host of the remote's URL, used to group pushes per server."""
+    result = run_git(["config", "--get", f"remote.{remote}.url"], repo_path, check=False)
+    url = result.stdout.strip()
+    if not url:
+        return repo_path
+    if "://" in url:
+        return urlsplit(url).hostname or url
+    if ":" in url and not os.path.isabs(url):
+        return url.split(":", 1)[0].rsplit("@", 1)[-1]  # scp-style user@host:path
+    return "local"
+
+
+class _RemoteLimiter:
+    """Hands out one bounded semaphore per remote host."""
+
+    def __init__(self, limit):
+        self._limit = limit
+        self._lock = threading.Lock()
+        self._semaphores = {}
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._semaphores:
+                self._semaphores[key] = threading.BoundedSemaphore(self._limit)
+            return self._semaphores[key]
+
+
+def sync_repo(repo_path, branch="HEAD", commit_message=None, do_push=True, limiter=None,
+              staging=STAGING_TARGETED):
+    """Runs the stage/commit/push pipeline on one repository and returns a BatchResult."""
+    start_time = time.time()
+    try:
+        if not stage_and_commit(repo_path, commit_message, staging=staging):
+            outcome = SKIPPED_CLEAN
+        elif not do_push:
+            outcome = COMMITTED
+        else:
+            if limiter is not None:
+                with limiter.get(remote_key(repo_path)):
+                    push(repo_path, branch)
+            else:
+                push(repo_path, branch)
+            outcome = PUSHED
+        return BatchResult(repo_path, branch, outcome, time.time() - start_time, "")
+    except subprocess.SubprocessError as e:
+        return BatchResult(repo_path, branch, FAILED, time.time() - start_time, describe_error(e))
+    except OSError as e:
+        return BatchResult(repo_path, branch, FAILED, time.time() - start_time, str(e))
+
+
+def run_batch(repos, commit_message=None, branch="HEAD", do_push=True,
+              max_workers=None, per_remote_limit=4, on_result=None, staging=STAGING_TARGETED):
+    """Syncs every repository concurrently and returns their BatchResults in input order.
+
+    branch defaults to "HEAD", which pushes each repository's checked-out branch.
+    on_result(result) is called from worker threads as repositories finish.
+    """
+    limiter = _RemoteLimiter(per_remote_limit)
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers or default_workers()) as pool:
+        futures = {
+            pool.submit(sync_repo, repo, branch, commit_message, do_push, limiter, staging): repo
+            for repo in repos
+        }
+        for future in as_completed(futures):
+            result = future.result()
+            results[futures[future]] = result
+            if on_result is not None:
+                on_result(result)
+    return [results[repo] for repo in repos]
+
+
+def format_results(results):
+    """Renders BatchResults as a plain-text table with a summary line."""
+    width = max([len(r.repo) for r in results] + [len("Repository")])
+    lines = [f"{'Repository':<{width}}  {'Outcome':<13}  {'Seconds':>7}  Error"]
+    for r in results:
+        lines.append(f"{r.repo:<{width}}  {r.outcome:<13}  {r.duration:>7.2f}  {r.error}")
+    counts = {}
+    for r in results:
+        counts[r.outcome] = counts.get(r.outcome, 0) + 1
+    summary = ", ".join(f"{outcome}: {count}" for outcome, count in sorted(counts.items()))
+    lines.append(f"{len(results)} repositories ({summary})")
+    return "\n".join(lines)
@@ -0,0 +1,135 @@
+"""Branch metadata from a single ``git for-each-ref`` call.
+
+One invocation lists local and remote-tracking branches with their tip SHA,
+commit date, upstream and ahead/behind counts, sorted by most recent commit.
+Fields are NUL-separated so no branch or upstream name can break parsing.
+Results are cached per repository and reused until HEAD, config,
+packed-refs or any directory under refs/heads or refs/remotes changes mtime.
+"""
+import os
+import threading
+from collections import namedtuple
+
+from git_automation.gitcmd import mtime_ns, run_git
+from git_automation.metrics import span
+from git_automation.refs import common_dir, find_git_dir
+
+BranchInfo = namedtuple(
+    "BranchInfo", ["name", "ref", "remote", "sha", "date", "upstream", "ahead", "behind", "gone", "current"]
+)
+
+_FIELDS = ["refname", "symref", "objectname", "committerdate:unix", "upstream", "upstream:track,nobracket", "HEAD"]
+_FORMAT = "%00".join(f"%({field})" for field in _FIELDS)
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _dir_mtimes(root):
+    """Returns {dir: mtime_ns} for root and every directory below it."""
+    mtimes = {}
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            mtimes[directory] = os.stat(directory).st_mtime_ns
+            with os.scandir(directory) as entries:
+                stack.extend(entry.path for entry in entries if entry.is_dir(follow_symlinks=False))
+        except OSError:
+            mtimes[directory] = None
+    return mtimes
+
+
+def refs_signature(repo_path):
+    """Mtimes that change whenever a branch, its upstream or the checked-out branch changes."""
+    git_dir = find_git_dir(repo_path)
+    shared_dir = common_dir(git_dir)
+    files = tuple(mtime_ns(os.path.join(d, name)) for d, name in (
+        (git_dir, "HEAD"), (shared_dir, "config"), (shared_dir, "packed-refs")
+    ))
+    dirs = {}
+    for kind in ("heads", "remotes"):
+        dirs.update(_dir_mtimes(os.path.join(shared_dir, "refs", kind)))
+    return files, dirs
+
+
+def parse_track(track):
+    """Returns (ahead, behind, gone) from %(upstream:track,nobracket) output such as "ahead 2, behind 1"."""
+    ahead = behind = 0
+    if track == "gone":
+        return ahead, behind, True
+    for part in track.split(","):
+        word, _, count = part.strip().partition(" ")
+        if word == "ahead":
+            ahead = int(count)
+        elif word == "behind":
+            behind = int(count)
+    return ahead, behind, False
+
+
+def parse_branches(output):
+    """Parses for-each-ref output in _FORMAT into BranchInfo records, skipping symbolic refs."""
+    branches = []
+    for line in output.split("\n"):
+        if not line:
+            continue
+        ref, symref, sha, date, upstream, track, head = line.split("\0")
+        if symref:
+            continue  # e.g. refs/remotes/origin/HEAD
+        remote = ref.startswith("refs/remotes/")
+        name = ref[len("refs/remotes/" if remote else "refs/heads/"):]
+        ahead, behind, gone = parse_track(track)
+        branches.append(BranchInfo(
+            name, ref, remote, sha, int(date) if date else None,
+            upstream[len("refs/remotes/"):] if upstream.startswith("refs/remotes/") else upstream,
+            ahead, behind, gone, head == "*"
+        ))
+    return branches
+
+
+def branch_metadata(repo_path, remotes=True):
+    """Returns BranchInfo records for local (and remote-tracking) branches, most recent first."""
+    with span("branch_metadata", repo=repo_path) as current:
+        signature = refs_signature(repo_path)
+        with _cache_lock:
+            cached = _cache.get(repo_path)
+        if cached is not None and cached[0] == signature:
+            branches = cached[1]
+            current.attrs["cached"] = True
+        else:
+            result = run_git(
+                ["for-each-ref", "--sort=-committerdate", f"--format={_FORMAT}", "refs/heads", "refs/remotes"],
+                repo_path
+            )
+            branches = parse_branches(result.stdout)
+            with _cache_lock:
+                _cache[repo_path] = (signature, branches)
+        if not remotes:
+            branches = [branch for branch in branches if not branch.remote]
+        current.attrs["branches"] = len(branches)
+    return list(branches)
+
+
+def describe_branch(branch):
+    """Formats a branch's upstream and divergence, e.g. "origin/main, ahead 2, behind 1"."""
+    if not branch.upstream:
+        return "no upstream"
+    if branch.gone:
+        return f"{branch.upstream}, gone"
+    parts = [branch.upstream]
+    if branch.ahead:
+        parts.append(f"ahead {branch.ahead}")
+    if branch.behind:
+        parts.append(f"behind {branch.behind}")
+    if len(parts) == 1:
+        parts.append("up to date")
+    return ", ".join(parts)
+
+
+def clear_cache(repo_path=None):
+    """Forgets cached branch metadata for one repository, or all of them."""
+    with _cache_lock:
+        if repo_path is None:
+            _cache.clear()
+        else:
+            _cache.pop(repo_path, None)
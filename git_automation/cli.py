@@ -0,0 +1,384 @@
+"""Command-line interface for scripted and display-less use.
+
+Results go to stdout; progress logs go to stderr in the same format as the
+GUI log panel.
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import threading
+from datetime import datetime
+
+BASE_PATH_ENV = "GIT_AUTOMATION_BASE_PATH"
+
+_export_lock = threading.Lock()
+_exported_mark = 0  # Recorder mark of the last span appended to --metrics-jsonl
+
+
+def log_message(message, status="INFO"):
+    """Writes a timestamped log line to stderr."""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"[{timestamp}] [{status}] {message}", file=sys.stderr, flush=True)
+
+
+def _stream_options(args, label=None):
+    """Returns stream_git options from --timeout/--stall-timeout, cancelling on Ctrl-C.
+
+    Git runs in its own process group, so SIGINT is turned into a cancel
+    request that stops it cleanly. Progress is drawn on stderr when it is a
+    terminal.
+    """
+    cancel = threading.Event()
+    signal.signal(signal.SIGINT, lambda signum, frame: cancel.set())
+    stream = {"timeout": args.timeout, "stall_timeout": args.stall_timeout, "cancel": cancel}
+    if sys.stderr.isatty():
+        from git_automation.gitcmd import format_progress
+
+        def show(*update):
+            progress = update[-1]
+            prefix = f"{update[0]}: " if len(update) > 1 else ""
+            sys.stderr.write(f"\r{prefix}{format_progress(progress)}\033[K")
+            if progress.percent == 100:
+                sys.stderr.write("\n")
+            sys.stderr.flush()
+        stream["on_progress"] = show
+    return stream
+
+
+def _index_path(args):
+    from git_automation.discovery import DEFAULT_INDEX_PATH
+    if args.no_index:
+        return None
+    return args.index or DEFAULT_INDEX_PATH
+
+
+def cmd_repos(args):
+    from git_automation.core import get_git_repos
+    for repo in get_git_repos(args.base_path, args.nested, _index_path(args)):
+        print(repo)
+    return 0
+
+
+def cmd_branches(args):
+    if not (args.all or args.verbose):
+        from git_automation.core import get_branches
+        for branch in get_branches(args.repo):
+            print(branch)
+        return 0
+
+    from git_automation.branches import describe_branch
+    from git_automation.core import get_branch_metadata
+    for branch in get_branch_metadata(args.repo, remotes=args.all):
+        label = f"remotes/{branch.name}" if branch.remote else branch.name
+        name = f"{'*' if branch.current else ' '} {label}"
+        if args.verbose:
+            date = datetime.fromtimestamp(branch.date).strftime("%Y-%m-%d") if branch.date else ""
+            detail = "" if branch.remote else f"  [{describe_branch(branch)}]"
+            print(f"{name}  {branch.sha[:10]}  {date}{detail}")
+        else:
+            print(name)
+    return 0
+
+
+def cmd_status(args):
+    from git_automation.status import format_entry, iter_status
+    for entry in iter_status(args.repo, untracked_cache=True):
+        if args.null:
+            sys.stdout.write(f"{entry.xy}\t{entry.path}\0")
+        else:
+            print(format_entry(entry))
+    return 0
+
+
+def cmd_push(args):
+    from git_automation.core import commit_and_push
+    from git_automation.refs import read_head
+    current = read_head(args.repo)[0]
+    branches = list(dict.fromkeys(args.branch or [current or "HEAD"]))
+    if len(branches) > 1 or branches[0] not in (current, "HEAD"):
+        from git_automation.pipeline import publish_to_branches
+        commits = publish_to_branches(args.repo, branches, args.message, log=log_message,
+                                      stream=_stream_options(args), atomic=not args.no_atomic)
+        for branch, commit in commits.items():
+            print(f"{branch}\t{commit or 'unchanged'}")
+        return 0
+    print(commit_and_push(args.repo, branches[0], args.message, log=log_message, staging=args.staging,
+                          fast=args.fast, stream=_stream_options(args)))
+    return 0
+
+
+def cmd_batch(args):
+    from git_automation.batch import FAILED, format_results, run_batch, select_repos
+    from git_automation.core import get_git_repos
+    repos = get_git_repos(args.base_path, args.nested, _index_path(args))
+    targets = select_repos(repos, args.select, max_workers=args.workers)
+    log_message(f"Batch started on {len(targets)} of {len(repos)} repositories ('{args.select}').")
+    results = run_batch(
+        targets, args.message, do_push=not args.no_push,
+        max_workers=args.workers, per_remote_limit=args.per_remote, staging=args.staging
+    )
+    if results:
+        print(format_results(results))
+    return 1 if any(r.outcome == FAILED for r in results) else 0
+
+
+def cmd_dashboard(args):
+    from git_automation.core import get_git_repos
+    from git_automation.dashboard import Dashboard, format_states
+    repos = get_git_repos(args.base_path, args.nested, _index_path(args))
+    dashboard = Dashboard(max_workers=args.workers)
+    print(format_states(dashboard.refresh(repos)))
+    count, _, seconds = dashboard.last_refresh
+    log_message(f"Dashboard computed for {count} repositories in {seconds:.2f} seconds.")
+    return 0
+
+
+def cmd_clone(args):
+    from git_automation.clones import CANCELLED, FAILED, CloneQueue
+    mirror_cache = None
+    if args.mirror_cache:
+        from git_automation.mirrors import MirrorCache
+        mirror_cache = MirrorCache(args.mirror_cache, max_bytes=args.cache_max_mb * 1024 ** 2)
+    stream = _stream_options(args)
+    queue = CloneQueue(args.base_path, args.jobs, _index_path(args), log=log_message, mirror_cache=mirror_cache,
+                       timeout=args.timeout, cancel=stream["cancel"], include_nested=args.nested)
+    results = queue.run(args.urls, args.profile, args.sparse or (), args.branch,
+                        on_progress=stream.get("on_progress"))
+    for result in results:
+        print(f"{result.outcome}\t{result.duration:.2f}s\t{result.path}")
+    if mirror_cache is not None:
+        stats = mirror_cache.stats()
+        log_message(f"Mirror cache hit rate {stats['hit_rate']:.0%} ({stats['hits']} hits, {stats['misses']} misses).")
+    return 1 if any(r.outcome in (FAILED, CANCELLED) for r in results) else 0
+
+
+def cmd_autocommit(args):
+    from git_automation.autocommit import AutoCommitter, PushCoalescer
+    from git_automation.refs import read_head
+    branch = args.branch or read_head(args.repo)[0] or "HEAD"
+    stream = {"timeout": args.timeout, "stall_timeout": args.stall_timeout}
+    committer = AutoCommitter(
+        args.repo, branch, quiet_window=args.quiet, max_latency=args.max_latency, commit_message=args.message,
+        do_push=not args.no_push, coalescer=PushCoalescer(log=log_message, stream=stream), log=log_message
+    )
+    stop = threading.Event()
+    signal.signal(signal.SIGINT, lambda signum, frame: stop.set())
+    committer.start()
+    while not stop.wait(1.0):
+        pass
+    committer.stop()
+    committer.coalescer.shutdown()
+    log_message(f"Auto-commit stopped: {committer.summary()}.")
+    return 0
+
+
+def cmd_daemon(args):
+    from git_automation.daemon import FAILED, SKIPPED_UNCHANGED, SyncDaemon, SyncPolicies
+
+    def report(result):
+        if result.outcome != SKIPPED_UNCHANGED:
+            status = "ERROR" if result.outcome == FAILED else "INFO"
+            log_message(f"{result.repo}: {result.outcome} ({result.duration:.2f}s, next run in "
+                        f"{result.next_run:.0f}s)", status)
+            try:
+                export_metrics(args)  # The daemon may run for weeks; do not wait for exit
+            except OSError as e:
+                log_message(f"Could not write metrics: {e}", "ERROR")
+
+    daemon = SyncDaemon(
+        args.base_path, SyncPolicies.load(args.policy), max_concurrent=args.workers,
+        per_remote_limit=args.per_remote, log=log_message, on_result=report, index_path=_index_path(args),
+        include_nested=args.nested
+    )
+    if args.once:
+        results = daemon.run_once(force=args.force)
+        return 1 if any(r.outcome == FAILED for r in results) else 0
+    signal.signal(signal.SIGINT, lambda signum, frame: daemon.stop(wait=False))
+    daemon.run_forever()
+    return 0
+
+
+def cmd_maintenance(args):
+    from git_automation.core import get_git_repos
+    from git_automation.maintenance import format_maintenance, run_maintenance
+    repos = get_git_repos(args.base_path, args.nested, _index_path(args))
+    log_message(f"Maintaining {len(repos)} repositories, {args.workers} at a time...")
+    results = run_maintenance(repos, max_workers=args.workers, fsmonitor=args.fsmonitor, samples=args.samples,
+                              log=log_message)
+    if results:
+        print(format_maintenance(results))
+    return 1 if any(r.error for r in results) else 0
+
+
+def cmd_mirrors(args):
+    from git_automation.mirrors import MirrorCache
+    cache = MirrorCache(args.cache_dir, max_bytes=args.cache_max_mb * 1024 ** 2)
+    failures = cache.refresh_all(log=log_message, stream=_stream_options(args)) if args.refresh else 0
+    stats = cache.stats()
+    print(f"mirrors {stats['mirrors']}  size {stats['bytes'] / 1024 ** 2:.1f} MiB  "
+          f"hits {stats['hits']}  misses {stats['misses']}  hit rate {stats['hit_rate']:.0%}")
+    return 1 if failures else 0
+
+
+def build_parser():
+    """Builds the argparse parser for all subcommands."""
+    from git_automation.gitcmd import DEFAULT_STALL_TIMEOUT
+    parser = argparse.ArgumentParser(prog="git_automation", description="Headless Git Automation Tool.")
+    parser.add_argument("--metrics-jsonl", metavar="PATH", help="append timing spans to a JSON-lines file")
+    parser.add_argument("--metrics-prom", metavar="PATH", help="write a Prometheus textfile of stage timings")
+    sub = parser.add_subparsers(dest="command", required=True)
+    default_base = os.environ.get(BASE_PATH_ENV, ".")
+    default_cache_dir = os.path.join(os.path.expanduser("~"), ".git_automation", "mirrors")
+    default_policy = os.path.join(os.path.expanduser("~"), ".git_automation", "sync_policy.json")
+
+    def add_discovery_options(p):
+        p.add_argument("--base-path", default=default_base,
+                       help=f"directory holding the repositories (default: ${BASE_PATH_ENV} or .)")
+        p.add_argument("--nested", action="store_true", help="also find nested repositories and submodules")
+        p.add_argument("--index", help="repository index file (default: ~/.git_automation/repo_index.json)")
+        p.add_argument("--no-index", action="store_true", help="do not read or write the repository index")
+
+    def add_staging_option(p):
+        p.add_argument("--staging", choices=["targeted", "all"], default="targeted",
+                       help="stage only the paths git status reports (default) or run git add .")
+
+    def add_timeout_options(p):
+        p.add_argument("--timeout", type=float, metavar="SECONDS", help="abort a transfer that takes longer")
+        p.add_argument("--stall-timeout", type=float, default=DEFAULT_STALL_TIMEOUT, metavar="SECONDS",
+                       help=f"abort a transfer that prints nothing for this long (default: {DEFAULT_STALL_TIMEOUT})")
+
+    p = sub.add_parser("repos", help="list repositories under the base path")
+    add_discovery_options(p)
+    p.set_defaults(func=cmd_repos)
+
+    p = sub.add_parser("branches", help="list local branches of a repository")
+    p.add_argument("repo")
+    p.add_argument("-a", "--all", action="store_true",
+                   help="also list remote-tracking branches, most recently committed first")
+    p.add_argument("-v", "--verbose", action="store_true",
+                   help="show tip SHA, commit date, upstream and ahead/behind counts")
+    p.set_defaults(func=cmd_branches)
+
+    p = sub.add_parser("status", help="list modified files of a repository")
+    p.add_argument("repo")
+    p.add_argument("-z", "--null", action="store_true", help="NUL-terminate entries")
+    p.set_defaults(func=cmd_status)
+
+    p = sub.add_parser("push", help="stage, commit and push one repository")
+    p.add_argument("repo")
+    p.add_argument("-b", "--branch", action="append",
+                   help="branch to commit to and push (default: the checked-out branch); repeat to publish "
+                        "to several branches without checking them out, in one atomic push")
+    p.add_argument("-m", "--message", help="commit message")
+    p.add_argument("--no-atomic", action="store_true", help="with several branches, let each ref succeed alone")
+    add_staging_option(p)
+    p.add_argument("--fast", action="store_true",
+                   help="commit with plumbing onto the branch without hooks or touching the index")
+    add_timeout_options(p)
+    p.set_defaults(func=cmd_push)
+
+    p = sub.add_parser("batch", help="stage, commit and push many repositories")
+    add_discovery_options(p)
+    p.add_argument("-s", "--select", default="dirty", help="all, dirty or a glob (default: dirty)")
+    p.add_argument("-m", "--message", help="commit message")
+    p.add_argument("--no-push", action="store_true", help="commit only")
+    add_staging_option(p)
+    p.add_argument("-j", "--workers", type=int, help="concurrent repositories")
+    p.add_argument("--per-remote", type=int, default=4, help="concurrent pushes per remote host")
+    p.set_defaults(func=cmd_batch)
+
+    p = sub.add_parser("dashboard", help="show branch, dirty and ahead/behind counts for every repository")
+    add_discovery_options(p)
+    p.add_argument("-j", "--workers", type=int, default=16, help="concurrent repositories")
+    p.set_defaults(func=cmd_dashboard)
+
+    p = sub.add_parser("clone", help="clone repositories into the base path")
+    add_discovery_options(p)
+    p.add_argument("urls", nargs="+", metavar="url")
+    p.add_argument("-p", "--profile", choices=["full", "shallow", "partial", "sparse"], default="full")
+    p.add_argument("--sparse", action="append", metavar="DIR",
+                   help="sparse-checkout cone directory (repeatable, used with --profile sparse)")
+    p.add_argument("-b", "--branch", help="branch to check out")
+    p.add_argument("-j", "--jobs", type=int, default=4, help="concurrent clones")
+    add_timeout_options(p)
+    p.add_argument("--mirror-cache", nargs="?", const=default_cache_dir, metavar="DIR",
+                   help="clone through a local mirror cache (default dir: ~/.git_automation/mirrors)")
+    p.add_argument("--cache-max-mb", type=int, default=20 * 1024, help="mirror cache size budget")
+    p.set_defaults(func=cmd_clone)
+
+    p = sub.add_parser("autocommit", help="commit and push a repository once per burst of changes")
+    p.add_argument("repo")
+    p.add_argument("-b", "--branch", help="branch to push (default: the checked-out branch)")
+    p.add_argument("-m", "--message", help="commit message")
+    p.add_argument("--quiet", type=float, default=5.0, metavar="SECONDS",
+                   help="commit once no file has changed for this long (default: 5)")
+    p.add_argument("--max-latency", type=float, default=60.0, metavar="SECONDS",
+                   help="commit a burst that never goes quiet after this long (default: 60)")
+    p.add_argument("--no-push", action="store_true", help="commit only")
+    add_timeout_options(p)
+    p.set_defaults(func=cmd_autocommit)
+
+    p = sub.add_parser("daemon", help="keep fetching, committing and pushing every repository on a schedule")
+    add_discovery_options(p)
+    p.add_argument("--policy", default=default_policy,
+                   help="JSON sync policy file (default: ~/.git_automation/sync_policy.json)")
+    p.add_argument("-j", "--workers", type=int, default=4, help="repositories synced at once")
+    p.add_argument("--per-remote", type=int, default=2, help="concurrent pushes per remote host")
+    p.add_argument("--once", action="store_true", help="run a single cycle on every repository and exit")
+    p.add_argument("--force", action="store_true", help="with --once, ignore the unchanged-mtime shortcut")
+    p.set_defaults(func=cmd_daemon)
+
+    p = sub.add_parser("maintenance", help="pack refs and objects, write commit-graphs and report speed-ups")
+    add_discovery_options(p)
+    p.add_argument("-j", "--workers", type=int, default=4, help="repositories maintained at once")
+    p.add_argument("--samples", type=int, default=5, help="timed runs per query before and after")
+    p.add_argument("--fsmonitor", action="store_true", help="also enable core.fsmonitor")
+    p.set_defaults(func=cmd_maintenance)
+
+    p = sub.add_parser("mirrors", help="show or refresh the clone mirror cache")
+    p.add_argument("--cache-dir", default=default_cache_dir)
+    p.add_argument("--cache-max-mb", type=int, default=20 * 1024, help="mirror cache size budget")
+    p.add_argument("--refresh", action="store_true", help="fetch every cached mirror")
+    add_timeout_options(p)
+    p.set_defaults(func=cmd_mirrors)
+    return parser
+
+
+def export_metrics(args):
+    """Writes the recorded spans to the files requested on the command line.
+
+    May be called repeatedly (the daemon does after every cycle): each span is
+    appended to the JSON-lines file once, and the Prometheus textfile is
+    rewritten from every recorded span.
+    """
+    global _exported_mark
+    if not (args.metrics_jsonl or args.metrics_prom):
+        return
+    from git_automation.metrics import recorder, write_jsonl, write_prometheus_textfile
+    with _export_lock:
+        if args.metrics_jsonl:
+            spans, _exported_mark = recorder.spans_since(_exported_mark)
+            write_jsonl(spans, args.metrics_jsonl)
+        if args.metrics_prom:
+            write_prometheus_textfile(recorder.spans(), args.metrics_prom)
+
+
+def main(argv=None):
+    """Runs the CLI and returns the process exit code."""
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except subprocess.CalledProcessError as e:
+        from git_automation.pipeline import describe_error
+        log_message(f"Git operation failed: {describe_error(e)}", "ERROR")
+        return 1
+    except subprocess.SubprocessError as e:  # Cancelled or timed out
+        log_message(str(e), "ERROR")
+        return 1
+    except (OSError, ValueError) as e:
+        log_message(f"An error occurred: {e}", "ERROR")
+        return 1
+    finally:
+        export_metrics(args)
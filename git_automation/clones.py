@@ -0,0 +1,204 @@
+"""Concurrent clone queue with shallow, partial and sparse profiles.
+
+Each clone goes to ``<name>.partial`` first: ``git clone --no-checkout``
+with the profile's options, then the optional sparse-checkout cone, then the
+checkout, and finally a rename to the real name. A failed transfer is
+cleaned up; if the transfer finished but a later step failed, the next
+attempt resumes from the checkout instead of downloading everything again.
+Cancelled and timed-out clones are cleaned up the same way.
+
+Local bare repositories work as remotes when given as ``file://`` URLs (git
+ignores --depth and --filter for plain paths).
+"""
+import os
+import shutil
+import subprocess
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from git_automation.discovery import add_repo_to_index
+from git_automation.gitcmd import GitCancelled, describe_error, no_log, run_git, stream_options, traced_git
+
+PARTIAL_SUFFIX = ".partial"
+DEFAULT_MAX_CONCURRENT = 4
+
+CLONED = "cloned"
+RESUMED = "resumed"
+EXISTS = "exists"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+CloneProfile = namedtuple("CloneProfile", ["name", "depth", "filter", "sparse", "single_branch"])
+CloneResult = namedtuple("CloneResult", ["url", "path", "outcome", "duration", "error"])
+
+PROFILES = {
+    "full": CloneProfile("full", None, None, False, False),
+    "shallow": CloneProfile("shallow", 1, None, False, True),
+    "partial": CloneProfile("partial", None, "blob:none", False, False),
+    "sparse": CloneProfile("sparse", None, "blob:none", True, False),
+}
+
+
+def repo_name_from_url(url):
+    """Returns the directory name git clone would pick for url."""
+    name = url.rstrip("/").rstrip("\\")
+    name = name.replace("\\", "/").rsplit("/", 1)[-1].rsplit(":", 1)[-1]
+    return name[:-4] if name.endswith(".git") else name
+
+
+def clone_args(profile, branch=None):
+    """Returns the extra ``git clone`` options for a profile."""
+    args = []
+    if profile.depth:
+        args.append(f"--depth={profile.depth}")
+    if profile.filter:
+        args.append(f"--filter={profile.filter}")
+    if profile.single_branch:
+        args.append("--single-branch")
+    if branch:
+        args += ["--branch", branch]
+    return args
+
+
+def _transfer_complete(work_dir, url):
+    """True if an earlier attempt for url finished fetching (HEAD resolves to a commit)."""
+    if not os.path.isdir(os.path.join(work_dir, ".git")):
+        return False
+    origin = run_git(["config", "--get", "remote.origin.url"], work_dir, check=False).stdout.strip()
+    if origin != url:
+        return False
+    result = run_git(["rev-parse", "--verify", "--quiet", "HEAD^{commit}"], work_dir, check=False)
+    return result.returncode == 0
+
+
+def clone_into(url, base_path, profile=PROFILES["full"], sparse_patterns=(), branch=None, log=no_log,
+               source=None, stream=None):
+    """Clones url into base_path with the given profile and returns a CloneResult.
+
+    When source is a local mirror of url, the objects come from the mirror
+    (hard-linked, so depth and filter do not apply) and origin is pointed
+    back at url afterwards. stream holds stream_git options (on_progress,
+    timeout, stall_timeout, cancel) for the transfer.
+    """
+    stream = stream_options(stream)
+    start_time = time.time()
+    base_path = os.path.abspath(base_path)  # git clone runs from base_path, so work_dir must not be relative
+    dest = os.path.join(base_path, repo_name_from_url(url))
+    work_dir = dest + PARTIAL_SUFFIX
+    if os.path.exists(dest):
+        log(f"Skipping {url}: {dest} already exists.", "INFO")
+        return CloneResult(url, dest, EXISTS, 0.0, "")
+
+    resumed = False
+    try:
+        if _transfer_complete(work_dir, url):
+            resumed = True
+            log(f"Resuming interrupted clone of {url} from its checkout step...")
+        else:
+            if os.path.exists(work_dir):
+                shutil.rmtree(work_dir)  # Incomplete transfer; nothing reusable
+            if source:
+                log(f"Cloning repository from {url} into {base_path} (from mirror cache)...")
+                branch_args = ["--branch", branch] if branch else []
+                traced_git(
+                    "clone", ["clone", "--progress", "--no-checkout", *branch_args, source, work_dir],
+                    base_path, stream=stream, url=url, profile="mirror"
+                )
+                traced_git("set_origin", ["remote", "set-url", "origin", url], work_dir)
+            else:
+                log(f"Cloning repository from {url} into {base_path} ({profile.name})...")
+                traced_git(
+                    "clone", ["clone", "--progress", "--no-checkout", *clone_args(profile, branch), url, work_dir],
+                    base_path, stream=stream, url=url, profile=profile.name
+                )
+
+        if profile.sparse:
+            traced_git("sparse_checkout", ["sparse-checkout", "set", "--cone", *sparse_patterns], work_dir)
+        traced_git("checkout", ["reset", "--hard", "-q"], work_dir)
+        os.replace(work_dir, dest)
+    except (subprocess.SubprocessError, OSError) as e:
+        if not _transfer_complete(work_dir, url):
+            shutil.rmtree(work_dir, ignore_errors=True)  # Keep only states we can resume from
+        if isinstance(e, GitCancelled):
+            log(f"Clone of {url} cancelled.", "WARNING")
+            return CloneResult(url, work_dir, CANCELLED, time.time() - start_time, str(e))
+        error = describe_error(e)
+        log(f"Git clone operation failed for {url}: {error}", "ERROR")
+        return CloneResult(url, work_dir, FAILED, time.time() - start_time, error)
+
+    log(f"Repository cloned successfully from {url}!", "SUCCESS")
+    return CloneResult(url, dest, RESUMED if resumed else CLONED, time.time() - start_time, "")
+
+
+class CloneQueue:
+    """Runs many clones concurrently and records each new repository in the index.
+
+    timeout bounds each clone's transfer; setting the cancel Event stops the
+    running transfers and skips clones that have not started yet.
+    include_nested must match the scan that wrote the index.
+    """
+
+    def __init__(self, base_path, max_concurrent=DEFAULT_MAX_CONCURRENT, index_path=None, log=no_log,
+                 mirror_cache=None, timeout=None, cancel=None, include_nested=False):
+        self.base_path = os.path.abspath(base_path)
+        self.max_concurrent = max_concurrent
+        self.index_path = index_path
+        self.include_nested = include_nested
+        self.log = log
+        self.mirror_cache = mirror_cache
+        self.timeout = timeout
+        self.cancel = cancel
+
+    def _mirror_for(self, url, stream):
+        """Returns a refreshed mirror for url, or None to clone directly from the upstream.
+
+        Raises GitCancelled if the mirror transfer was cancelled.
+        """
+        if self.mirror_cache is None:
+            return None
+        try:
+            return self.mirror_cache.ensure(url, self.log, stream)
+        except GitCancelled:
+            raise
+        except (subprocess.SubprocessError, OSError) as e:
+            self.log(f"Mirror cache unavailable for {url}, cloning directly: {describe_error(e)}", "WARNING")
+            return None
+
+    def _clone(self, url, profile, sparse_patterns, branch, on_progress):
+        if self.cancel is not None and self.cancel.is_set():
+            return CloneResult(url, "", CANCELLED, 0.0, "cancelled before starting")
+        stream = {"timeout": self.timeout, "cancel": self.cancel}
+        if on_progress is not None:
+            stream["on_progress"] = lambda progress: on_progress(url, progress)
+        try:
+            source = self._mirror_for(url, stream)
+        except GitCancelled as e:
+            self.log(f"Clone of {url} cancelled.", "WARNING")
+            return CloneResult(url, "", CANCELLED, 0.0, str(e))
+        result = clone_into(url, self.base_path, profile, sparse_patterns, branch, self.log, source, stream)
+        if self.index_path and result.outcome in (CLONED, RESUMED):
+            add_repo_to_index(self.index_path, self.base_path, result.path, self.include_nested)
+        return result
+
+    def run(self, urls, profile="full", sparse_patterns=(), branch=None, on_result=None, on_progress=None):
+        """Clones every URL and returns their CloneResults in input order.
+
+        profile is a PROFILES key or a CloneProfile; on_result(result) is called
+        from worker threads as clones finish, and on_progress(url, GitProgress)
+        as their transfers advance.
+        """
+        if isinstance(profile, str):
+            profile = PROFILES[profile]
+        urls = list(dict.fromkeys(urls))  # Drop duplicates, keep order
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.max_concurrent, thread_name_prefix="git-clone") as pool:
+            futures = {
+                pool.submit(self._clone, url, profile, sparse_patterns, branch, on_progress): url for url in urls
+            }
+            for future in as_completed(futures):
+                result = future.result()
+                results[futures[future]] = result
+                if on_result is not None:
+                    on_result(result)
+        return [results[url] for url in urls]
@@ -0,0 +1,43 @@
+"""Headless entry points for the git operations behind the GUI.
+
+Nothing here imports tkinter, so these functions can be scripted or run on
+hosts without a display.
+"""
+from git_automation.branches import branch_metadata
+from git_automation.discovery import discover_repos
+from git_automation.pipeline import DEFAULT_COMMIT_MESSAGE, clone, commit_and_push
+from git_automation.refs import list_branches
+from git_automation.status import iter_status
+
+__all__ = [
+    "DEFAULT_COMMIT_MESSAGE",
+    "clone",
+    "commit_and_push",
+    "get_branch_metadata",
+    "get_branches",
+    "get_git_repos",
+    "get_modified_files",
+]
+
+
+def get_git_repos(base_path, include_nested=False, index_path=None, on_repos=None):
+    """Returns a sorted list of Git repository directories from the base path.
+
+    on_repos(repos) receives repositories in batches while the scan is still running.
+    """
+    return discover_repos(base_path, include_nested=include_nested, index_path=index_path, on_repos=on_repos)
+
+
+def get_branches(repo_path):
+    """Returns the sorted local branch names of a repository."""
+    return list_branches(repo_path)
+
+
+def get_branch_metadata(repo_path, remotes=True):
+    """Returns BranchInfo records for local and remote-tracking branches, most recently committed first."""
+    return branch_metadata(repo_path, remotes=remotes)
+
+
+def get_modified_files(repo_path, untracked_cache=True):
+    """Returns the StatusEntry records for a repository's uncommitted changes."""
+    return list(iter_status(repo_path, untracked_cache=untracked_cache))
@@ -0,0 +1,302 @@
+"""Background auto-sync: periodically fetch, commit and push every repository.
+
+What happens to each repository is decided by a per-repository SyncPolicy
+read from a JSON policy file::
+
+    {
+        "default": {"interval": 900, "push": true},
+        "repos": {
+            "docs-*": {"push": false},
+            "*/legacy/*": {"enabled": false}
+        }
+    }
+
+Patterns are matched, in file order, against the full path or the folder
+name (like batch selections); unset fields fall back to "default" and then
+to DEFAULT_POLICY.
+
+Every repository has its own next-run time on a heap. Intervals are jittered
+so repositories do not sync in lockstep, failures back off exponentially up
+to MAX_BACKOFF, and a thread pool caps how many repositories sync at once
+(with a further per-remote-host cap on pushes). Before doing any git work a
+cycle compares a few mtimes (index, HEAD, the branch ref, packed-refs and
+the working-tree root) with the previous successful cycle and skips the
+repository when nothing moved, so an idle workspace costs a handful of stat
+calls per interval. Edits to existing files deep in the tree do not touch
+those mtimes; every verify_every-th cycle runs git status regardless to
+catch them, and fetches run on their own, longer fetch_interval.
+"""
+import fnmatch
+import heapq
+import json
+import os
+import random
+import subprocess
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from git_automation.batch import COMMITTED, FAILED, PUSHED, SKIPPED_CLEAN, _RemoteLimiter, remote_key
+from git_automation.clones import CANCELLED
+from git_automation.dashboard import compute_state, state_signature
+from git_automation.discovery import discover_repos
+from git_automation.gitcmd import GitCancelled, describe_error, no_log, stream_options, traced_git
+from git_automation.pipeline import STAGING_TARGETED, push, stage_and_commit
+from git_automation.refs import common_dir, find_git_dir, read_head
+
+DEFAULT_POLICY_PATH = os.path.join(os.path.expanduser("~"), ".git_automation", "sync_policy.json")
+DEFAULT_MAX_CONCURRENT = 4
+DEFAULT_PER_REMOTE_LIMIT = 2
+DEFAULT_VERIFY_EVERY = 4
+JITTER = 0.1
+MAX_BACKOFF = 3600
+
+SKIPPED_UNCHANGED = "skipped-unchanged"
+DISABLED = "disabled"
+FETCHED = "fetched"
+
+SyncPolicy = namedtuple(
+    "SyncPolicy", ["enabled", "fetch", "commit", "push", "interval", "fetch_interval", "branch", "message"]
+)
+SyncResult = namedtuple("SyncResult", ["repo", "outcome", "duration", "error", "next_run"])
+
+DEFAULT_POLICY = SyncPolicy(
+    enabled=True, fetch=True, commit=True, push=True, interval=900, fetch_interval=3600, branch="HEAD", message=None
+)
+
+
+def jittered(seconds, jitter=JITTER):
+    """Returns seconds randomly stretched or shrunk by up to the jitter fraction."""
+    return seconds * random.uniform(1 - jitter, 1 + jitter)
+
+
+def backoff_delay(interval, failures):
+    """Returns the delay before retrying after consecutive failures (doubling, capped at MAX_BACKOFF)."""
+    return min(interval * 2 ** failures, max(MAX_BACKOFF, interval))
+
+
+class SyncPolicies:
+    """Resolves the SyncPolicy of a repository from a default and ordered glob overrides."""
+
+    def __init__(self, default=None, overrides=()):
+        self.default = default or DEFAULT_POLICY
+        self.overrides = list(overrides)  # [(pattern, {field: value})]
+
+    @classmethod
+    def load(cls, path=DEFAULT_POLICY_PATH):
+        """Reads a policy file; a missing file means DEFAULT_POLICY for every repository."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return cls()
+        default = DEFAULT_POLICY._replace(**data.get("default", {}))
+        return cls(default, data.get("repos", {}).items())
+
+    def policy_for(self, repo_path):
+        """Returns the policy of the first matching pattern, or the default."""
+        name = os.path.basename(repo_path)
+        for pattern, fields in self.overrides:
+            if fnmatch.fnmatch(repo_path, pattern) or fnmatch.fnmatch(name, pattern):
+                return self.default._replace(**fields)
+        return self.default
+
+
+def sync_signature(repo_path):
+    """Mtimes that change when the repository has local work to commit or push."""
+    branch, _ = read_head(repo_path)
+    signature = state_signature(repo_path)
+    if branch is None:
+        return signature
+    branch_ref = os.path.join(common_dir(find_git_dir(repo_path)), "refs", "heads", branch)
+    try:
+        return signature + (os.stat(branch_ref).st_mtime_ns,)
+    except OSError:
+        return signature + (None,)
+
+
+class _Schedule:
+    """Per-repository scheduling state."""
+
+    def __init__(self, due):
+        self.due = due
+        self.failures = 0
+        self.cycles = 0
+        self.signature = None
+        self.last_fetch = None
+
+
+class SyncDaemon:
+    """Keeps every repository under base_path synced according to its policy.
+
+    Call start() to run in a background thread, or run_forever() to block.
+    on_result(SyncResult) is called from worker threads after every cycle.
+    """
+
+    def __init__(self, base_path, policies=None, max_concurrent=DEFAULT_MAX_CONCURRENT,
+                 per_remote_limit=DEFAULT_PER_REMOTE_LIMIT, log=no_log, on_result=None, index_path=None,
+                 include_nested=False, rediscover_interval=600, verify_every=DEFAULT_VERIFY_EVERY):
+        self.base_path = base_path
+        self.policies = policies or SyncPolicies()
+        self.max_concurrent = max_concurrent
+        self.log = log
+        self.on_result = on_result
+        self.index_path = index_path
+        self.include_nested = include_nested
+        self.rediscover_interval = rediscover_interval
+        self.verify_every = verify_every
+        self._limiter = _RemoteLimiter(per_remote_limit)
+        self._wake = threading.Condition()
+        self._stop = threading.Event()
+        self._heap = []  # (due, repo)
+        self._schedules = {}
+        self._in_flight = set()
+        self._thread = None
+
+    def start(self):
+        """Runs the scheduler in a daemon thread."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run_forever, name="git-auto-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self, wait=True):
+        """Stops scheduling and cancels running fetches and pushes."""
+        self._stop.set()
+        with self._wake:
+            self._wake.notify_all()
+        if wait and self._thread is not None:
+            self._thread.join()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def run_forever(self):
+        """Schedules and runs sync cycles until stop() is called."""
+        self.log(f"Auto-sync started for {self.base_path}.")
+        with self._wake:
+            self._heap.clear()
+            self._schedules.clear()
+        next_discovery = 0.0
+        with ThreadPoolExecutor(max_workers=self.max_concurrent, thread_name_prefix="git-sync") as pool:
+            while not self._stop.is_set():
+                now = time.monotonic()
+                if now >= next_discovery:
+                    self._discover(now)
+                    next_discovery = now + self.rediscover_interval
+                for repo in self._pop_due(now):
+                    pool.submit(self._run_cycle, repo)
+                with self._wake:
+                    next_due = self._heap[0][0] if self._heap else next_discovery
+                    self._wake.wait(max(0.0, min(next_due, next_discovery) - time.monotonic()))
+        self.log("Auto-sync stopped.")
+
+    def run_once(self, force=False):
+        """Runs one cycle on every repository concurrently and returns their SyncResults.
+
+        With force=True the unchanged-mtime shortcut is bypassed.
+        """
+        repos = discover_repos(self.base_path, include_nested=self.include_nested, index_path=self.index_path)
+        now = time.monotonic()
+        for repo in repos:
+            self._schedules.setdefault(repo, _Schedule(now))
+        with ThreadPoolExecutor(max_workers=self.max_concurrent, thread_name_prefix="git-sync") as pool:
+            return list(pool.map(lambda repo: self._run_cycle(repo, force), repos))
+
+    def _discover(self, now):
+        """Adds newly found repositories (spread over their first interval) and drops vanished ones."""
+        try:
+            repos = set(discover_repos(self.base_path, include_nested=self.include_nested,
+                                       index_path=self.index_path))
+        except OSError as e:
+            self.log(f"Auto-sync could not scan {self.base_path}: {e}", "ERROR")
+            return
+        with self._wake:
+            for repo in repos.difference(self._schedules):
+                policy = self.policies.policy_for(repo)
+                if policy.enabled:
+                    due = now + random.uniform(0, policy.interval)
+                    self._schedules[repo] = _Schedule(due)
+                    heapq.heappush(self._heap, (due, repo))
+            for repo in set(self._schedules).difference(repos):
+                del self._schedules[repo]  # Its heap entry is dropped when popped
+
+    def _pop_due(self, now):
+        due = []
+        with self._wake:
+            while self._heap and self._heap[0][0] <= now:
+                _, repo = heapq.heappop(self._heap)
+                if repo in self._schedules and repo not in self._in_flight:
+                    self._in_flight.add(repo)
+                    due.append(repo)
+        return due
+
+    def _reschedule(self, repo, delay):
+        with self._wake:
+            self._in_flight.discard(repo)
+            schedule = self._schedules.get(repo)
+            if schedule is None or self._stop.is_set():
+                return
+            schedule.due = time.monotonic() + delay
+            heapq.heappush(self._heap, (schedule.due, repo))
+            self._wake.notify_all()
+
+    def _run_cycle(self, repo, force=False):
+        start_time = time.time()
+        policy = self.policies.policy_for(repo)
+        schedule = self._schedules.get(repo) or _Schedule(0.0)  # May have vanished meanwhile
+        delay = jittered(policy.interval)
+        try:
+            outcome = self._sync(repo, policy, schedule, force) if policy.enabled else DISABLED
+            schedule.failures = 0
+            error = ""
+        except GitCancelled:
+            # stop() cancels running fetches and pushes; that is not a failure and is not retried
+            outcome, error = CANCELLED, ""
+            schedule.signature = None
+        except Exception as e:  # Raised in a pool thread, anything uncaught would vanish with the future
+            outcome = FAILED
+            error = describe_error(e) if isinstance(e, (subprocess.SubprocessError, OSError, ValueError)) else repr(e)
+            schedule.failures += 1
+            schedule.signature = None  # Retry the full cycle next time
+            delay = jittered(backoff_delay(policy.interval, schedule.failures))
+            self.log(f"Auto-sync failed for {repo} (attempt {schedule.failures}, retrying in {delay:.0f}s): "
+                     f"{error}", "ERROR")
+        finally:
+            self._reschedule(repo, delay)  # Also leaves _in_flight, or the repository would never run again
+        result = SyncResult(repo, outcome, time.time() - start_time, error, delay)
+        if self.on_result is not None:
+            self.on_result(result)
+        return result
+
+    def _sync(self, repo, policy, schedule, force):
+        """Runs one fetch/commit/push cycle and returns its outcome."""
+        schedule.cycles += 1
+        now = time.monotonic()
+        fetch_due = policy.fetch and (schedule.last_fetch is None or now - schedule.last_fetch >= policy.fetch_interval)
+        verify = force or schedule.cycles % self.verify_every == 0
+        if not (fetch_due or verify) and sync_signature(repo) == schedule.signature:
+            return SKIPPED_UNCHANGED
+
+        stream = stream_options({"cancel": self._stop})
+        outcome = SKIPPED_CLEAN
+        if fetch_due:
+            traced_git("fetch", ["fetch", "--prune", "--progress", "origin"], repo, stream=stream)
+            schedule.last_fetch = now
+            outcome = FETCHED
+
+        committed = False
+        if policy.commit:
+            committed = stage_and_commit(repo, policy.message, log=self.log, staging=STAGING_TARGETED)
+            if committed:
+                outcome = COMMITTED
+        if policy.push:
+            state = compute_state(repo)
+            if state.branch and (committed or state.ahead):
+                with self._limiter.get(remote_key(repo)):
+                    push(repo, policy.branch, log=self.log, stream=stream)
+                outcome = PUSHED
+
+        schedule.signature = sync_signature(repo)
+        return outcome
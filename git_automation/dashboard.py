@@ -0,0 +1,123 @@
+"""All-repositories status dashboard.
+
+One ``git status --porcelain=v2 --branch`` per repository yields the current
+branch, dirty-file count and ahead/behind counts against the upstream.
+Repositories are computed concurrently on a bounded pool, and a cached state
+is reused while the mtimes of the index, HEAD, the branch and upstream refs,
+packed-refs, FETCH_HEAD and the working-tree root are unchanged. Edits deep
+in the working tree that have not touched the index are picked up by a
+forced refresh.
+"""
+import os
+import subprocess
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from git_automation.gitcmd import describe_error, mtime_ns
+from git_automation.refs import common_dir, find_git_dir
+from git_automation.status import iter_status
+
+DEFAULT_MAX_WORKERS = 16
+
+RepoState = namedtuple("RepoState", ["repo", "branch", "dirty", "ahead", "behind", "upstream", "error"])
+
+
+def state_signature(repo_path, previous=None):
+    """Mtimes that change whenever the repository's dashboard row can have changed."""
+    git_dir = find_git_dir(repo_path)
+    shared_dir = common_dir(git_dir)
+    paths = [
+        os.path.join(git_dir, "index"),
+        os.path.join(git_dir, "HEAD"),
+        os.path.join(shared_dir, "packed-refs"),
+        os.path.join(shared_dir, "FETCH_HEAD"),
+        repo_path,
+    ]
+    if previous is not None and previous.branch:
+        paths.append(os.path.join(shared_dir, "refs", "heads", previous.branch))
+    if previous is not None and previous.upstream:
+        paths.append(os.path.join(shared_dir, "refs", "remotes", previous.upstream))
+    return tuple(mtime_ns(path) for path in paths)
+
+
+def compute_state(repo_path):
+    """Returns the RepoState of one repository using a single git status call."""
+    headers = {}
+    try:
+        dirty = sum(1 for _ in iter_status(repo_path, optional_locks=False, headers=headers))
+    except subprocess.CalledProcessError as e:
+        return RepoState(repo_path, None, 0, 0, 0, None, describe_error(e))
+    except OSError as e:
+        return RepoState(repo_path, None, 0, 0, 0, None, str(e))
+    head = headers.get("branch.head")
+    ahead = behind = 0
+    if "branch.ab" in headers:
+        a, b = headers["branch.ab"].split()
+        ahead, behind = int(a), -int(b)
+    return RepoState(
+        repo_path, None if head == "(detached)" else head, dirty, ahead, behind,
+        headers.get("branch.upstream"), ""
+    )
+
+
+class Dashboard:
+    """Caches RepoStates and refreshes only the repositories that changed."""
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS):
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._states = {}  # repo -> (signature, RepoState)
+        self.last_refresh = (0, 0, 0.0)  # (repositories, recomputed, seconds)
+
+    def _refresh_one(self, repo_path, force):
+        with self._lock:
+            cached = self._states.get(repo_path)
+        try:
+            signature = state_signature(repo_path, cached[1] if cached else None)
+            if not force and cached is not None and cached[0] == signature:
+                return cached[1], False
+            state = compute_state(repo_path)
+            # Re-sign with the (possibly new) branch/upstream so their refs are tracked
+            signature = state_signature(repo_path, state)
+        except (OSError, ValueError) as e:
+            return RepoState(repo_path, None, 0, 0, 0, None, str(e)), True
+        with self._lock:
+            self._states[repo_path] = (signature, state)
+        return state, True
+
+    def refresh(self, repos, force=False, on_state=None):
+        """Returns {repo: RepoState} for repos, recomputing only changed ones.
+
+        on_state(state, recomputed) is called from worker threads as results arrive.
+        """
+        start_time = time.time()
+        states = {}
+        recomputed = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="dashboard") as pool:
+            futures = {pool.submit(self._refresh_one, repo, force): repo for repo in repos}
+            for future in as_completed(futures):
+                state, changed = future.result()
+                states[futures[future]] = state
+                recomputed += changed
+                if on_state is not None:
+                    on_state(state, changed)
+        with self._lock:
+            for repo in set(self._states) - set(repos):
+                del self._states[repo]  # Forget repositories that disappeared
+        self.last_refresh = (len(repos), recomputed, time.time() - start_time)
+        return states
+
+
+def format_states(states):
+    """Renders RepoStates as a plain-text table."""
+    rows = sorted(states.values(), key=lambda s: s.repo)
+    width = max([len(s.repo) for s in rows] + [len("Repository")])
+    lines = [f"{'Repository':<{width}}  {'Branch':<20}  {'Dirty':>5}  {'Ahead':>5}  {'Behind':>6}"]
+    for s in rows:
+        if s.error:
+            lines.append(f"{s.repo:<{width}}  error: {s.error}")
+            continue
+        lines.append(f"{s.repo:<{width}}  {s.branch or '(detached)':<20}  {s.dirty:>5}  {s.ahead:>5}  {s.behind:>6}")
+    return "\n".join(lines)
@@ -0,0 +1,175 @@
+"""Repository discovery for the base path.
+
+The scan stops descending as soon as it finds a repository (unless nested
+repositories are requested), lists sibling directories concurrently with
+``os.scandir`` and can keep a persistent index keyed by directory mtimes so a
+warm start only re-lists the directories that actually changed. Callers that
+cannot wait for the whole walk can show ``cached_repos`` straight away and
+receive repositories level by level through ``on_repos``.
+"""
+import json
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from git_automation.gitcmd import default_workers
+from git_automation.metrics import span
+
+INDEX_VERSION = 1
+DEFAULT_INDEX_PATH = os.path.join(os.path.expanduser("~"), ".git_automation", "repo_index.json")
+SKIP_DIRS = {".git", "node_modules", "__pycache__"}
+
+_index_lock = threading.Lock()
+
+
+def _scan_dir(path, include_nested):
+    """Lists a directory and returns its index entry: [mtime_ns, is_repo, subdirs]."""
+    mtime_ns = os.stat(path).st_mtime_ns
+    is_repo = False
+    subdirs = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.name == ".git":
+                is_repo = True  # A directory for normal clones, a file for worktrees/submodules
+                continue
+            if entry.name in SKIP_DIRS:
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.name)
+            except OSError:
+                continue
+    if is_repo and not include_nested:
+        subdirs = []  # Never descend into a repository's working tree
+    return [mtime_ns, is_repo, sorted(subdirs)]
+
+
+def _visit(path, cached, include_nested):
+    """Returns the index entry for path, reusing the cached one if the mtime is unchanged."""
+    try:
+        if cached is not None and os.stat(path).st_mtime_ns == cached[0]:
+            return cached
+        return _scan_dir(path, include_nested)
+    except OSError:
+        return None  # Vanished or unreadable directory
+
+
+def load_index(index_path, base_path, include_nested=False):
+    """Loads a persisted index, returning {} if it is missing, stale or for other settings."""
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if (
+        data.get("version") != INDEX_VERSION
+        or data.get("base_path") != os.path.abspath(base_path)
+        or data.get("include_nested") != include_nested
+    ):
+        return {}
+    return data.get("dirs", {})
+
+
+def save_index(index_path, base_path, include_nested, dirs):
+    """Atomically writes the index so a crash never leaves a truncated file behind."""
+    directory = os.path.dirname(os.path.abspath(index_path))
+    os.makedirs(directory, exist_ok=True)
+    data = {
+        "version": INDEX_VERSION,
+        "base_path": os.path.abspath(base_path),
+        "include_nested": include_nested,
+        "dirs": dirs,
+    }
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, index_path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def discover_repos(base_path, include_nested=False, max_workers=None, index_path=None, on_repos=None):
+    """Returns a sorted list of Git repository directories under base_path.
+
+    Each level of the tree is listed concurrently. With include_nested the scan
+    also descends into repositories to find nested repos and submodules. When
+    index_path is given, unchanged directories are served from the index.
+    on_repos(repos) is called with the sorted repositories of each level as
+    soon as that level has been listed.
+    """
+    with span("discover", base_path=base_path) as current:
+        cached_dirs = load_index(index_path, base_path, include_nested) if index_path else {}
+        dirs = {}
+        repos = []
+        frontier = [base_path]
+        with ThreadPoolExecutor(max_workers=max_workers or default_workers(per_cpu=4)) as pool:  # Listing is I/O bound
+            while frontier:
+                entries = pool.map(lambda p: _visit(p, cached_dirs.get(p), include_nested), frontier)
+                next_frontier = []
+                found = []
+                for path, entry in zip(frontier, entries):
+                    if entry is None:
+                        continue
+                    dirs[path] = entry
+                    _, is_repo, subdirs = entry
+                    if is_repo:
+                        found.append(path)
+                    next_frontier.extend(os.path.join(path, name) for name in subdirs)
+                repos.extend(found)
+                if found and on_repos is not None:
+                    on_repos(sorted(found))
+                frontier = next_frontier
+        reused = sum(1 for path, entry in dirs.items() if cached_dirs.get(path) is entry)
+        current.attrs.update(repos=len(repos), dirs=len(dirs), dirs_reused=reused)
+
+    if index_path:
+        try:
+            save_index(index_path, base_path, include_nested, dirs)
+        except OSError:
+            pass  # The index is only an optimisation
+    return sorted(repos)
+
+
+def add_repo_to_index(index_path, base_path, repo_path, include_nested=False):
+    """Records a newly created repository in the index without walking the base path.
+
+    Re-lists only the new repository and its parent directory. Returns the
+    sorted repository list the updated index describes.
+    """
+    with _index_lock:
+        dirs = load_index(index_path, base_path, include_nested)
+        parent = os.path.dirname(repo_path)
+        for path in (parent, repo_path):
+            entry = _visit(path, None, include_nested)
+            if entry is not None:
+                dirs[path] = entry
+        try:
+            save_index(index_path, base_path, include_nested, dirs)
+        except OSError:
+            pass
+    return repos_from_index(dirs, base_path)
+
+
+def cached_repos(index_path, base_path, include_nested=False):
+    """Returns the repositories recorded by the last scan without touching the tree ([] if there is no index)."""
+    return repos_from_index(load_index(index_path, base_path, include_nested), base_path)
+
+
+def repos_from_index(dirs, base_path):
+    """Returns the repositories reachable from base_path in an index's directory entries."""
+    repos = []
+    stack = [base_path]
+    while stack:
+        path = stack.pop()
+        entry = dirs.get(path)
+        if entry is None:
+            continue
+        _, is_repo, subdirs = entry
+        if is_repo:
+            repos.append(path)
+        stack.extend(os.path.join(path, name) for name in subdirs)
+    return sorted(repos)
@@ -0,0 +1,48 @@
+"""Background job execution for the GUI.
+
+Jobs run on a thread pool; anything that must touch Tk widgets is posted to a
+thread-safe queue and executed on the main thread by ``poll``, which re-arms
+itself with ``root.after`` so the event loop is never blocked.
+"""
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+POLL_INTERVAL_MS = 16  # ~60fps
+MAX_EVENTS_PER_TICK = 500
+
+
+class JobExecutor:
+    """Thread pool whose callbacks are delivered on the Tk main thread."""
+
+    def __init__(self, max_workers=4):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="git-job")
+        self._events = queue.SimpleQueue()
+
+    def post(self, callback, *args):
+        """Schedules callback(*args) on the main thread. Safe to call from any thread."""
+        self._events.put((callback, args))
+
+    def submit(self, fn, *args, on_done=None, **kwargs):
+        """Runs fn(*args, **kwargs) in the background; on_done(future) runs on the main thread."""
+        future = self._pool.submit(fn, *args, **kwargs)
+        if on_done is not None:
+            future.add_done_callback(lambda f: self.post(on_done, f))
+        return future
+
+    def poll(self, root, interval_ms=POLL_INTERVAL_MS):
+        """Drains pending callbacks and re-arms itself on root's event loop."""
+        # Re-arm first so a failing callback cannot stop the polling loop
+        root.after(interval_ms, self.poll, root, interval_ms)
+        for _ in range(MAX_EVENTS_PER_TICK):
+            try:
+                callback, args = self._events.get_nowait()
+            except queue.Empty:
+                break
+            callback(*args)
+
+    def shutdown(self, wait=False, cancel_pending=True):
+        """Stops accepting jobs; running git commands are allowed to finish.
+
+        Jobs that have not started yet are dropped unless cancel_pending is False.
+        """
+        self._pool.shutdown(wait=wait, cancel_futures=cancel_pending)
@@ -0,0 +1,249 @@
+"""Helpers for running git subprocesses.
+
+Long network operations (push, clone, fetch) go through stream_git, which
+reads git's ``--progress`` output as it arrives, enforces an overall and a
+stall timeout and can be cancelled from another thread. Git runs in its own
+process group so cancellation reaches ssh or credential helpers it spawned;
+it is asked to stop first (letting git remove its lock files) and killed
+only if it does not exit within a short grace period.
+"""
+import os
+import re
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections import namedtuple
+
+from git_automation.metrics import span
+
+GitProgress = namedtuple("GitProgress", ["phase", "percent", "done", "total", "bytes", "rate"])
+
+# Network operations that print nothing (not even progress) for this long are stopped
+DEFAULT_STALL_TIMEOUT = 300
+KILL_GRACE_SECONDS = 3.0
+_POLL_SECONDS = 0.1
+_UNITS = {"bytes": 1, "KiB": 1024, "MiB": 1024 ** 2, "GiB": 1024 ** 3}
+_PROGRESS_RE = re.compile(
+    r"^(?:remote: )?(?P<phase>[A-Za-z][A-Za-z ]*):\s+(?P<percent>\d+)% \((?P<done>\d+)/(?P<total>\d+)\)"
+    r"(?:, (?P<size>[\d.]+) (?P<unit>bytes|[KMG]iB)(?: \| (?P<rate>[\d.]+) (?P<rate_unit>bytes|[KMG]iB)/s)?)?"
+)
+
+
+def no_log(message, status="INFO"):
+    """Default log callback that discards messages."""
+
+
+def mtime_ns(path):
+    """Returns path's modification time in nanoseconds, or None if it cannot be read."""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def default_workers(per_cpu=2):
+    """Thread count for fanning git or file system work out over many repositories."""
+    return min(32, (os.cpu_count() or 1) * per_cpu)
+
+
+class GitCancelled(subprocess.SubprocessError):
+    """Raised when a streamed git command is cancelled by the caller."""
+
+    def __init__(self, cmd):
+        super().__init__(cmd)
+        self.cmd = cmd
+
+    def __str__(self):
+        return f"Command '{' '.join(self.cmd)}' was cancelled."
+
+
+def run_git(args, cwd, check=True, input=None, env=None):
+    """Runs a git command and returns the CompletedProcess with captured text output.
+
+    env holds extra environment variables layered over the current environment.
+    """
+    return subprocess.run(
+        ["git", *args], cwd=cwd, capture_output=True, text=True, errors="surrogateescape",
+        input=input, check=check, env={**os.environ, **env} if env else None
+    )
+
+
+def parse_progress(line):
+    """Parses a git progress line such as "Receiving objects:  45% (450/1000), 1.20 MiB | 2.40 MiB/s".
+
+    Returns a GitProgress (bytes and rate in bytes and bytes per second, or
+    None when git did not report them), or None for any other line.
+    """
+    match = _PROGRESS_RE.match(line.strip())
+    if match is None:
+        return None
+    size = rate = None
+    if match["size"]:
+        size = float(match["size"]) * _UNITS[match["unit"]]
+    if match["rate"]:
+        rate = float(match["rate"]) * _UNITS[match["rate_unit"]]
+    return GitProgress(match["phase"], int(match["percent"]), int(match["done"]), int(match["total"]), size, rate)
+
+
+def format_bytes(count):
+    """Formats a byte count the way git does, e.g. "1.20 MiB"."""
+    for unit in ("bytes", "KiB", "MiB"):
+        if count < 1024:
+            return f"{count:.0f} {unit}" if unit == "bytes" else f"{count:.2f} {unit}"
+        count /= 1024
+    return f"{count:.2f} GiB"
+
+
+def format_progress(progress):
+    """Formats a GitProgress as e.g. "Receiving objects 45% (450/1000), 1.20 MiB at 2.40 MiB/s"."""
+    text = f"{progress.phase} {progress.percent}% ({progress.done}/{progress.total})"
+    if progress.bytes is not None:
+        text += f", {format_bytes(progress.bytes)}"
+    if progress.rate is not None:
+        text += f" at {format_bytes(progress.rate)}/s"
+    return text
+
+
+def _popen_group_options():
+    if sys.platform == "win32":
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+
+def _stop_group(process):
+    """Asks git's process group to exit, then kills it after KILL_GRACE_SECONDS."""
+    if process.poll() is not None:
+        return
+    try:
+        if sys.platform == "win32":
+            process.send_signal(signal.CTRL_BREAK_EVENT)
+        else:
+            os.killpg(process.pid, signal.SIGTERM)
+        process.wait(KILL_GRACE_SECONDS)
+        return
+    except (OSError, subprocess.TimeoutExpired):
+        pass
+    if sys.platform == "win32":
+        subprocess.run(["taskkill", "/F", "/T", "/PID", str(process.pid)], capture_output=True)
+    else:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except OSError:
+            pass
+    process.wait()
+
+
+def stream_git(args, cwd, check=True, env=None, on_progress=None, timeout=None, stall_timeout=None, cancel=None):
+    """Runs a git command, reporting progress as it goes; returns a CompletedProcess.
+
+    on_progress(GitProgress) is called from a reader thread for every progress
+    update on stderr (add --progress to args, since git only reports progress
+    to a terminal by default). timeout bounds the whole command and
+    stall_timeout the time without any output; either raises
+    subprocess.TimeoutExpired. Setting the cancel Event raises GitCancelled.
+    In every case the process group is stopped before the exception is
+    raised. The returned stderr keeps completed lines only, not the
+    intermediate progress redraws.
+    """
+    command = ["git", *args]
+    process = subprocess.Popen(
+        command, cwd=cwd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        env={**os.environ, **env} if env else None, **_popen_group_options()
+    )
+    stdout_chunks = []
+    stderr_lines = []
+    last_output = [time.monotonic()]
+
+    def read_stdout():
+        for chunk in iter(lambda: process.stdout.read1(65536), b""):
+            stdout_chunks.append(chunk)
+            last_output[0] = time.monotonic()
+
+    def read_stderr():
+        pending = b""
+        for chunk in iter(lambda: process.stderr.read1(65536), b""):
+            last_output[0] = time.monotonic()
+            pending += chunk
+            parts = re.split(rb"(\r|\n)", pending)
+            pending = parts.pop()
+            for text, end in zip(parts[::2], parts[1::2]):
+                line = text.decode("utf-8", "surrogateescape")
+                if end == b"\n":
+                    stderr_lines.append(line)
+                if on_progress is not None:
+                    progress = parse_progress(line)
+                    if progress is not None:
+                        on_progress(progress)
+        if pending:
+            stderr_lines.append(pending.decode("utf-8", "surrogateescape"))
+
+    readers = [threading.Thread(target=read_stdout, daemon=True), threading.Thread(target=read_stderr, daemon=True)]
+    for reader in readers:
+        reader.start()
+
+    started = time.monotonic()
+    try:
+        while True:
+            try:
+                process.wait(_POLL_SECONDS)
+                break
+            except subprocess.TimeoutExpired:
+                pass
+            now = time.monotonic()
+            if cancel is not None and cancel.is_set():
+                raise GitCancelled(command)
+            if timeout is not None and now - started > timeout:
+                raise subprocess.TimeoutExpired(command, timeout)
+            if stall_timeout is not None and now - last_output[0] > stall_timeout:
+                raise subprocess.TimeoutExpired(command, stall_timeout)
+    except BaseException:
+        _stop_group(process)  # Also on KeyboardInterrupt: git is not in our process group
+        raise
+    finally:
+        for reader in readers:
+            reader.join()
+        process.stdout.close()
+        process.stderr.close()
+
+    stdout = b"".join(stdout_chunks).decode("utf-8", "surrogateescape")
+    stderr = "".join(line + "\n" for line in stderr_lines)
+    if check and process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, command, stdout, stderr)
+    return subprocess.CompletedProcess(command, process.returncode, stdout, stderr)
+
+
+def stream_options(stream=None):
+    """Returns stream_git options for a network operation, with the default stall timeout filled in."""
+    return {"stall_timeout": DEFAULT_STALL_TIMEOUT, **(stream or {})}
+
+
+def traced_git(stage, args, cwd, check=True, collect=None, ok_codes=(0,), input=None, env=None, stream=None,
+               **attrs):
+    """Runs a git command inside a metrics span that records its exit code and output size.
+
+    Exit codes outside ok_codes mark the span as failed. The finished span is
+    also appended to collect when a list is given. stream, a dict of
+    stream_git options (on_progress, timeout, stall_timeout, cancel), runs
+    the command through stream_git instead of run_git.
+    """
+    with span(stage, repo=cwd, **attrs) as current:
+        try:
+            if stream is not None:
+                result = stream_git(args, cwd, check=check, env=env, **stream)
+            else:
+                result = run_git(args, cwd, check=check, input=input, env=env)
+        finally:
+            if collect is not None:
+                collect.append(current)
+        current.attrs["exit_code"] = result.returncode
+        current.attrs["failed"] = result.returncode not in ok_codes
+        current.attrs["bytes"] = len(result.stdout) + len(result.stderr)
+    return result
+
+
+def describe_error(error):
+    """Formats a git failure, including git's own stderr when it was captured."""
+    stderr = (getattr(error, "stderr", None) or "").strip()
+    return f"{error}: {stderr}" if stderr else str(error)
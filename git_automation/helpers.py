@@ -0,0 +1,199 @@
+"""Long-lived ``git cat-file`` helpers for cheap object and ref lookups.
+
+Resolving a revision or reading an object normally costs a whole git
+process. A CatFileHelper keeps ``git cat-file --batch-check`` (and, on
+first use, ``--batch``) running per repository and answers each query with
+one line over a pipe. Refs are re-read by git on every request, so lookups
+see updates made by other processes.
+
+HelperPool bounds the number of repositories with running helpers (least
+recently used are closed first) and closes helpers that have been idle for
+idle_timeout seconds, both when the pool is used and from a daemon timer
+that runs while any helper is open, so git processes do not linger after
+the last lookup. The module-level ``pool`` is shared by the package and
+closed at interpreter exit.
+"""
+import atexit
+import os
+import subprocess
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+DEFAULT_MAX_HELPERS = 32
+DEFAULT_IDLE_TIMEOUT = 60.0
+
+ObjectInfo = namedtuple("ObjectInfo", ["oid", "type", "size"])
+
+_OBJECT_TYPES = {b"commit", b"tree", b"blob", b"tag"}
+
+
+class CatFileHelper:
+    """cat-file batch processes for one repository; every request is serialized by a lock."""
+
+    def __init__(self, repo_path):
+        self.repo_path = repo_path
+        self.last_used = time.monotonic()
+        self.requests = 0
+        self.spawned = 0
+        self._lock = threading.Lock()
+        self._processes = {}  # "--batch-check" / "--batch" -> Popen
+        self._closed = False
+
+    def _process(self, mode):
+        if self._closed:
+            raise OSError(f"cat-file helper for {self.repo_path} was closed")
+        process = self._processes.get(mode)
+        if process is None or process.poll() is not None:
+            process = subprocess.Popen(
+                ["git", "cat-file", mode], cwd=self.repo_path,
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+            )
+            self._processes[mode] = process
+            self.spawned += 1
+        return process
+
+    def _request(self, mode, rev):
+        """Sends one revision and returns (process, header fields or None if missing)."""
+        if "\n" in rev:
+            return None, None
+        for attempt in (1, 2):
+            process = self._process(mode)
+            try:
+                process.stdin.write(rev.encode("utf-8", "surrogateescape") + b"\n")
+                process.stdin.flush()
+                header = process.stdout.readline()
+            except (BrokenPipeError, ValueError):
+                header = b""
+            if header:
+                break
+            self._processes.pop(mode, None)  # The helper died; start a fresh one once
+            if attempt == 2:
+                raise OSError(f"git cat-file {mode} exited in {self.repo_path}")
+        self.requests += 1
+        self.last_used = time.monotonic()
+        fields = header.split()
+        if len(fields) != 3 or fields[1] not in _OBJECT_TYPES:
+            return process, None  # "<rev> missing" or "<rev> ambiguous"
+        return process, fields
+
+    def info(self, rev):
+        """Returns the ObjectInfo rev resolves to, or None if it does not exist."""
+        with self._lock:
+            _, fields = self._request("--batch-check", rev)
+        if fields is None:
+            return None
+        return ObjectInfo(fields[0].decode(), fields[1].decode(), int(fields[2]))
+
+    def read(self, rev):
+        """Returns (ObjectInfo, raw content bytes) for rev, or None if it does not exist."""
+        with self._lock:
+            process, fields = self._request("--batch", rev)
+            if fields is None:
+                return None
+            size = int(fields[2])
+            content = process.stdout.read(size)
+            process.stdout.read(1)  # Trailing newline after the content
+        return ObjectInfo(fields[0].decode(), fields[1].decode(), size), content
+
+    def close(self):
+        """Stops the helper processes."""
+        with self._lock:
+            self._closed = True
+            for process in self._processes.values():
+                try:
+                    process.stdin.close()
+                    process.wait(timeout=1)
+                except (OSError, subprocess.TimeoutExpired):
+                    process.kill()
+                    process.wait()
+                process.stdout.close()
+            self._processes.clear()
+
+
+class HelperPool:
+    """Hands out one CatFileHelper per repository, with LRU and idle eviction."""
+
+    def __init__(self, max_helpers=DEFAULT_MAX_HELPERS, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        self.max_helpers = max_helpers
+        self.idle_timeout = idle_timeout
+        self.evicted = 0
+        self._lock = threading.Lock()
+        self._helpers = OrderedDict()  # repo -> CatFileHelper, least recently used first
+        self._reaper = None  # Timer that calls close_idle while helpers are open
+
+    def _pop_idle(self, now):
+        return [self._helpers.pop(repo) for repo, helper in list(self._helpers.items())
+                if now - helper.last_used > self.idle_timeout]
+
+    def _schedule_reaper(self):
+        """Starts the idle reaper timer if helpers are open and none is pending; call with the lock held."""
+        if self._reaper is None and self._helpers:
+            self._reaper = threading.Timer(self.idle_timeout, self._reap)
+            self._reaper.daemon = True
+            self._reaper.start()
+
+    def _reap(self):
+        with self._lock:
+            self._reaper = None
+        self.close_idle()
+        with self._lock:
+            self._schedule_reaper()
+
+    def get(self, repo_path):
+        """Returns the repository's helper, evicting idle and least recently used ones."""
+        repo_path = os.path.abspath(repo_path)  # A relative path names a different repository after a chdir
+        with self._lock:
+            helper = self._helpers.pop(repo_path, None) or CatFileHelper(repo_path)
+            stale = self._pop_idle(time.monotonic())
+            while len(self._helpers) >= self.max_helpers:
+                stale.append(self._helpers.popitem(last=False)[1])
+            self._helpers[repo_path] = helper
+            self.evicted += len(stale)
+            self._schedule_reaper()
+        for old in stale:
+            old.close()
+        return helper
+
+    def close_idle(self):
+        """Stops helpers that have been idle for longer than idle_timeout and returns how many were stopped."""
+        with self._lock:
+            stale = self._pop_idle(time.monotonic())
+            self.evicted += len(stale)
+        for old in stale:
+            old.close()
+        return len(stale)
+
+    def lookup(self, repo_path, rev):
+        """Returns the ObjectInfo rev resolves to in repo_path, or None."""
+        return self.get(repo_path).info(rev)
+
+    def read(self, repo_path, rev):
+        """Returns (ObjectInfo, content) for rev in repo_path, or None."""
+        return self.get(repo_path).read(rev)
+
+    def stats(self):
+        """Returns open helper count, processes spawned, requests served and evictions."""
+        with self._lock:
+            helpers = list(self._helpers.values())
+        return {
+            "helpers": len(helpers),
+            "spawned": sum(h.spawned for h in helpers),
+            "requests": sum(h.requests for h in helpers),
+            "evicted": self.evicted,
+        }
+
+    def close_all(self):
+        """Stops every helper and the idle reaper."""
+        with self._lock:
+            helpers = list(self._helpers.values())
+            self._helpers.clear()
+            if self._reaper is not None:
+                self._reaper.cancel()
+                self._reaper = None
+        for helper in helpers:
+            helper.close()
+
+
+pool = HelperPool()
+atexit.register(pool.close_all)
@@ -0,0 +1,75 @@
+"""Bounded, batched sink for the GUI log panel.
+
+Writers append lines to a bounded ring buffer from any thread. The Tk main
+thread flushes everything pending with a single insert at a fixed frame
+rate and trims the widget to a maximum number of lines, so the cost of a
+log call stays constant however long the session runs.
+"""
+import threading
+from collections import deque
+
+DEFAULT_MAX_LINES = 5000
+FLUSH_INTERVAL_MS = 33  # ~30fps is plenty for a log
+
+
+class LogSink:
+    """Thread-safe log buffer that flushes into a Tk Text widget."""
+
+    def __init__(self, max_lines=DEFAULT_MAX_LINES, flush_interval_ms=FLUSH_INTERVAL_MS):
+        self.max_lines = max_lines
+        self.flush_interval_ms = flush_interval_ms
+        self._lock = threading.Lock()
+        self._pending = deque(maxlen=max_lines)
+        self._dropped = 0
+        self._clear_requested = False
+        self._widget = None
+        self._widget_lines = 0
+
+    def write(self, line):
+        """Queues one log entry (it may span several lines). Safe to call from any thread."""
+        with self._lock:
+            if len(self._pending) == self._pending.maxlen:
+                self._dropped += 1  # Would have been trimmed on the next flush anyway
+            self._pending.append(line)
+
+    def clear(self):
+        """Empties the panel and anything still pending."""
+        with self._lock:
+            self._pending.clear()
+            self._dropped = 0
+            self._clear_requested = True
+
+    def attach(self, root, widget):
+        """Starts flushing into widget on root's event loop."""
+        self._widget = widget
+        root.after(self.flush_interval_ms, self._flush_loop, root)
+
+    def _flush_loop(self, root):
+        root.after(self.flush_interval_ms, self._flush_loop, root)
+        self.flush()
+
+    def flush(self):
+        """Writes pending lines to the widget in one insert and trims old lines. Main thread only."""
+        with self._lock:
+            lines = list(self._pending)
+            self._pending.clear()
+            dropped, self._dropped = self._dropped, 0
+            clear_requested, self._clear_requested = self._clear_requested, False
+        widget = self._widget
+        if widget is None:
+            return
+        if clear_requested:
+            widget.delete("1.0", "end")
+            self._widget_lines = 0
+        if not lines:
+            return
+        if dropped:
+            lines.insert(0, f"... {dropped} older log lines dropped ...")
+        text = "\n".join(lines) + "\n"
+        widget.insert("end", text)
+        self._widget_lines += text.count("\n")
+        excess = self._widget_lines - self.max_lines
+        if excess > 0:
+            widget.delete("1.0", f"{excess + 1}.0")
+            self._widget_lines -= excess
+        widget.see("end")  # Auto-scroll once per frame
@@ -0,0 +1,149 @@
+"""Repository maintenance that keeps status and branch queries fast.
+
+For every repository, on a bounded thread pool:
+
+1. time git status and get_branches (median of a few runs, branch cache
+   cleared so refs are really read),
+2. run the maintenance tasks: pack loose refs, pack loose objects into a new
+   pack (incremental, existing packs are left alone), write the
+   multi-pack-index (skipped while there are no packs) and an incremental
+   (split) commit-graph, and enable the untracked cache (and optionally
+   fsmonitor), then write the untracked cache into the index with one
+   untimed status,
+3. time the same queries again.
+
+Status is timed with the repository's own config and without optional
+locks, so the samples neither turn the untracked cache on nor write it to
+the index; only the maintenance step does.
+
+The timings are taken on a busy machine when several repositories are
+maintained at once, so small differences are noise; a repository counts as
+improved only when a query got at least IMPROVEMENT_THRESHOLD faster.
+"""
+import glob
+import os
+import statistics
+import subprocess
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from git_automation.core import get_branches
+from git_automation.gitcmd import describe_error, no_log, traced_git
+from git_automation.refs import clear_cache, common_dir, find_git_dir
+from git_automation.status import enable_fast_status, iter_status
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_SAMPLES = 5
+IMPROVEMENT_THRESHOLD = 0.20
+
+MaintenanceTask = namedtuple("MaintenanceTask", ["name", "args"])
+MaintenanceResult = namedtuple(
+    "MaintenanceResult",
+    ["repo", "status_before", "status_after", "branches_before", "branches_after", "tasks", "duration", "error"]
+)
+
+TASKS = [
+    MaintenanceTask("pack_refs", ["pack-refs", "--all", "--prune"]),
+    MaintenanceTask("loose_objects", ["repack", "-d", "-l", "-q"]),
+    MaintenanceTask("multi_pack_index", ["multi-pack-index", "write"]),
+    MaintenanceTask("commit_graph", ["commit-graph", "write", "--reachable", "--split"]),
+]
+
+
+def _has_packs(repo_path):
+    """True if the repository has a pack file for multi-pack-index to cover (it fails on none)."""
+    pack_dir = os.path.join(common_dir(find_git_dir(repo_path)), "objects", "pack")
+    return bool(glob.glob(os.path.join(glob.escape(pack_dir), "*.pack")))
+
+
+def _median_seconds(fn, samples, setup=None):
+    timings = []
+    for _ in range(samples):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def measure_queries(repo_path, samples=DEFAULT_SAMPLES):
+    """Returns the median (status, branch listing) latency of a repository in seconds."""
+    status = _median_seconds(lambda: list(iter_status(repo_path, optional_locks=False)), samples)
+    branches = _median_seconds(lambda: get_branches(repo_path), samples, lambda: clear_cache(repo_path))
+    return status, branches
+
+
+def improved(result, threshold=IMPROVEMENT_THRESHOLD):
+    """True if status or branch listing got faster by more than threshold."""
+    if result.error:
+        return False
+    return (result.status_after < result.status_before * (1 - threshold)
+            or result.branches_after < result.branches_before * (1 - threshold))
+
+
+def maintain_repo(repo_path, tasks=TASKS, fsmonitor=False, samples=DEFAULT_SAMPLES, log=no_log):
+    """Measures, maintains and re-measures one repository; returns a MaintenanceResult."""
+    start_time = time.time()
+    done = []
+    status_before = branches_before = 0.0
+    try:
+        status_before, branches_before = measure_queries(repo_path, samples)
+        for task in tasks:
+            if task.name == "multi_pack_index" and not _has_packs(repo_path):
+                continue  # Nothing was packed, e.g. a repository without commits
+            traced_git(f"maintenance.{task.name}", task.args, repo_path)
+            done.append(task.name)
+        enable_fast_status(repo_path, fsmonitor)
+        list(iter_status(repo_path))  # Writes the now enabled untracked cache into the index
+        done.append("fast_status")
+        status_after, branches_after = measure_queries(repo_path, samples)
+    except (subprocess.CalledProcessError, OSError) as e:
+        log(f"Maintenance failed for {repo_path} after {', '.join(done) or 'no tasks'}: {describe_error(e)}", "ERROR")
+        return MaintenanceResult(repo_path, status_before, 0.0, branches_before, 0.0, done,
+                                 time.time() - start_time, describe_error(e))
+    return MaintenanceResult(repo_path, status_before, status_after, branches_before, branches_after, done,
+                             time.time() - start_time, "")
+
+
+def run_maintenance(repos, max_workers=DEFAULT_MAX_WORKERS, tasks=TASKS, fsmonitor=False,
+                    samples=DEFAULT_SAMPLES, log=no_log, on_result=None):
+    """Maintains every repository concurrently and returns their MaintenanceResults in input order.
+
+    on_result(result) is called from worker threads as repositories finish.
+    """
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="git-maintenance") as pool:
+        futures = {pool.submit(maintain_repo, repo, tasks, fsmonitor, samples, log): repo for repo in repos}
+        for future in as_completed(futures):
+            result = future.result()
+            results[futures[future]] = result
+            if on_result is not None:
+                on_result(result)
+    return [results[repo] for repo in repos]
+
+
+def _change(before, after):
+    return f"{(after - before) / before:+.0%}" if before else "n/a"
+
+
+def format_maintenance(results):
+    """Renders MaintenanceResults as a plain-text table of before/after latencies with a summary line."""
+    width = max([len(r.repo) for r in results] + [len("Repository")])
+    lines = [f"{'Repository':<{width}}  {'Status ms':>17}  {'Change':>6}  {'Branches ms':>15}  {'Change':>6}  Result"]
+    for r in results:
+        if r.error:
+            lines.append(f"{r.repo:<{width}}  {'':>17}  {'':>6}  {'':>15}  {'':>6}  failed: {r.error}")
+            continue
+        status = f"{r.status_before * 1000:.1f} -> {r.status_after * 1000:.1f}"
+        branches = f"{r.branches_before * 1000:.2f} -> {r.branches_after * 1000:.2f}"
+        lines.append(
+            f"{r.repo:<{width}}  {status:>17}  {_change(r.status_before, r.status_after):>6}  "
+            f"{branches:>15}  {_change(r.branches_before, r.branches_after):>6}  "
+            f"{'improved' if improved(r) else 'unchanged'}"
+        )
+    better = sum(1 for r in results if improved(r))
+    failed = sum(1 for r in results if r.error)
+    lines.append(f"{len(results)} repositories: {better} improved, {failed} failed")
+    return "\n".join(lines)
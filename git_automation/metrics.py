@@ -0,0 +1,165 @@
+"""Timing spans for git operations and their export.
+
+Each stage of the pipeline (and discovery, branch listing, status and
+clone) records a named span with its duration and attributes such as repo,
+branch, exit code and output byte counts. Spans can be written as JSON
+lines or aggregated into a Prometheus textfile (histograms per stage, so
+dashboards can compute p95 with histogram_quantile).
+"""
+import json
+import os
+import subprocess
+import tempfile
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+DEFAULT_MAX_SPANS = 10000
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+METRIC_PREFIX = "git_automation"
+
+
+class Span:
+    """One timed operation."""
+
+    __slots__ = ("name", "start", "duration", "attrs")
+
+    def __init__(self, name, start, duration=0.0, attrs=None):
+        self.name = name
+        self.start = start
+        self.duration = duration
+        self.attrs = attrs or {}
+
+    @property
+    def failed(self):
+        if "failed" in self.attrs:
+            return self.attrs["failed"]
+        return bool(self.attrs.get("exit_code")) or "error" in self.attrs
+
+    def to_dict(self):
+        return {"name": self.name, "start": self.start, "duration": self.duration, **self.attrs}
+
+
+class Recorder:
+    """Thread-safe, bounded store of finished spans."""
+
+    def __init__(self, max_spans=DEFAULT_MAX_SPANS):
+        self._lock = threading.Lock()
+        self._spans = deque(maxlen=max_spans)
+        self._added = 0  # Spans ever added; marks for spans_since count from here
+
+    @contextmanager
+    def span(self, name, **attrs):
+        """Times the enclosed block; the yielded Span's attrs can be extended inside it."""
+        current = Span(name, time.time(), attrs=attrs)
+        start = time.perf_counter()
+        try:
+            yield current
+        except subprocess.CalledProcessError as e:
+            current.attrs["exit_code"] = e.returncode
+            raise
+        except Exception as e:
+            current.attrs["error"] = type(e).__name__
+            raise
+        finally:
+            current.duration = time.perf_counter() - start
+            self.add(current)
+
+    def record(self, name, start, duration, **attrs):
+        """Adds a span measured by the caller (start is a time.time() timestamp)."""
+        self.add(Span(name, start, duration, attrs))
+
+    def add(self, span):
+        with self._lock:
+            self._spans.append(span)
+            self._added += 1
+
+    def spans(self):
+        """Returns a snapshot of the recorded spans."""
+        with self._lock:
+            return list(self._spans)
+
+    def spans_since(self, mark=0):
+        """Returns (spans added after mark that are still kept, the mark to pass next time)."""
+        with self._lock:
+            first = self._added - len(self._spans)
+            return list(self._spans)[max(mark - first, 0):], self._added
+
+    def drain(self):
+        """Returns and forgets the recorded spans."""
+        with self._lock:
+            spans = list(self._spans)
+            self._spans.clear()
+        return spans
+
+
+recorder = Recorder()
+span = recorder.span
+
+
+def format_durations(spans):
+    """Renders spans as "name 0.12s, ..." for log messages."""
+    return ", ".join(f"{s.name} {s.duration:.2f}s" for s in spans)
+
+
+def write_jsonl(spans, path):
+    """Appends spans to a JSON-lines file."""
+    with open(path, "a", encoding="utf-8") as f:
+        for s in spans:
+            f.write(json.dumps(s.to_dict(), default=str) + "\n")
+
+
+def prometheus_text(spans, buckets=DEFAULT_BUCKETS):
+    """Aggregates spans into Prometheus text exposition format.
+
+    Only the stage name and outcome are used as labels; repository paths
+    would explode label cardinality on large workspaces.
+    """
+    stages = {}
+    for s in spans:
+        stage = stages.setdefault(s.name, {"counts": [0] * len(buckets), "sum": 0.0, "count": 0,
+                                           "failures": 0, "bytes": 0})
+        for i, bound in enumerate(buckets):
+            if s.duration <= bound:
+                stage["counts"][i] += 1
+        stage["sum"] += s.duration
+        stage["count"] += 1
+        stage["failures"] += 1 if s.failed else 0
+        stage["bytes"] += s.attrs.get("bytes", 0)
+
+    duration = f"{METRIC_PREFIX}_stage_duration_seconds"
+    lines = [
+        f"# HELP {duration} Duration of git automation stages.",
+        f"# TYPE {duration} histogram",
+    ]
+    for name, stage in sorted(stages.items()):
+        for bound, count in zip(buckets, stage["counts"]):
+            lines.append(f'{duration}_bucket{{stage="{name}",le="{bound}"}} {count}')
+        lines.append(f'{duration}_bucket{{stage="{name}",le="+Inf"}} {stage["count"]}')
+        lines.append(f'{duration}_sum{{stage="{name}"}} {stage["sum"]:.6f}')
+        lines.append(f'{duration}_count{{stage="{name}"}} {stage["count"]}')
+    for metric, key, help_text in (
+        ("stage_failures_total", "failures", "Stages that exited non-zero or raised."),
+        ("stage_output_bytes_total", "bytes", "Bytes of git output read per stage."),
+    ):
+        full = f"{METRIC_PREFIX}_{metric}"
+        lines.append(f"# HELP {full} {help_text}")
+        lines.append(f"# TYPE {full} counter")
+        for name, stage in sorted(stages.items()):
+            lines.append(f'{full}{{stage="{name}"}} {stage[key]}')
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus_textfile(spans, path):
+    """Atomically writes the Prometheus textfile, as node_exporter's textfile collector expects."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(prometheus_text(spans))
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
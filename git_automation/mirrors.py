@@ -0,0 +1,180 @@
+"""Local cache of bare mirror repositories for fast repeated clones.
+
+The first clone of an upstream creates ``git clone --mirror`` in the cache;
+later clones are local clones from that mirror (objects are hard-linked, so
+only the checkout costs time) with ``origin`` re-pointed at the upstream.
+Mirrors are refreshed incrementally with ``git remote update --prune`` once
+they are older than the refresh interval, and the least recently used ones
+are evicted when the cache exceeds its size budget. Both transfers run
+through stream_git, so they honour the caller's progress callback,
+timeouts and cancel Event.
+"""
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+
+from git_automation.gitcmd import GitCancelled, stream_options, traced_git
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".git_automation", "mirrors")
+DEFAULT_MAX_BYTES = 20 * 1024 ** 3
+DEFAULT_REFRESH_INTERVAL = 300  # seconds
+METADATA_FILE = "cache.json"
+
+
+def _dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                continue
+    return total
+
+
+def normalize_url(url):
+    """Maps equivalent spellings of an upstream URL to one cache key."""
+    url = url.strip().rstrip("/")
+    return url[:-4] if url.endswith(".git") else url
+
+
+class MirrorCache:
+    """Thread-safe cache of bare mirrors keyed by upstream URL."""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES,
+                 refresh_interval=DEFAULT_REFRESH_INTERVAL):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._url_locks = {}
+        os.makedirs(cache_dir, exist_ok=True)
+        self._metadata = self._load()
+
+    def _load(self):
+        try:
+            with open(os.path.join(self.cache_dir, METADATA_FILE), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        data.setdefault("mirrors", {})
+        data.setdefault("hits", 0)
+        data.setdefault("misses", 0)
+        return data
+
+    def _save(self):
+        """Writes the metadata atomically. Caller holds self._lock."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self._metadata, f, indent=1)
+        os.replace(tmp_path, os.path.join(self.cache_dir, METADATA_FILE))
+
+    def mirror_path(self, url):
+        """Returns where the mirror for url lives (whether or not it exists yet)."""
+        digest = hashlib.sha1(normalize_url(url).encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{digest}.git")
+
+    def _url_lock(self, key):
+        with self._lock:
+            return self._url_locks.setdefault(key, threading.Lock())
+
+    def ensure(self, url, log=None, stream=None):
+        """Returns an up-to-date mirror path for url, creating or refreshing it as needed.
+
+        stream holds stream_git options (on_progress, timeout, stall_timeout,
+        cancel) for the transfer.
+        """
+        stream = stream_options(stream)
+        key = normalize_url(url)
+        path = self.mirror_path(url)
+        with self._url_lock(key):
+            with self._lock:
+                entry = self._metadata["mirrors"].get(key)
+            hit = entry is not None and os.path.isdir(path)
+            if not hit:
+                if os.path.exists(path):
+                    shutil.rmtree(path)
+                if log:
+                    log(f"Creating mirror of {url} in the clone cache...")
+                traced_git("mirror_clone", ["clone", "--mirror", "--progress", url, path], self.cache_dir,
+                           stream=stream, url=url)
+                entry = {"url": url, "path": path, "fetched": time.time()}
+            elif time.time() - entry.get("fetched", 0) > self.refresh_interval:
+                if log:
+                    log(f"Refreshing cached mirror of {url}...")
+                traced_git("mirror_fetch", ["remote", "update", "--prune"], path, stream=stream, url=url)
+                entry["fetched"] = time.time()
+            entry["last_used"] = time.time()
+            entry["size"] = _dir_size(path)
+            with self._lock:
+                self._metadata["mirrors"][key] = entry
+                self._metadata["hits" if hit else "misses"] += 1
+                self._evict(keep=key)
+                self._save()
+        return path
+
+    def _evict(self, keep=None):
+        """Removes least recently used mirrors until the cache fits max_bytes. Caller holds self._lock."""
+        mirrors = self._metadata["mirrors"]
+        total = sum(entry.get("size", 0) for entry in mirrors.values())
+        for key, entry in sorted(mirrors.items(), key=lambda item: item[1].get("last_used", 0)):
+            if total <= self.max_bytes:
+                break
+            url_lock = self._url_locks.get(key)
+            if key == keep or (url_lock is not None and url_lock.locked()):
+                continue  # Never evict a mirror that is in use
+            shutil.rmtree(entry["path"], ignore_errors=True)
+            total -= entry.get("size", 0)
+            del mirrors[key]
+
+    def refresh_all(self, log=None, stream=None):
+        """Fetches every cached mirror; returns the number of failures (a cancel counts as one and stops).
+
+        stream holds stream_git options, as for ensure.
+        """
+        stream = stream_options(stream)
+        failures = 0
+        with self._lock:
+            urls = [entry["url"] for entry in self._metadata["mirrors"].values()]
+        for url in urls:
+            key = normalize_url(url)
+            with self._url_lock(key):
+                try:
+                    traced_git("mirror_fetch", ["remote", "update", "--prune"], self.mirror_path(url),
+                               stream=stream, url=url)
+                except GitCancelled:
+                    failures += 1
+                    if log:
+                        log("Mirror refresh cancelled.", "WARNING")
+                    break
+                except (subprocess.SubprocessError, OSError) as e:
+                    failures += 1
+                    if log:
+                        log(f"Could not refresh mirror of {url}: {e}", "ERROR")
+                    continue
+                with self._lock:
+                    entry = self._metadata["mirrors"][key]
+                    entry["fetched"] = time.time()
+                    entry["size"] = _dir_size(entry["path"])
+        with self._lock:
+            self._save()
+        return failures
+
+    def stats(self):
+        """Returns hit/miss counts, hit rate, mirror count and total size."""
+        with self._lock:
+            hits = self._metadata["hits"]
+            misses = self._metadata["misses"]
+            mirrors = self._metadata["mirrors"]
+            return {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+                "mirrors": len(mirrors),
+                "bytes": sum(entry.get("size", 0) for entry in mirrors.values()),
+            }
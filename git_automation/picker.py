@@ -0,0 +1,108 @@
+"""Type-ahead picker for very long repository and branch lists.
+
+A search entry sits above a read-only combobox. Every keystroke queries a
+SearchIndex and loads only the best matches into the combobox, so typing
+and opening the list cost the same with 100 items or 100,000. Return picks
+the top match, Down opens the list and Escape clears the search.
+"""
+import tkinter as tk
+from tkinter import ttk
+
+from git_automation.search import DEFAULT_LIMIT, MAX_RECENT, SearchIndex
+
+MIN_WIDTH = 20
+
+
+class SearchPicker(tk.Frame):
+    """Search entry plus combobox that chooses one item out of a SearchIndex.
+
+    variable holds the chosen item. on_select(event) is called after an item
+    is picked from the list or with Return, like a <<ComboboxSelected>>
+    binding. key(item) is the text searched for each item.
+    """
+
+    def __init__(self, master, variable, on_select=None, key=None, limit=DEFAULT_LIMIT, recent=(), **kwargs):
+        super().__init__(master, **kwargs)
+        self.variable = variable
+        self.on_select = on_select
+        self.key = key
+        self.limit = limit
+        self.recent = list(recent)[:MAX_RECENT]
+        self.index = SearchIndex(key=key)
+        self._width = MIN_WIDTH
+
+        self.query_var = tk.StringVar()
+        self.entry = tk.Entry(self, textvariable=self.query_var, width=MIN_WIDTH)
+        self.entry.pack(fill=tk.X, pady=2)
+        self.combobox = ttk.Combobox(self, textvariable=variable, state="readonly", width=MIN_WIDTH)
+        self.combobox.pack(fill=tk.X, pady=2)
+
+        self.query_var.trace_add("write", lambda *args: self.refresh())
+        self.entry.bind("<Return>", self._pick_first)
+        self.entry.bind("<Down>", self._open_list)
+        self.entry.bind("<Escape>", lambda event: self.query_var.set(""))
+        self.combobox.bind("<<ComboboxSelected>>", self._on_selected)
+
+    def set_items(self, items):
+        """Replaces every item."""
+        self.set_index(SearchIndex(items, key=self.key))
+
+    def set_index(self, index):
+        """Switches to a SearchIndex built elsewhere, e.g. on a worker thread."""
+        self.index = index
+        self._fit()
+
+    def add_items(self, items):
+        """Adds items as they are discovered."""
+        if self.index.add(items):
+            self._fit()
+
+    def sync_items(self, items):
+        """Makes the picker hold exactly items, updating the index incrementally."""
+        self.index.sync(items)
+        self._fit()
+
+    def items(self):
+        """Returns every item, not just the ones currently shown."""
+        return self.index.items()
+
+    def touch(self, item):
+        """Records item as the most recently used one."""
+        if item in self.recent:
+            self.recent.remove(item)
+        self.recent.insert(0, item)
+        del self.recent[MAX_RECENT:]
+
+    def search(self):
+        """Returns the best items for the current query."""
+        return self.index.search(self.query_var.get(), self.limit, self.recent)
+
+    def refresh(self):
+        """Loads the best matches for the current query into the combobox."""
+        self.combobox["values"] = self.search()
+
+    def _fit(self):
+        # The index keeps its longest item up to date as items are added, so nothing is measured here
+        width = max(MIN_WIDTH, self.index.longest + 2)
+        if width != self._width:
+            self._width = width
+            self.combobox["width"] = width
+            self.entry["width"] = width
+        self.refresh()
+
+    def _pick_first(self, event):
+        results = self.search()
+        if results:
+            self.variable.set(results[0])
+            self._on_selected(event)
+        return "break"
+
+    def _open_list(self, event):
+        self.combobox.focus_set()
+        self.combobox.event_generate("<Down>")
+        return "break"
+
+    def _on_selected(self, event):
+        self.touch(self.variable.get())
+        if self.on_select is not None:
+            self.on_select(event)
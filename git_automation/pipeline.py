@@ -0,0 +1,250 @@
+"""Tk-free git operations behind "Generate and Push" and "Clone Repository".
+
+Every function reports progress through a ``log(message, status="INFO")``
+callback so the same code can run on a worker thread and feed the GUI log.
+"""
+import subprocess
+import time
+from collections import namedtuple
+
+from git_automation.gitcmd import (  # noqa: F401 (re-exported)
+    describe_error, no_log, run_git, stream_options, traced_git
+)
+from git_automation.metrics import format_durations, span
+from git_automation.plumbing import fast_commit, rev_parse
+from git_automation.refs import read_head
+from git_automation.status import is_content_only_submodule, iter_status
+
+DEFAULT_COMMIT_MESSAGE = "Automatic commit: Updated repository"
+STAGING_ALL = "all"
+STAGING_TARGETED = "targeted"
+STAGE_BATCH_SIZE = 50000
+
+# One line of ``git push --porcelain``: flag is " " (fast-forward), "+" (forced),
+# "-" (deleted), "*" (new), "=" (up to date) or "!" (rejected)
+PushedRef = namedtuple("PushedRef", ["flag", "source", "destination", "summary"])
+
+
+def changed_paths(entries):
+    """Returns the paths whose working-tree state still has to be staged."""
+    paths = []
+    for entry in entries:
+        worktree = entry.xy[1]
+        if worktree == " " or entry.xy == "!!" or is_content_only_submodule(entry):
+            continue  # Already fully staged, ignored, or changed only inside a submodule
+        paths.append(entry.path)
+        if entry.orig_path is not None and worktree in "RC":
+            paths.append(entry.orig_path)  # Stage the deletion side of an unstaged rename
+    return paths
+
+
+def has_staged_changes(entries):
+    """True if any entry already has changes in the index."""
+    return any(entry.xy[0] not in " ?!" and not is_content_only_submodule(entry) for entry in entries)
+
+
+def stage_paths(repo_path, paths, collect=None):
+    """Stages exactly paths, including deletions, feeding NUL-delimited pathspecs on stdin."""
+    for i in range(0, len(paths), STAGE_BATCH_SIZE):
+        batch = paths[i:i + STAGE_BATCH_SIZE]
+        traced_git(
+            "add", ["--literal-pathspecs", "add", "-A", "--pathspec-from-file=-", "--pathspec-file-nul"],
+            repo_path, input="\0".join(batch) + "\0", collect=collect, paths=len(batch)
+        )
+
+
+def _stage_targeted(repo_path, entries, log, collect):
+    """Stages only the changed paths; returns False if the status shows nothing to commit."""
+    if entries is None:
+        with span("changes", repo=repo_path) as current:
+            if collect is not None:
+                collect.append(current)
+            entries = list(iter_status(repo_path, untracked_cache=True))
+    paths = changed_paths(entries)
+    if not paths:
+        return has_staged_changes(entries)
+
+    log(f"Staging {len(paths)} changed paths in the repository...")
+    try:
+        stage_paths(repo_path, paths, collect)
+    except subprocess.CalledProcessError as e:
+        # A path vanished since the status was taken; fall back to staging everything
+        log(f"Targeted staging failed ({describe_error(e)}); staging all changes instead.", "WARNING")
+        traced_git("add", ["add", "."], repo_path, collect=collect)
+    log("All changes staged successfully.", "SUCCESS")
+    return True
+
+
+def stage_and_commit(repo_path, commit_message=None, log=no_log, collect=None,
+                     staging=STAGING_ALL, entries=None):
+    """Stages and commits changes; returns False if there was nothing to commit.
+
+    staging="all" runs ``git add .`` and asks git whether anything is staged.
+    staging="targeted" stages only the paths in entries (StatusEntry records,
+    taken from a fresh status when omitted) and knows from them whether
+    there is anything to commit, which saves a process and a full-tree pass.
+    """
+    commit_message = commit_message or DEFAULT_COMMIT_MESSAGE
+
+    if staging == STAGING_TARGETED:
+        if not _stage_targeted(repo_path, entries, log, collect):
+            log("No changes to commit. Exiting.", "INFO")
+            return False
+    else:
+        # Stage all changes
+        log("Staging all changes in the repository...")
+        traced_git("add", ["add", "."], repo_path, collect=collect)
+        log("All changes staged successfully.", "SUCCESS")
+
+        # Check if there are any changes to commit
+        check_status = traced_git(
+            "diff_check", ["diff", "--cached", "--exit-code", "--quiet"], repo_path,
+            check=False, collect=collect, ok_codes=(0, 1)
+        )
+        if check_status.returncode == 0:
+            log("No changes to commit. Exiting.", "INFO")
+            return False
+
+    # Commit the changes
+    log(f"Committing changes with message: '{commit_message}'...")
+    traced_git("commit", ["commit", "-m", commit_message], repo_path, collect=collect)
+    log(f"Changes committed with message: '{commit_message}'", "SUCCESS")
+    return True
+
+
+def push(repo_path, branch, log=no_log, collect=None, stream=None):
+    """Pushes branch to origin.
+
+    stream holds stream_git options (on_progress, timeout, stall_timeout,
+    cancel). A cancelled or timed-out push leaves the local commit in place;
+    the remote only updates its refs once the whole pack has arrived.
+    """
+    log(f"Pushing changes to branch: {branch}...")
+    traced_git("push", ["push", "--progress", "origin", branch], repo_path, collect=collect,
+               stream=stream_options(stream), branch=branch)
+    log(f"Changes pushed to branch '{branch}' successfully!", "SUCCESS")
+
+
+def parse_push_porcelain(output):
+    """Returns the PushedRefs reported by ``git push --porcelain``."""
+    refs = []
+    for line in output.splitlines():
+        flag, tab, rest = line[:1], line[1:2], line[2:]
+        if tab != "\t":
+            continue  # "To <url>" and "Done"
+        spec, _, summary = rest.partition("\t")
+        source, _, destination = spec.partition(":")
+        refs.append(PushedRef(flag, source, destination, summary))
+    return refs
+
+
+def push_refspecs(repo_path, refspecs, log=no_log, collect=None, stream=None, atomic=True, remote="origin"):
+    """Pushes several refspecs in a single round-trip and returns their PushedRefs.
+
+    With atomic=True the remote applies every ref update or none of them.
+    Raises CalledProcessError (with the rejected refs in stderr) on failure.
+    """
+    log(f"Pushing {len(refspecs)} refs to {remote}{' atomically' if atomic else ''}...")
+    args = ["push", "--porcelain", "--progress", *(["--atomic"] if atomic else []), remote, *refspecs]
+    result = traced_git("push", args, repo_path, check=False, collect=collect, stream=stream_options(stream),
+                        refs=len(refspecs))
+    refs = parse_push_porcelain(result.stdout)
+    if result.returncode != 0:
+        rejected = "".join(f"{ref.destination}: {ref.summary}\n" for ref in refs if ref.flag == "!")
+        raise subprocess.CalledProcessError(result.returncode, result.args, result.stdout, rejected + result.stderr)
+    for ref in refs:
+        log(f"{ref.destination}: {ref.summary}", "SUCCESS")
+    return refs
+
+
+def publish_to_branches(repo_path, branches, commit_message=None, log=no_log, entries=None, stream=None,
+                        atomic=True):
+    """Commits the working-tree changes onto every branch without a checkout, then pushes them together.
+
+    entries are StatusEntry records relative to HEAD, as for fast_commit:
+    the same changed paths are applied on top of each branch's own tree.
+    All branches go out in one ``git push --atomic``. Returns
+    {branch: new commit id, or None if that branch already had the changes}.
+    """
+    log(f"Selected repository path: {repo_path}")
+    log(f"Target branches: {', '.join(branches)}")
+    start_time = time.time()
+    stages = []
+    commit_message = commit_message or DEFAULT_COMMIT_MESSAGE
+    if entries is None:
+        entries = list(iter_status(repo_path, untracked_cache=True, untracked_files="all"))
+    # New branches start from HEAD as it was before any of these commits moved it
+    start_point = rev_parse(repo_path, "HEAD^{commit}") or "HEAD"
+
+    commits = {}
+    for branch in branches:
+        commits[branch] = fast_commit(repo_path, branch, commit_message, entries, log, stages,
+                                      start_point=start_point)
+        if commits[branch]:
+            log(f"Changes committed as {commits[branch][:12]} on '{branch}'.", "SUCCESS")
+        else:
+            log(f"'{branch}' already has these changes.", "INFO")
+
+    # Branches that exist neither locally nor as a new commit have nothing to push
+    refspecs = [f"refs/heads/{b}:refs/heads/{b}" for b in branches if rev_parse(repo_path, f"refs/heads/{b}")]
+    if refspecs:
+        push_refspecs(repo_path, refspecs, log, stages, stream, atomic)
+
+    log(f"Stage timings: {format_durations(stages)}")
+    log(f"Process completed successfully in {time.time() - start_time:.2f} seconds!", "SUCCESS")
+    return commits
+
+
+def commit_and_push(repo_path, branch, commit_message=None, log=no_log, staging=STAGING_ALL, entries=None,
+                    fast=False, stream=None):
+    """Stages, commits and pushes changes; returns "clean" or "pushed".
+
+    See stage_and_commit for the staging modes. With fast=True the commit is
+    built with plumbing directly on branch (see plumbing.fast_commit), which
+    skips hooks, leaves the index alone and works for branches that are not
+    checked out. stream is passed on to push.
+    """
+    log(f"Selected repository path: {repo_path}")
+    log(f"Target branch: {branch}")
+    log("Process started.")
+    start_time = time.time()
+    stages = []
+
+    if fast:
+        committed = _fast_commit(repo_path, branch, commit_message, entries, log, stages)
+    else:
+        committed = stage_and_commit(repo_path, commit_message, log, stages, staging, entries)
+    if not committed:
+        log(f"Stage timings: {format_durations(stages)}")
+        log("Process completed successfully.", "SUCCESS")
+        return "clean"
+
+    push(repo_path, branch, log, stages, stream)
+
+    elapsed_time = time.time() - start_time
+    log(f"Stage timings: {format_durations(stages)}")
+    log(f"Process completed successfully in {elapsed_time:.2f} seconds!", "SUCCESS")
+    return "pushed"
+
+
+def _fast_commit(repo_path, branch, commit_message, entries, log, collect):
+    """Runs plumbing.fast_commit with the usual log messages; returns False if nothing changed."""
+    if branch == "HEAD":
+        branch = read_head(repo_path)[0]
+        if branch is None:
+            raise ValueError("Fast commit needs a branch, but HEAD is detached.")
+    commit_message = commit_message or DEFAULT_COMMIT_MESSAGE
+    log(f"Fast-committing changes to '{branch}' with message: '{commit_message}'...")
+    commit = fast_commit(repo_path, branch, commit_message, entries, log, collect)
+    if commit is None:
+        log("No changes to commit. Exiting.", "INFO")
+        return False
+    log(f"Changes committed as {commit[:12]} on '{branch}'.", "SUCCESS")
+    return True
+
+
+def clone(repo_url, base_path, log=no_log, stream=None):
+    """Clones repo_url into base_path; stream holds stream_git options as for push."""
+    log(f"Cloning repository from {repo_url} into {base_path}...")
+    traced_git("clone", ["clone", "--progress", repo_url], base_path, stream=stream_options(stream), url=repo_url)
+    log(f"Repository cloned successfully from {repo_url}!", "SUCCESS")
@@ -0,0 +1,139 @@
+"""Fast commits through git plumbing.
+
+Instead of ``git commit`` this builds the new tree in a private index
+(``GIT_INDEX_FILE``) seeded from the target branch, then runs ``write-tree``,
+``commit-tree`` and an ``update-ref`` that only succeeds if the branch still
+points at the parent it was built on. No hooks or templates run, the user's
+index is left alone and the target branch does not need to be checked out.
+A branch that does not exist locally is started from its remote-tracking
+branch, or from HEAD for a brand-new branch, so committing to it never
+creates an unrelated root commit.
+"""
+import os
+import subprocess
+import tempfile
+
+from git_automation.gitcmd import no_log, run_git, traced_git
+from git_automation.helpers import pool as helpers
+from git_automation.refs import find_git_dir, read_head
+from git_automation.status import MAX_PATHSPECS, iter_status
+
+
+class RefUpdateConflict(Exception):
+    """Raised when the branch moved while the fast commit was being built."""
+
+
+def rev_parse(repo_path, rev):
+    """Returns the object id rev resolves to, or None if it does not exist.
+
+    Asks the repository's long-lived cat-file helper, falling back to a
+    one-off rev-parse if the helper cannot run.
+    """
+    try:
+        info = helpers.lookup(repo_path, rev)
+        return info.oid if info else None
+    except OSError:
+        result = run_git(["rev-parse", "--verify", "--quiet", rev], repo_path, check=False)
+        return result.stdout.strip() or None
+
+
+def _is_collapsed_dir(entry):
+    return entry.xy == "??" and entry.path.endswith("/")
+
+
+def expand_untracked_dirs(repo_path, entries):
+    """Replaces untracked directories collapsed to "dir/" (git's default status) with the files inside them.
+
+    update-index ignores directory paths, so committing them as they are would
+    silently leave their contents out. Raises ValueError for directories that
+    stay collapsed, such as embedded repositories.
+    """
+    dirs = [entry.path for entry in entries if _is_collapsed_dir(entry)]
+    if not dirs:
+        return entries
+    expanded = [entry for entry in entries if not _is_collapsed_dir(entry)]
+    for i in range(0, len(dirs), MAX_PATHSPECS):
+        expanded.extend(
+            entry for entry in iter_status(repo_path, paths=dirs[i:i + MAX_PATHSPECS], untracked_files="all")
+            if entry.xy == "??"
+        )
+    leftover = [entry.path for entry in expanded if _is_collapsed_dir(entry)]
+    if leftover:
+        raise ValueError(f"Cannot fast-commit untracked directories (embedded repositories?): {', '.join(leftover)}")
+    return expanded
+
+
+def commit_paths(entries):
+    """Returns every path a StatusEntry list touches, including both sides of renames."""
+    paths = []
+    for entry in entries:
+        if entry.xy == "!!":
+            continue
+        paths.append(entry.path)
+        if entry.orig_path is not None:
+            paths.append(entry.orig_path)
+    return paths
+
+
+def fast_commit(repo_path, branch, commit_message, entries=None, log=no_log, collect=None, remote="origin",
+                start_point="HEAD"):
+    """Commits the working-tree versions of the changed paths onto branch.
+
+    entries are StatusEntry records relative to HEAD (a fresh status listing
+    every untracked file is taken when omitted); collapsed untracked
+    directories in them are expanded to their files. Returns the new commit id, or
+    None when the resulting tree equals the branch's current tree. Raises
+    RefUpdateConflict if the branch moved concurrently. A missing local branch
+    is created on top of refs/remotes/<remote>/<branch>, or of start_point
+    (HEAD by default).
+    """
+    if entries is None:
+        entries = list(iter_status(repo_path, untracked_cache=True, untracked_files="all"))
+    paths = commit_paths(expand_untracked_dirs(repo_path, entries))
+    if not paths:
+        return None
+
+    ref = f"refs/heads/{branch}"
+    current = rev_parse(repo_path, f"{ref}^{{commit}}")
+    parent = (current or rev_parse(repo_path, f"refs/remotes/{remote}/{branch}^{{commit}}")
+              or rev_parse(repo_path, f"{start_point}^{{commit}}"))
+    git_dir = os.path.abspath(find_git_dir(repo_path))  # git resolves GIT_INDEX_FILE against repo_path
+
+    with tempfile.TemporaryDirectory(prefix="fast-commit-", dir=git_dir) as tmp_dir:
+        env = {"GIT_INDEX_FILE": os.path.join(tmp_dir, "index")}
+        log(f"Building tree for {len(paths)} changed paths on '{branch}'...")
+        if parent:
+            traced_git("read_tree", ["read-tree", parent], repo_path, env=env, collect=collect)
+        else:
+            traced_git("read_tree", ["read-tree", "--empty"], repo_path, env=env, collect=collect)
+        # --add/--remove take each path's working-tree state, deleting paths that are gone
+        traced_git(
+            "update_index", ["update-index", "--add", "--remove", "-z", "--stdin"], repo_path,
+            input="\0".join(paths) + "\0", env=env, collect=collect, paths=len(paths)
+        )
+        tree = traced_git("write_tree", ["write-tree"], repo_path, env=env, collect=collect).stdout.strip()
+
+    if parent and rev_parse(repo_path, f"{parent}^{{tree}}") == tree:
+        return None
+
+    parent_args = ["-p", parent] if parent else []
+    commit = traced_git(
+        "commit_tree", ["commit-tree", tree, *parent_args], repo_path,
+        input=commit_message, collect=collect
+    ).stdout.strip()
+
+    try:
+        traced_git(
+            "update_ref", ["update-ref", "-m", f"fast commit: {commit_message.splitlines()[0]}",
+                           ref, commit, current or ""],
+            repo_path, collect=collect, branch=branch
+        )
+    except subprocess.CalledProcessError as e:
+        raise RefUpdateConflict(f"Branch '{branch}' moved while committing: {e.stderr.strip()}") from e
+
+    if read_head(repo_path)[0] == branch:
+        # HEAD moved under the user's index; re-sync just the committed paths so
+        # git status does not show the commit as reverted
+        run_git(["--literal-pathspecs", "reset", "-q", "--pathspec-from-file=-", "--pathspec-file-nul"],
+                repo_path, input="\0".join(paths) + "\0")
+    return commit
@@ -0,0 +1,148 @@
+"""Pure-Python reader for HEAD and local branches.
+
+Branch names come straight from ``refs/heads`` and ``packed-refs`` instead
+of a ``git branch`` subprocess. Branch lists are cached per repository and
+only re-read when packed-refs or a refs/heads directory changes mtime; HEAD
+is not part of the cache key because it is read afresh on every read_head
+call.
+Repositories using a non-files ref backend (reftable) fall back to git.
+"""
+import os
+import subprocess
+import threading
+
+from git_automation.gitcmd import mtime_ns
+from git_automation.metrics import span
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def find_git_dir(repo_path):
+    """Returns the repository's git directory, following "gitdir:" files of worktrees and submodules."""
+    dot_git = os.path.join(repo_path, ".git")
+    if os.path.isdir(dot_git):
+        return dot_git
+    with open(dot_git, "r", encoding="utf-8") as f:
+        line = f.readline().strip()
+    if not line.startswith("gitdir:"):
+        raise ValueError(f"Unrecognised .git file in {repo_path}")
+    return os.path.normpath(os.path.join(repo_path, line[len("gitdir:"):].strip()))
+
+
+def common_dir(git_dir):
+    """Returns the directory holding shared refs (differs from git_dir for linked worktrees)."""
+    try:
+        with open(os.path.join(git_dir, "commondir"), "r", encoding="utf-8") as f:
+            return os.path.normpath(os.path.join(git_dir, f.read().strip()))
+    except OSError:
+        return git_dir
+
+
+def _uses_files_backend(shared_dir):
+    """Returns False for ref backends this reader does not understand."""
+    return not os.path.isdir(os.path.join(shared_dir, "reftable"))
+
+
+def read_head(repo_path):
+    """Returns (branch, sha): the checked-out branch name, or (None, sha) on a detached HEAD."""
+    git_dir = find_git_dir(repo_path)
+    with open(os.path.join(git_dir, "HEAD"), "r", encoding="utf-8") as f:
+        head = f.read().strip()
+    if head.startswith("ref:"):
+        ref = head[len("ref:"):].strip()
+        branch = ref[len("refs/heads/"):] if ref.startswith("refs/heads/") else ref
+        return branch, None
+    return None, head
+
+
+def _scan_loose_heads(heads_dir):
+    """Returns (names, {dir: mtime_ns}) for the loose refs under refs/heads."""
+    names = []
+    dir_mtimes = {}
+    stack = [(heads_dir, "")]
+    while stack:
+        directory, prefix = stack.pop()
+        try:
+            dir_mtimes[directory] = os.stat(directory).st_mtime_ns
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".lock"):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append((entry.path, f"{prefix}{entry.name}/"))
+                    else:
+                        names.append(prefix + entry.name)
+        except OSError:
+            dir_mtimes[directory] = None
+    return names, dir_mtimes
+
+
+def _read_packed_heads(shared_dir):
+    """Returns the branch names recorded in packed-refs."""
+    names = []
+    try:
+        with open(os.path.join(shared_dir, "packed-refs"), "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith(("#", "^")):
+                    continue
+                _, _, ref = line.rstrip("\n").partition(" ")
+                if ref.startswith("refs/heads/"):
+                    names.append(ref[len("refs/heads/"):])
+    except OSError:
+        pass
+    return names
+
+
+def _git_branches(repo_path):
+    """Fallback listing through git itself."""
+    result = subprocess.run(
+        ["git", "for-each-ref", "--format=%(refname:strip=2)", "refs/heads"],
+        cwd=repo_path, capture_output=True, text=True, check=True
+    )
+    return sorted(line for line in result.stdout.split("\n") if line)
+
+
+def _is_fresh(shared_dir, cached):
+    """Checks the mtimes of packed-refs and every refs/heads directory against the cache."""
+    packed_mtime, dir_mtimes, _ = cached
+    if mtime_ns(os.path.join(shared_dir, "packed-refs")) != packed_mtime:
+        return False
+    return all(mtime_ns(d) == mtime for d, mtime in dir_mtimes.items())
+
+
+def list_branches(repo_path):
+    """Returns the sorted local branch names of a repository."""
+    with span("branches", repo=repo_path) as current:
+        branches = _list_branches(repo_path)
+        current.attrs["branches"] = len(branches)
+    return branches
+
+
+def _list_branches(repo_path):
+    git_dir = find_git_dir(repo_path)
+    shared_dir = common_dir(git_dir)
+    if not _uses_files_backend(shared_dir):
+        return _git_branches(repo_path)
+
+    with _cache_lock:
+        cached = _cache.get(repo_path)
+    if cached is not None and _is_fresh(shared_dir, cached):
+        return list(cached[2])
+
+    # Take the packed-refs mtime before reading so a concurrent update invalidates the entry
+    packed_mtime = mtime_ns(os.path.join(shared_dir, "packed-refs"))
+    names, dir_mtimes = _scan_loose_heads(os.path.join(shared_dir, "refs", "heads"))
+    branches = sorted(set(names).union(_read_packed_heads(shared_dir)))
+    with _cache_lock:
+        _cache[repo_path] = (packed_mtime, dir_mtimes, branches)
+    return list(branches)
+
+
+def clear_cache(repo_path=None):
+    """Forgets cached branch lists for one repository, or all of them."""
+    with _cache_lock:
+        if repo_path is None:
+            _cache.clear()
+        else:
+            _cache.pop(repo_path, None)
@@ -0,0 +1,308 @@
+"""Type-ahead search over very long lists of repository paths and branch names.
+
+SearchIndex keeps a trigram index (trigram -> ids of the items containing
+it) and a sorted list of item basenames, so a keystroke only looks at items
+that can match instead of scanning the whole list. Matches are ranked in
+tiers:
+
+0. the item or its basename equals the query,
+1. the basename starts with the query,
+2. the query starts a path component or word,
+3. the query appears anywhere,
+4. the query's characters appear in order (fuzzy), tighter spans first.
+
+Recently used items move up one tier and come first within it; otherwise
+shorter items win, then the order items were added in. At most
+MAX_CANDIDATES matches are ranked per query, with basename prefix matches
+always gathered first, so very broad queries stay fast. Items are added and
+removed incrementally as discovery and branch listing stream them in.
+"""
+import bisect
+import heapq
+import json
+import os
+import re
+import time
+from itertools import accumulate
+
+DEFAULT_LIMIT = 50
+MAX_CANDIDATES = 1000
+FUZZY_CANDIDATES_PER_RESULT = 4
+FUZZY_TIME_BUDGET = 0.008  # Seconds per keystroke the fuzzy pass may scan for
+FUZZY_CHUNK = 1 << 16  # Characters scanned between budget checks
+MAX_RECENT = 20
+DEFAULT_RECENT_PATH = os.path.join(os.path.expanduser("~"), ".git_automation", "recent.json")
+
+_WORD_BREAKS = "/\\-_. "
+
+
+def _basename(text):
+    return text.replace("\\", "/").rsplit("/", 1)[-1]
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _fuzzy_pattern(query):
+    """Regex for query as a subsequence; each gap excludes the next character so matching never backtracks."""
+    parts = [re.escape(query[0])]
+    for char in query[1:]:
+        parts.append(f"[^{re.escape(char)}\n]*{re.escape(char)}")
+    return re.compile("".join(parts))
+
+
+class SearchIndex:
+    """Incrementally updated type-ahead index over a list of strings.
+
+    key(item) gives the text that is searched (the item itself by default),
+    e.g. a repository path relative to the base path.
+    """
+
+    def __init__(self, items=(), key=None):
+        self.key = key
+        self._items = []  # id -> item
+        self._texts = []  # id -> lower-cased search text
+        self._basenames = []  # id -> last path component of the text
+        self._alive = []  # id -> False once removed
+        self._ids = {}  # item -> id
+        self._grams = {}  # trigram -> ids in ascending order
+        self._names = []  # sorted (basename, id)
+        self._size = 0
+        self._blob = ""  # Newline-terminated texts in id order, for fuzzy matching
+        self._offsets = [0]  # id -> offset of its text in the blob, plus the blob length
+        self._last = None  # (query, ids) of the last substring search that was not cut short
+        self.longest = 0  # Length of the longest item ever added (not lowered on remove), for sizing widgets
+        self.add(items)
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, item):
+        item_id = self._ids.get(item)
+        return item_id is not None and self._alive[item_id]
+
+    def items(self):
+        """Returns the indexed items in the order they were added."""
+        return [item for item, alive in zip(self._items, self._alive) if alive]
+
+    def add(self, items):
+        """Indexes the items that are not indexed yet and returns how many were added."""
+        added = 0
+        first_new = len(self._items)
+        ids = self._ids
+        grams = self._grams
+        for item in items:
+            item_id = ids.get(item)
+            if item_id is not None:
+                if not self._alive[item_id]:
+                    self._alive[item_id] = True
+                    added += 1
+                continue
+            text = (self.key(item) if self.key else item).lower().replace("\n", " ")
+            item_id = len(self._items)
+            ids[item] = item_id
+            self._items.append(item)
+            self._texts.append(text)
+            self._basenames.append(_basename(text))
+            self._alive.append(True)
+            if len(item) > self.longest:
+                self.longest = len(item)
+            for gram in {text[i:i + 3] for i in range(len(text) - 2)}:
+                try:
+                    grams[gram].append(item_id)
+                except KeyError:
+                    grams[gram] = [item_id]
+            added += 1
+        new_texts = self._texts[first_new:]
+        if new_texts:
+            names = zip(self._basenames[first_new:], range(first_new, len(self._items)))
+            if len(new_texts) * 16 < len(self._names):
+                for name in names:
+                    bisect.insort(self._names, name)  # A few streamed items; avoid re-sorting everything
+            else:
+                self._names.extend(names)
+                self._names.sort()
+            self._offsets.extend(accumulate((len(text) + 1 for text in new_texts), initial=self._offsets[-1]))
+            del self._offsets[first_new + 1]  # accumulate repeats the old end offset
+            self._blob += "\n".join(new_texts) + "\n"
+        if added:
+            self._size += added
+            self._last = None
+        return added
+
+    def remove(self, items):
+        """Drops items from search results and returns how many were removed."""
+        removed = 0
+        for item in items:
+            item_id = self._ids.get(item)
+            if item_id is not None and self._alive[item_id]:
+                self._alive[item_id] = False
+                removed += 1
+        if removed:
+            self._size -= removed
+            self._last = None
+        return removed
+
+    def sync(self, items):
+        """Makes the index hold exactly items, touching only what changed."""
+        items = list(items)
+        wanted = set(items)
+        self.remove([item for item in self.items() if item not in wanted])
+        self.add(items)
+
+    def search(self, query, limit=DEFAULT_LIMIT, recent=()):
+        """Returns up to limit items matching query, best first.
+
+        recent lists recently used items, most recent first. An empty query
+        returns the recent items followed by the others in insertion order.
+        """
+        query = query.strip().lower()
+        recent_rank = {}
+        for rank, item in enumerate(recent):
+            item_id = self._ids.get(item)
+            if item_id is not None and self._alive[item_id]:
+                recent_rank.setdefault(item_id, rank)
+        if not query:
+            ids = list(recent_rank)[:limit]
+            for item_id, alive in enumerate(self._alive):
+                if len(ids) >= limit:
+                    break
+                if alive and item_id not in recent_rank:
+                    ids.append(item_id)
+            return [self._items[item_id] for item_id in ids]
+
+        matches = {}  # id -> (tier, tie-breaker)
+        self._prefix_matches(query, matches)
+        self._substring_matches(query, matches)
+        pattern = None
+        if len(matches) < limit and len(query) > 1:
+            pattern = _fuzzy_pattern(query)
+            self._fuzzy_matches(pattern, matches, len(matches) + limit * FUZZY_CANDIDATES_PER_RESULT)
+        for item_id in recent_rank:
+            if item_id in matches:
+                continue
+            text = self._texts[item_id]
+            if query in text:
+                matches[item_id] = (self._tier(item_id, query), len(text))
+                continue
+            match = (pattern or _fuzzy_pattern(query)).search(text)
+            if match:
+                matches[item_id] = (4, match.end() - match.start())
+
+        unranked = len(recent_rank)
+
+        def rank(item_id):
+            tier, tie = matches[item_id]
+            recency = recent_rank.get(item_id)
+            if recency is None:
+                return tier, unranked, tie, item_id
+            return tier - 1, recency, tie, item_id
+
+        return [self._items[item_id] for item_id in heapq.nsmallest(limit, matches, key=rank)]
+
+    def _tier(self, item_id, query):
+        """Tier of an item whose text contains query."""
+        text = self._texts[item_id]
+        name = self._basenames[item_id]
+        if text == query or name == query:
+            return 0
+        if name.startswith(query):
+            return 1
+        position = text.find(query)
+        while position != -1:
+            if position == 0 or text[position - 1] in _WORD_BREAKS:
+                return 2
+            position = text.find(query, position + 1)
+        return 3
+
+    def _prefix_matches(self, query, matches):
+        """Adds items whose basename starts with query (tiers 0 and 1), found by bisection."""
+        names = self._names
+        start = bisect.bisect_left(names, (query,))
+        for name, item_id in names[start:start + MAX_CANDIDATES]:
+            if not name.startswith(query):
+                break
+            if self._alive[item_id]:
+                matches[item_id] = (0 if name == query else 1, len(self._texts[item_id]))
+
+    def _substring_matches(self, query, matches):
+        """Adds items containing query, narrowing by trigrams or by the previous query's matches."""
+        if self._last is not None and query.startswith(self._last[0]):
+            candidates = self._last[1]
+        elif len(query) >= 3:
+            postings = [self._grams.get(gram) for gram in _trigrams(query)]
+            candidates = [] if None in postings else min(postings, key=len)
+        else:
+            candidates = self._occurrences(query)
+        texts = self._texts
+        alive = self._alive
+        found = []
+        for item_id in candidates:
+            if query in texts[item_id] and alive[item_id]:
+                found.append(item_id)
+                if item_id not in matches:
+                    matches[item_id] = (self._tier(item_id, query), len(texts[item_id]))
+                    if len(matches) >= MAX_CANDIDATES:
+                        return  # Cut short, so found is not cached for the next keystroke
+        self._last = (query, found)
+
+    def _occurrences(self, query):
+        """Yields, in id order, the ids of items containing a query too short for the trigram index."""
+        blob = self._blob
+        offsets = self._offsets
+        position = blob.find(query)
+        while position != -1:
+            item_id = bisect.bisect_right(offsets, position) - 1
+            yield item_id
+            position = blob.find(query, offsets[item_id + 1])
+
+    def _fuzzy_matches(self, pattern, matches, wanted):
+        """Adds items containing the query's characters in order, scanning the texts with one regex.
+
+        The scan stops after FUZZY_TIME_BUDGET, so on huge lists a fuzzy
+        query may miss matches near the end rather than stall the keystroke.
+        """
+        blob = self._blob
+        offsets = self._offsets
+        wanted = min(wanted, MAX_CANDIDATES)
+        deadline = time.perf_counter() + FUZZY_TIME_BUDGET
+        position = 0
+        while position < len(blob) and len(matches) < wanted and time.perf_counter() < deadline:
+            end = blob.find("\n", position + FUZZY_CHUNK) + 1 or len(blob)  # Chunks end on item boundaries
+            while len(matches) < wanted:
+                match = pattern.search(blob, position, end)
+                if match is None:
+                    position = end
+                    break
+                item_id = bisect.bisect_right(offsets, match.start()) - 1
+                position = offsets[item_id + 1]  # Continue with the next item
+                if self._alive[item_id] and item_id not in matches:
+                    matches[item_id] = (4, match.end() - match.start())
+
+
+def load_recent(path=DEFAULT_RECENT_PATH, name="repos"):
+    """Returns a recently used list saved by save_recent, or [] if there is none."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return list(json.load(f).get(name, []))[:MAX_RECENT]
+    except (OSError, ValueError, AttributeError):
+        return []
+
+
+def save_recent(items, path=DEFAULT_RECENT_PATH, name="repos"):
+    """Stores a recently used list under name, keeping the other lists in the file."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        data = {}
+    if not isinstance(data, dict):
+        data = {}
+    data[name] = list(items)[:MAX_RECENT]
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+    except OSError:
+        pass  # Recency is only a ranking hint
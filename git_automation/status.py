@@ -0,0 +1,220 @@
+"""Streaming parser for ``git status --porcelain=v2 -z``.
+
+Output is read in fixed-size chunks and yielded record by record, so memory
+stays flat on huge change sets and a caller that only needs the first entry
+can stop the scan early. NUL-delimited records keep renames, spaces and
+newlines in paths intact.
+"""
+import os
+import subprocess
+import time
+from collections import namedtuple
+
+from git_automation.metrics import recorder
+
+CHUNK_SIZE = 64 * 1024
+MAX_PATHSPECS = 1000  # Beyond this a full status is cheaper than a huge command line
+
+# xy uses the short-format letters (" M", "R ", "??", ...); orig_path is set for renames/copies.
+# submodule is git's "S<c><m><u>" state (commit changed, tracked/untracked content modified), None otherwise.
+StatusEntry = namedtuple("StatusEntry", ["xy", "path", "orig_path", "submodule"])
+
+
+def status_command(untracked_cache=False, fsmonitor=False, paths=None, optional_locks=True,
+                   untracked_files="normal", branch=False):
+    """Builds the git status command line, optionally enabling the untracked cache and fsmonitor.
+
+    With optional_locks=False git will not rewrite the index, which keeps an
+    index watcher from being triggered by its own status queries.
+    """
+    command = ["git"]
+    if not optional_locks:
+        command.append("--no-optional-locks")
+    if paths:
+        command.append("--literal-pathspecs")
+    if untracked_cache:
+        command += ["-c", "core.untrackedCache=true"]
+    if fsmonitor:
+        command += ["-c", "core.fsmonitor=true"]
+    command += ["status", "--porcelain=v2", "-z", f"--untracked-files={untracked_files}"]
+    if branch:
+        command.append("--branch")
+    if paths:
+        command += ["--", *paths]
+    return command
+
+
+def _short_xy(xy):
+    return xy.replace(".", " ")
+
+
+def _submodule_state(field):
+    return field.decode() if field.startswith(b"S") else None
+
+
+def is_content_only_submodule(entry):
+    """True for a submodule whose checked-out commit is unchanged and only has edits or untracked files inside.
+
+    Such changes live in the submodule's own repository; the superproject has nothing to stage for them.
+    """
+    return entry.submodule is not None and entry.submodule[1] != "C" and entry.xy[0] == " "
+
+
+def parse_records(tokens, headers=None):
+    """Turns an iterator of NUL-separated byte tokens into StatusEntry records.
+
+    "# key value" header lines (from --branch) are stored in headers when a dict is given.
+    """
+    for token in tokens:
+        if not token:
+            continue
+        kind = token[:1]
+        if kind == b"#":
+            if headers is not None:
+                key, _, value = token[2:].decode(errors="replace").partition(" ")
+                headers[key] = value
+        elif kind == b"1":
+            fields = token.split(b" ", 8)
+            yield StatusEntry(_short_xy(fields[1].decode()), os.fsdecode(fields[8]), None,
+                              _submodule_state(fields[2]))
+        elif kind == b"2":
+            fields = token.split(b" ", 9)
+            orig_path = next(tokens, b"")  # The original path is the following NUL-terminated token
+            yield StatusEntry(_short_xy(fields[1].decode()), os.fsdecode(fields[9]),
+                              os.fsdecode(orig_path), _submodule_state(fields[2]))
+        elif kind == b"u":
+            fields = token.split(b" ", 10)
+            yield StatusEntry(_short_xy(fields[1].decode()), os.fsdecode(fields[10]), None,
+                              _submodule_state(fields[2]))
+        elif kind == b"?":
+            yield StatusEntry("??", os.fsdecode(token[2:]), None, None)
+        elif kind == b"!":
+            yield StatusEntry("!!", os.fsdecode(token[2:]), None, None)
+
+
+def _split_stream(stream, chunk_size=CHUNK_SIZE, counter=None):
+    """Yields NUL-terminated tokens from a binary stream without buffering all of it."""
+    pending = b""
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        if counter is not None:
+            counter[0] += len(chunk)
+        parts = (pending + chunk).split(b"\0")
+        pending = parts.pop()
+        yield from parts
+    if pending:
+        yield pending
+
+
+def iter_status(repo_path, untracked_cache=False, fsmonitor=False, paths=None, optional_locks=True,
+                untracked_files="normal", headers=None):
+    """Yields StatusEntry records for repo_path as git produces them.
+
+    Passing a dict as headers adds --branch and fills it with the branch
+    headers (branch.head, branch.upstream, branch.ab, ...).
+
+    Raises CalledProcessError if git fails. Abandoning the generator early
+    terminates the git process.
+    """
+    command = status_command(untracked_cache, fsmonitor, paths, optional_locks, untracked_files,
+                             branch=headers is not None)
+    started_at = time.time()
+    start = time.perf_counter()
+    process = subprocess.Popen(command, cwd=repo_path, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    finished = False
+    bytes_read = [0]
+    entries = 0
+    try:
+        for entry in parse_records(iter(_split_stream(process.stdout, counter=bytes_read)), headers):
+            entries += 1
+            yield entry
+        finished = True
+    finally:
+        if not finished:
+            process.kill()
+        process.stdout.close()
+        stderr = process.stderr.read()
+        process.stderr.close()
+        returncode = process.wait()
+        recorder.record("status", started_at, time.perf_counter() - start, repo=repo_path,
+                        exit_code=returncode if finished else None, bytes=bytes_read[0], entries=entries,
+                        complete=finished, paths=len(paths) if paths else 0)
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, command, stderr=stderr.decode(errors="replace"))
+
+
+def _prefixes(path):
+    """Yields "a", "a/b", ... for every ancestor directory of path."""
+    parts = path.rstrip("/").split("/")
+    for i in range(1, len(parts)):
+        yield "/".join(parts[:i])
+
+
+def _is_affected(path, changed, changed_dirs):
+    """True if an entry for path may be stale after changes to the changed paths."""
+    bare = path.rstrip("/")
+    if bare in changed or any(prefix in changed for prefix in _prefixes(path)):
+        return True
+    return path.endswith("/") and bare in changed_dirs  # Collapsed untracked directory
+
+
+def refresh_paths(repo_path, entries, changed_paths, **options):
+    """Returns an updated {path: StatusEntry} dict after re-querying only changed_paths.
+
+    changed_paths are repository-relative with "/" separators. Falls back to
+    a full status when there are too many of them.
+    """
+    changed = set(changed_paths)
+    if len(changed) > MAX_PATHSPECS:
+        return {entry.path: entry for entry in iter_status(repo_path, **options)}
+
+    changed_dirs = {prefix for path in changed for prefix in _prefixes(path)}
+    updated = dict(entries)
+    pathspecs = set(changed)
+    for path, entry in entries.items():
+        if _is_affected(path, changed, changed_dirs) or (
+            entry.orig_path is not None and _is_affected(entry.orig_path, changed, changed_dirs)
+        ):
+            del updated[path]
+            pathspecs.add(entry.path)  # Re-query so siblings in a collapsed directory survive
+            if entry.orig_path is not None:
+                pathspecs.add(entry.orig_path)  # Both sides are needed to report a rename
+    for entry in iter_status(repo_path, paths=sorted(pathspecs), **options):
+        if entry.orig_path is not None:
+            updated.pop(entry.orig_path, None)
+        updated[entry.path] = entry
+    return updated
+
+
+def entry_category(entry):
+    """Classifies an entry as conflicted, untracked, ignored, renamed, added, deleted or modified."""
+    xy = entry.xy
+    if "U" in xy or xy in ("AA", "DD"):
+        return "conflicted"
+    if xy == "??":
+        return "untracked"
+    if xy == "!!":
+        return "ignored"
+    if "R" in xy or "C" in xy:
+        return "renamed"
+    if "A" in xy:
+        return "added"
+    if "D" in xy:
+        return "deleted"
+    return "modified"
+
+
+def format_entry(entry):
+    """Renders an entry like ``git status --short`` does."""
+    if entry.orig_path is not None:
+        return f"{entry.xy} {entry.orig_path} -> {entry.path}"
+    return f"{entry.xy} {entry.path}"
+
+
+def enable_fast_status(repo_path, fsmonitor=False):
+    """Persists the untracked cache (and optionally fsmonitor) in the repository config."""
+    subprocess.run(["git", "config", "core.untrackedCache", "true"], cwd=repo_path, check=True)
+    if fsmonitor:
+        subprocess.run(["git", "config", "core.fsmonitor", "true"], cwd=repo_path, check=True)
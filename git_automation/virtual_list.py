@@ -0,0 +1,108 @@
+"""Virtualized list widget for very large item lists.
+
+Only the rows inside the viewport are ever written to the underlying Text
+widget, so drawing cost depends on the viewport height rather than on the
+number of items. Sorting and filtering operate on the item list itself.
+"""
+import tkinter as tk
+import tkinter.font as tkfont
+
+
+class VirtualList(tk.Frame):
+    """Scrollable, read-only list that renders only the visible rows."""
+
+    def __init__(self, master, height=10, width=40, formatter=str, empty_text="", **kwargs):
+        super().__init__(master, **kwargs)
+        self.formatter = formatter
+        self.empty_text = empty_text
+        self._items = []
+        self._view = []
+        self._predicate = None
+        self._sort_key = None
+        self._sort_reverse = False
+        self._top = 0
+        self._rows = height
+
+        self._text = tk.Text(self, height=height, width=width, wrap=tk.NONE, state=tk.DISABLED)
+        self._scrollbar = tk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self._scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self._text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self._line_height = tkfont.Font(font=self._text["font"]).metrics("linespace") or 16
+
+        self._text.bind("<Configure>", self._on_configure)
+        self._text.bind("<MouseWheel>", self._on_mousewheel)
+        self._text.bind("<Button-4>", lambda event: self.scroll(-3))
+        self._text.bind("<Button-5>", lambda event: self.scroll(3))
+        self._text.bind("<Prior>", lambda event: self.scroll(-self._rows))
+        self._text.bind("<Next>", lambda event: self.scroll(self._rows))
+
+    def set_items(self, items):
+        """Replaces the items, keeping the current filter, sort and (clamped) scroll position."""
+        self._items = list(items)
+        self._rebuild()
+
+    def set_filter(self, predicate):
+        """Shows only items for which predicate(item) is true; None shows everything."""
+        self._predicate = predicate
+        self._top = 0
+        self._rebuild()
+
+    def set_sort(self, key, reverse=False):
+        """Orders items by key(item); None keeps insertion order."""
+        self._sort_key = key
+        self._sort_reverse = reverse
+        self._rebuild()
+
+    def counts(self):
+        """Returns (shown, total) item counts."""
+        return len(self._view), len(self._items)
+
+    def scroll(self, rows):
+        """Scrolls by a number of rows (negative scrolls up)."""
+        self._set_top(self._top + rows)
+        return "break"
+
+    def _rebuild(self):
+        view = self._items if self._predicate is None else [i for i in self._items if self._predicate(i)]
+        if self._sort_key is not None:
+            view = sorted(view, key=self._sort_key, reverse=self._sort_reverse)
+        self._view = view
+        self._set_top(self._top)
+
+    def _set_top(self, top):
+        self._top = max(0, min(top, len(self._view) - self._rows))
+        self._render()
+
+    def _render(self):
+        visible = self._view[self._top:self._top + self._rows]
+        if visible:
+            content = "\n".join(self.formatter(item) for item in visible)
+        else:
+            content = self.empty_text if not self._items else ""
+        self._text.config(state=tk.NORMAL)
+        self._text.delete("1.0", tk.END)
+        self._text.insert(tk.END, content)
+        self._text.config(state=tk.DISABLED)
+        total = len(self._view)
+        if total:
+            self._scrollbar.set(self._top / total, min(1.0, (self._top + self._rows) / total))
+        else:
+            self._scrollbar.set(0.0, 1.0)
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self._set_top(int(float(amount) * len(self._view)))
+        elif action == "scroll":
+            step = self._rows if unit == "pages" else 1
+            self._set_top(self._top + int(amount) * step)
+
+    def _on_mousewheel(self, event):
+        # Windows reports multiples of 120 per notch, macOS small deltas
+        delta = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        return self.scroll(-3 * delta)
+
+    def _on_configure(self, event):
+        rows = max(1, event.height // self._line_height)
+        if rows != self._rows:
+            self._rows = rows
+            self._set_top(self._top)
@@ -0,0 +1,311 @@
+"""Working-tree watcher that reports changed paths in debounced batches.
+
+On Linux the watcher uses inotify (through ctypes, no extra dependency) on
+the working tree plus ``.git`` itself, so an idle repository costs no CPU.
+Elsewhere, or when inotify watches run out, it falls back to polling file
+mtimes. ``on_change`` receives a set of repository-relative paths, or None
+when the index/HEAD changed and a full status refresh is needed.
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import subprocess
+import sys
+import threading
+import time
+
+from git_automation.gitcmd import no_log
+from git_automation.refs import find_git_dir
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+TREE_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+             | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_ONLYDIR)
+GIT_DIR_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_ONLYDIR
+GIT_DIR_TRIGGERS = {"index", "HEAD"}
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def ignored_directories(repo_path):
+    """Returns the repository-relative ignored directories, which are not worth watching."""
+    result = subprocess.run(
+        ["git", "ls-files", "-z", "--others", "--ignored", "--exclude-standard", "--directory"],
+        cwd=repo_path, capture_output=True
+    )
+    if result.returncode != 0:
+        return set()
+    return {os.fsdecode(p).rstrip("/") for p in result.stdout.split(b"\0") if p.endswith(b"/")}
+
+
+def _walk_dirs(repo_path, ignored):
+    """Yields (relative_dir, absolute_dir) for every watchable directory of the working tree."""
+    stack = [("", repo_path)]
+    while stack:
+        rel, directory = stack.pop()
+        yield rel, directory
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name == ".git" or not entry.is_dir(follow_symlinks=False):
+                        continue
+                    child_rel = f"{rel}/{entry.name}" if rel else entry.name
+                    if child_rel not in ignored:
+                        stack.append((child_rel, entry.path))
+        except OSError:
+            continue
+
+
+class _InotifyBackend:
+    """Kernel change notifications; wait() blocks without polling."""
+
+    def __init__(self, repo_path, git_dir, ignored):
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._repo_path = repo_path
+        self._ignored = ignored
+        self._watches = {}  # wd -> relative dir, or None for the git dir
+        try:
+            self._add_watch(git_dir, None, GIT_DIR_MASK)
+            for rel, directory in _walk_dirs(repo_path, ignored):
+                self._add_watch(directory, rel, TREE_MASK)
+        except OSError:
+            self.close()
+            raise
+
+    def _add_watch(self, directory, rel, mask):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), mask)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_add_watch failed for {directory}: {os.strerror(errno)}")
+        self._watches[wd] = rel
+
+    def fileno(self):
+        return self._fd
+
+    def read(self):
+        """Returns the changes currently queued: relative paths, or None for a full refresh."""
+        changes = []
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return changes
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+                offset += length
+                changes.extend(self._translate(wd, mask, name))
+
+    def _translate(self, wd, mask, name):
+        if mask & IN_Q_OVERFLOW:
+            return [None]
+        if wd not in self._watches:
+            return []
+        rel = self._watches[wd]
+        if rel is None:
+            return [None] if name in GIT_DIR_TRIGGERS else []
+        if mask & IN_DELETE_SELF:
+            del self._watches[wd]
+            return []
+        if not name or name == ".git":
+            return []
+        path = f"{rel}/{name}" if rel else name
+        if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO) and path not in self._ignored:
+            # Watch the new directory and report what was already created inside it
+            changes = [path]
+            for sub_rel, directory in _walk_dirs(os.path.join(self._repo_path, path), set()):
+                full_rel = f"{path}/{sub_rel}" if sub_rel else path
+                try:
+                    self._add_watch(directory, full_rel, TREE_MASK)
+                except OSError:
+                    return [None]
+            return changes
+        return [path]
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class _PollingBackend:
+    """Fallback that compares file mtimes and sizes on every poll."""
+
+    def __init__(self, repo_path, git_dir, ignored):
+        self._repo_path = repo_path
+        self._git_files = [os.path.join(git_dir, name) for name in GIT_DIR_TRIGGERS]
+        self._ignored = ignored
+        self._git_state = self._stat_git()
+        self._files = self._snapshot()
+
+    def _stat_git(self):
+        state = []
+        for path in self._git_files:
+            try:
+                st = os.stat(path)
+                state.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                state.append(None)
+        return state
+
+    def _snapshot(self):
+        files = {}
+        for rel, directory in _walk_dirs(self._repo_path, self._ignored):
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.name == ".git":
+                            continue
+                        try:
+                            st = entry.stat(follow_symlinks=False)
+                        except OSError:
+                            continue
+                        files[f"{rel}/{entry.name}" if rel else entry.name] = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                continue
+        return files
+
+    def read(self):
+        changes = []
+        git_state = self._stat_git()
+        if git_state != self._git_state:
+            self._git_state = git_state
+            changes.append(None)
+        files = self._snapshot()
+        for path in files.keys() | self._files.keys():
+            if files.get(path) != self._files.get(path):
+                changes.append(path)
+        self._files = files
+        return changes
+
+    def close(self):
+        pass
+
+
+class RepoWatcher:
+    """Watches one repository on a daemon thread and calls on_change with debounced batches.
+
+    Exceptions raised by on_change are logged and the watcher keeps running.
+    """
+
+    def __init__(self, repo_path, on_change, debounce=0.25, max_latency=2.0,
+                 poll_interval=2.0, force_polling=False, log=no_log):
+        self.repo_path = repo_path
+        self.on_change = on_change
+        self.debounce = debounce
+        self.max_latency = max_latency
+        self.poll_interval = poll_interval
+        self.force_polling = force_polling
+        self.log = log
+        self.backend_name = None
+        self._backend = None
+        self._thread = None
+        self._lock = threading.Lock()  # Guards the stop pipe against stop() racing _close()
+        self._stop_r = self._stop_w = None
+
+    def start(self):
+        """Sets up the backend and starts the watcher thread."""
+        git_dir = find_git_dir(self.repo_path)
+        ignored = ignored_directories(self.repo_path)
+        if not self.force_polling and sys.platform.startswith("linux"):
+            try:
+                self._backend = _InotifyBackend(self.repo_path, git_dir, ignored)
+                self.backend_name = "inotify"
+            except OSError:
+                self._backend = None  # Typically fs.inotify.max_user_watches exhausted
+        if self._backend is None:
+            self._backend = _PollingBackend(self.repo_path, git_dir, ignored)
+            self.backend_name = "polling"
+        self._stop_r, self._stop_w = os.pipe()
+        self._thread = threading.Thread(target=self._run, name="repo-watcher", daemon=True)
+        try:
+            self._thread.start()
+        except RuntimeError:
+            self._thread = None
+            self._close()
+            raise
+
+    def stop(self):
+        """Stops the watcher thread; safe to call more than once, or without start()."""
+        with self._lock:
+            if self._stop_w is not None:
+                os.write(self._stop_w, b"x")
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def _close(self):
+        """Releases the backend and the stop pipe; called once the thread is done with them."""
+        with self._lock:
+            if self._stop_w is None:
+                return
+            self._backend.close()
+            os.close(self._stop_r)
+            os.close(self._stop_w)
+            self._stop_r = self._stop_w = None
+
+    def _wait(self, timeout):
+        """Blocks until the backend has events, stop() is called or timeout expires."""
+        if self.backend_name == "inotify":
+            ready, _, _ = select.select([self._backend, self._stop_r], [], [], timeout)
+            if self._stop_r in ready:
+                return None
+            return self._backend.read() if ready else []
+        # Polling: wake up on the poll interval unless a debounce deadline comes first
+        wait = self.poll_interval if timeout is None else min(timeout, self.poll_interval)
+        ready, _, _ = select.select([self._stop_r], [], [], wait)
+        return None if ready else self._backend.read()
+
+    def _run(self):
+        pending = set()
+        full_refresh = False
+        first_event = last_event = None
+        try:
+            while True:
+                timeout = None
+                if first_event is not None:
+                    now = time.monotonic()
+                    timeout = max(0.0, min(last_event + self.debounce, first_event + self.max_latency) - now)
+                changes = self._wait(timeout)
+                if changes is None:
+                    return
+                now = time.monotonic()
+                if changes:
+                    for change in changes:
+                        if change is None:
+                            full_refresh = True
+                        else:
+                            pending.add(change)
+                    last_event = now
+                    if first_event is None:
+                        first_event = now
+                if first_event is not None and (
+                    now - last_event >= self.debounce or now - first_event >= self.max_latency
+                ):
+                    try:
+                        self.on_change(None if full_refresh else pending)
+                    except Exception as e:  # A failing callback must not end the watch
+                        self.log(f"Change handler failed for {self.repo_path}: {e!r}", "ERROR")
+                    pending = set()
+                    full_refresh = False
+                    first_event = last_event = None
+        finally:
+            self._close()
@@ -0,0 +1,71 @@
+"""Shared fixtures: throwaway repositories with local bare remotes.
+
+Every test runs with an isolated git configuration (no user or system
+config), a fixed identity and ``main`` as the initial branch.
+"""
+import os
+import subprocess
+
+import pytest
+
+
+def git(args, cwd, stdin=None):
+    """Runs git in cwd and returns its stripped stdout, failing the test on errors."""
+    result = subprocess.run(["git", *args], cwd=cwd, input=stdin, capture_output=True, text=True)
+    assert result.returncode == 0, f"git {' '.join(args)} failed: {result.stderr}"
+    return result.stdout.strip()
+
+
+def write(repo, path, content="content\n"):
+    """Writes a file below repo, creating its parent directories."""
+    full_path = os.path.join(repo, path)
+    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    with open(full_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    return full_path
+
+
+def make_remote(base, name="origin", files=None):
+    """Creates a bare repository at base/<name>.git with one commit on main and returns its path."""
+    remote = os.path.join(base, f"{name}.git")
+    seed = os.path.join(base, f"{name}-seed")
+    git(["init", "-q", "--bare", remote], base)
+    git(["init", "-q", seed], base)
+    for path, content in (files or {"README.md": "hello\n"}).items():
+        write(seed, path, content)
+    git(["add", "-A"], seed)
+    git(["commit", "-q", "-m", "Initial commit"], seed)
+    git(["push", "-q", remote, "main"], seed)
+    return remote
+
+
+@pytest.fixture(autouse=True)
+def git_env(tmp_path, monkeypatch):
+    home = tmp_path / "home"
+    home.mkdir()
+    monkeypatch.setenv("HOME", str(home))
+    monkeypatch.setenv("GIT_CONFIG_NOSYSTEM", "1")
+    monkeypatch.setenv("GIT_CONFIG_GLOBAL", os.devnull)
+    for role in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{role}_NAME", "Test")
+        monkeypatch.setenv(f"GIT_{role}_EMAIL", "test@example.invalid")
+    # Local file:// submodules are refused by default since git 2.38
+    config = {"init.defaultBranch": "main", "protocol.file.allow": "always"}
+    monkeypatch.setenv("GIT_CONFIG_COUNT", str(len(config)))
+    for i, (key, value) in enumerate(config.items()):
+        monkeypatch.setenv(f"GIT_CONFIG_KEY_{i}", key)
+        monkeypatch.setenv(f"GIT_CONFIG_VALUE_{i}", value)
+
+
+@pytest.fixture
+def remote(tmp_path):
+    """A bare remote with README.md committed on main."""
+    return make_remote(str(tmp_path))
+
+
+@pytest.fixture
+def work(tmp_path, remote):
+    """A clone of the remote fixture with main checked out."""
+    path = str(tmp_path / "work")
+    git(["clone", "-q", remote, path], str(tmp_path))
+    return path
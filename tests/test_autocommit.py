@@ -0,0 +1,58 @@
+import threading
+
+from git_automation import autocommit
+from git_automation.autocommit import AutoCommitter, PushCoalescer
+
+from conftest import git, write
+
+
+def test_requests_during_a_push_collapse_into_one(monkeypatch):
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def blocking_push(repo_path, branch, *args, **kwargs):
+        calls.append((repo_path, branch))
+        started.set()
+        release.wait(10)
+
+    monkeypatch.setattr(autocommit, "push", blocking_push)
+    coalescer = PushCoalescer()
+    assert coalescer.request("/r", "main")
+    assert started.wait(10)
+    assert [coalescer.request("/r", "main") for _ in range(5)] == [False] * 5
+    assert coalescer.request("/other", "main")
+    release.set()
+    coalescer.shutdown()
+    assert sorted(calls) == [("/other", "main"), ("/r", "main"), ("/r", "main")]
+    assert (coalescer.requested, coalescer.pushes, coalescer.failures) == (7, 3, 0)
+
+
+def test_failed_pushes_are_counted(monkeypatch):
+    def failing_push(*args, **kwargs):
+        raise OSError("remote unreachable")
+
+    monkeypatch.setattr(autocommit, "push", failing_push)
+    logged = []
+    coalescer = PushCoalescer(log=lambda message, status="INFO": logged.append(status))
+    coalescer.request("/r", "main")
+    coalescer.shutdown()
+    assert coalescer.failures == 1
+    assert logged == ["ERROR"]
+
+
+def test_a_burst_of_writes_becomes_one_commit(remote, work):
+    committed = threading.Event()
+    committer = AutoCommitter(work, "main", quiet_window=0.3, max_latency=10, commit_message="Burst",
+                              on_commit=lambda made: made and committed.set())
+    committer.start()
+    try:
+        for i in range(20):
+            write(work, f"file{i}.txt")
+        assert committed.wait(10)
+    finally:
+        committer.stop()
+    committer.coalescer.shutdown()
+    assert committer.commits == 1
+    assert git(["log", "--format=%s", "main"], remote).splitlines() == ["Burst", "Initial commit"]
+    assert git(["show", "--name-only", "--format=", "HEAD"], work).count("\n") == 19
@@ -0,0 +1,87 @@
+import os
+import threading
+import time
+
+import pytest
+
+from git_automation import batch
+from git_automation.batch import COMMITTED, FAILED, PUSHED, SKIPPED_CLEAN, remote_key, run_batch, select_repos
+
+from conftest import git, make_remote, write
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    """Three clones of their own bare remotes; "one" and "three" have uncommitted changes."""
+    base = str(tmp_path / "repos")
+    os.mkdir(base)
+    clones = []
+    for name in ("one", "two", "three"):
+        remote = make_remote(str(tmp_path), name)
+        clone = os.path.join(base, name)
+        git(["clone", "-q", remote, clone], base)
+        clones.append(clone)
+    write(clones[0], "README.md", "changed\n")
+    write(clones[2], "new.txt")
+    return clones
+
+
+def test_select_repos_by_all_glob_and_dirty(workspace):
+    one, two, three = workspace
+    assert select_repos(workspace) == workspace
+    assert select_repos(workspace, "t*") == [two, three]
+    assert select_repos(workspace, "*/repos/one") == [one]
+    assert select_repos(workspace, "dirty", max_workers=2) == [one, three]
+
+
+def test_remote_key_groups_by_host(tmp_path, work):
+    assert remote_key(work) == "local"
+    git(["remote", "set-url", "origin", "https://git.example.com/org/repo.git"], work)
+    assert remote_key(work) == "git.example.com"
+    git(["remote", "set-url", "origin", "git@ssh.example.com:org/repo.git"], work)
+    assert remote_key(work) == "ssh.example.com"
+    git(["remote", "remove", "origin"], work)
+    assert remote_key(work) == work
+
+
+def test_run_batch_commits_and_pushes_dirty_repositories(tmp_path, workspace):
+    seen = []
+    results = run_batch(workspace, "Batch commit", max_workers=3, on_result=seen.append)
+    assert [result.repo for result in results] == workspace
+    assert [result.outcome for result in results] == [PUSHED, SKIPPED_CLEAN, PUSHED]
+    assert sorted(result.repo for result in seen) == sorted(workspace)
+    for name in ("one", "three"):
+        remote = str(tmp_path / f"{name}.git")
+        assert git(["log", "-1", "--format=%s", "main"], remote) == "Batch commit"
+
+    write(workspace[1], "README.md", "changed\n")
+    results = run_batch(workspace, "Local only", do_push=False)
+    assert [result.outcome for result in results] == [SKIPPED_CLEAN, COMMITTED, SKIPPED_CLEAN]
+
+
+def test_failures_are_reported_per_repository(workspace):
+    git(["remote", "set-url", "origin", "/nonexistent/remote.git"], workspace[0])
+    results = run_batch(workspace)
+    assert [result.outcome for result in results] == [FAILED, SKIPPED_CLEAN, PUSHED]
+    assert results[0].error
+
+
+def test_pushes_are_limited_per_remote_host(workspace, monkeypatch):
+    for repo in workspace:
+        write(repo, "change.txt")
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def slow_push(repo_path, branch, *args, **kwargs):
+        with lock:
+            running.append(repo_path)
+            peak.append(len(running))
+        time.sleep(0.2)
+        with lock:
+            running.remove(repo_path)
+
+    monkeypatch.setattr(batch, "push", slow_push)
+    results = run_batch(workspace, max_workers=3, per_remote_limit=1)  # All three remotes are "local"
+    assert [result.outcome for result in results] == [PUSHED] * 3
+    assert max(peak) == 1
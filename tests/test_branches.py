@@ -0,0 +1,30 @@
+from git_automation.branches import branch_metadata, describe_branch, parse_track
+
+from conftest import git, write
+
+
+def test_parse_track():
+    assert parse_track("") == (0, 0, False)
+    assert parse_track("ahead 2, behind 1") == (2, 1, False)
+    assert parse_track("behind 3") == (0, 3, False)
+    assert parse_track("gone") == (0, 0, True)
+
+
+def test_local_and_remote_branches_most_recent_first(work):
+    write(work, "a.txt")
+    git(["add", "-A"], work)
+    git(["commit", "-q", "-m", "Local"], work)
+    git(["branch", "--no-track", "old", "origin/main"], work)
+    branches = {(branch.name, branch.remote): branch for branch in branch_metadata(work)}
+    assert set(branches) == {("main", False), ("old", False), ("origin/main", True)}
+    main = branches["main", False]
+    assert main.current and main.upstream == "origin/main" and (main.ahead, main.behind) == (1, 0)
+    assert describe_branch(main) == "origin/main, ahead 1"
+    assert describe_branch(branches["old", False]) == "no upstream"
+    assert sorted(branch.name for branch in branch_metadata(work, remotes=False)) == ["main", "old"]
+
+
+def test_cache_notices_new_branches(work):
+    assert [branch.name for branch in branch_metadata(work, remotes=False)] == ["main"]
+    git(["branch", "topic"], work)
+    assert sorted(branch.name for branch in branch_metadata(work, remotes=False)) == ["main", "topic"]
@@ -0,0 +1,50 @@
+import os
+import subprocess
+import sys
+
+from git_automation.cli import main
+
+from conftest import git, write
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_import_does_not_load_tkinter():
+    code = "import sys, git_automation; git_automation.get_branches; print('tkinter' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], cwd=PACKAGE_ROOT, capture_output=True, text=True,
+                            check=True)
+    assert result.stdout.strip() == "False"
+
+
+def test_repos_branches_and_status(tmp_path, work, capsys):
+    assert main(["repos", "--base-path", str(tmp_path), "--no-index"]) == 0
+    assert work in capsys.readouterr().out.splitlines()
+
+    git(["branch", "develop"], work)
+    assert main(["branches", work]) == 0
+    assert capsys.readouterr().out.splitlines() == ["develop", "main"]
+
+    write(work, "README.md", "changed\n")
+    write(work, "new file.txt")
+    assert main(["status", work]) == 0
+    assert sorted(capsys.readouterr().out.splitlines()) == [" M README.md", "?? new file.txt"]
+    assert main(["status", "-z", work]) == 0
+    assert sorted(capsys.readouterr().out.split("\0")) == ["", " M\tREADME.md", "??\tnew file.txt"]
+
+
+def test_push_commits_to_the_checked_out_branch(remote, work, capsys):
+    assert main(["push", work]) == 0
+    assert capsys.readouterr().out.strip() == "clean"
+    write(work, "new.txt")
+    assert main(["push", work, "-m", "From the CLI"]) == 0
+    captured = capsys.readouterr()
+    assert captured.out.strip() == "pushed"
+    assert "[INFO]" in captured.err
+    assert git(["log", "-1", "--format=%s", "main"], remote) == "From the CLI"
+
+
+def test_git_errors_are_logged_with_exit_code_one(work, capsys):
+    git(["remote", "set-url", "origin", "/nonexistent/remote.git"], work)
+    write(work, "new.txt")
+    assert main(["push", work]) == 1
+    assert "[ERROR] Git operation failed" in capsys.readouterr().err
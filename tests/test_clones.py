@@ -0,0 +1,98 @@
+import os
+import threading
+
+from git_automation.clones import (CANCELLED, CLONED, EXISTS, FAILED, PARTIAL_SUFFIX, RESUMED, CloneQueue,
+                                   clone_into, repo_name_from_url)
+from git_automation.discovery import discover_repos, load_index, repos_from_index
+
+from conftest import git, make_remote
+
+
+def file_url(path):
+    return "file://" + path
+
+
+def test_repo_name_from_url():
+    assert repo_name_from_url("https://example.com/org/tool.git") == "tool"
+    assert repo_name_from_url("git@example.com:org/tool.git/") == "tool"
+    assert repo_name_from_url("C:\\remotes\\tool") == "tool"
+
+
+def test_queue_clones_each_remote_once_and_records_them(tmp_path):
+    remotes = [make_remote(str(tmp_path), name) for name in ("one", "two")]
+    base = str(tmp_path / "clones")
+    os.mkdir(base)
+    index_path = str(tmp_path / "index.json")
+    discover_repos(base, index_path=index_path)
+    urls = [file_url(remote) for remote in remotes]
+    results = CloneQueue(base, max_concurrent=2, index_path=index_path).run(urls + urls[:1], profile="shallow")
+    assert [(result.url, result.outcome) for result in results] == [(urls[0], CLONED), (urls[1], CLONED)]
+    assert os.path.isfile(os.path.join(base, "one", "README.md"))
+    assert not os.path.exists(os.path.join(base, "one" + PARTIAL_SUFFIX))
+    indexed = repos_from_index(load_index(index_path, base), base)
+    assert indexed == [os.path.join(base, "one"), os.path.join(base, "two")]
+    assert [result.outcome for result in CloneQueue(base).run(urls[:1])] == [EXISTS]
+
+
+def test_queue_keeps_a_nested_index(tmp_path):
+    url = file_url(make_remote(str(tmp_path), "tool"))
+    base = str(tmp_path / "clones")
+    existing = os.path.join(base, "existing")
+    git(["init", "-q", existing], str(tmp_path))
+    git(["init", "-q", os.path.join(existing, "inner")], str(tmp_path))
+    index_path = str(tmp_path / "index.json")
+    discover_repos(base, include_nested=True, index_path=index_path)
+    CloneQueue(base, index_path=index_path, include_nested=True).run([url])
+    indexed = repos_from_index(load_index(index_path, base, include_nested=True), base)
+    assert indexed == [existing, os.path.join(existing, "inner"), os.path.join(base, "tool")]
+
+
+def test_resumes_a_finished_transfer_from_the_checkout(tmp_path):
+    url = file_url(make_remote(str(tmp_path), "tool"))
+    base = str(tmp_path / "clones")
+    os.mkdir(base)
+    work_dir = os.path.join(base, "tool" + PARTIAL_SUFFIX)
+    git(["clone", "-q", "--no-checkout", url, work_dir], base)  # Interrupted after the transfer
+    result = clone_into(url, base)
+    assert result.outcome == RESUMED
+    assert os.path.isfile(os.path.join(base, "tool", "README.md"))
+    assert not os.path.exists(work_dir)
+
+
+def test_relative_base_path_clones_beside_the_caller(tmp_path, monkeypatch):
+    url = file_url(make_remote(str(tmp_path), "tool"))
+    os.mkdir(tmp_path / "clones")
+    monkeypatch.chdir(tmp_path)
+    result = clone_into(url, "clones")
+    assert (result.outcome, result.path) == (CLONED, str(tmp_path / "clones" / "tool"))
+    assert os.path.isfile(tmp_path / "clones" / "tool" / "README.md")
+    assert os.listdir(tmp_path / "clones") == ["tool"]
+
+
+def test_incomplete_or_foreign_partial_directory_is_replaced(tmp_path):
+    url = file_url(make_remote(str(tmp_path), "tool"))
+    base = str(tmp_path / "clones")
+    work_dir = os.path.join(base, "tool" + PARTIAL_SUFFIX)
+    os.makedirs(os.path.join(work_dir, "junk"))
+    assert clone_into(url, base).outcome == CLONED
+    assert not os.path.exists(work_dir)
+    assert not os.path.exists(os.path.join(base, "tool", "junk"))
+
+
+def test_failed_clone_is_cleaned_up(tmp_path):
+    base = str(tmp_path / "clones")
+    os.mkdir(base)
+    result = clone_into(file_url(str(tmp_path / "missing.git")), base)
+    assert result.outcome == FAILED
+    assert result.error
+    assert os.listdir(base) == []
+
+
+def test_cancelled_queue_skips_clones(tmp_path):
+    url = file_url(make_remote(str(tmp_path), "tool"))
+    base = str(tmp_path / "clones")
+    os.mkdir(base)
+    cancel = threading.Event()
+    cancel.set()
+    assert [result.outcome for result in CloneQueue(base, cancel=cancel).run([url])] == [CANCELLED]
+    assert os.listdir(base) == []
@@ -0,0 +1,123 @@
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from git_automation.batch import FAILED, PUSHED, SKIPPED_CLEAN
+from git_automation.clones import CANCELLED
+from git_automation.daemon import (DEFAULT_POLICY, FETCHED, MAX_BACKOFF, SKIPPED_UNCHANGED, SyncDaemon, SyncPolicies,
+                                   backoff_delay)
+
+from conftest import git, write
+
+
+@pytest.fixture
+def synced(tmp_path, remote):
+    """base/repo, a clone of the remote fixture under its own base path."""
+    base = str(tmp_path / "base")
+    os.mkdir(base)
+    repo = os.path.join(base, "repo")
+    git(["clone", "-q", remote, repo], base)
+    return base, repo
+
+
+def policies(**fields):
+    return SyncPolicies(DEFAULT_POLICY._replace(**fields))
+
+
+def test_policies_load_and_match_in_file_order(tmp_path):
+    path = tmp_path / "policy.json"
+    path.write_text(json.dumps({
+        "default": {"interval": 60},
+        "repos": {"docs-*": {"push": False}, "*/legacy/*": {"enabled": False}, "docs-old": {"interval": 1}},
+    }))
+    loaded = SyncPolicies.load(str(path))
+    assert loaded.policy_for("/w/app") == DEFAULT_POLICY._replace(interval=60)
+    assert loaded.policy_for("/w/docs-old") == DEFAULT_POLICY._replace(interval=60, push=False)
+    assert not loaded.policy_for("/w/legacy/app").enabled
+    assert SyncPolicies.load(str(tmp_path / "missing.json")).policy_for("/w/app") == DEFAULT_POLICY
+
+
+def test_backoff_doubles_up_to_the_cap():
+    assert [backoff_delay(60, failures) for failures in (1, 2, 3)] == [120, 240, 480]
+    assert backoff_delay(60, 20) == MAX_BACKOFF
+    assert backoff_delay(2 * MAX_BACKOFF, 1) == 2 * MAX_BACKOFF
+
+
+def test_unchanged_repositories_are_skipped(remote, synced):
+    base, repo = synced
+    daemon = SyncDaemon(base, policies(message="Auto-sync"))
+    assert [result.outcome for result in daemon.run_once()] == [FETCHED]
+    assert [result.outcome for result in daemon.run_once()] == [SKIPPED_UNCHANGED]
+    assert [result.outcome for result in daemon.run_once(force=True)] == [SKIPPED_CLEAN]
+
+    write(repo, "new.txt")  # A new file touches the working-tree root
+    assert [result.outcome for result in daemon.run_once()] == [PUSHED]
+    assert git(["log", "-1", "--format=%s", "main"], remote) == "Auto-sync"
+    assert [result.outcome for result in daemon.run_once()] == [SKIPPED_UNCHANGED]
+
+
+def test_scheduler_runs_each_repository_on_its_interval(synced):
+    base, repo = synced
+    results = []
+    enough = threading.Event()
+
+    def on_result(result):
+        results.append(result)
+        if len(results) >= 3:
+            enough.set()
+
+    daemon = SyncDaemon(base, policies(interval=0.1), on_result=on_result)
+    daemon.start()
+    try:
+        assert enough.wait(30)
+    finally:
+        daemon.stop()
+    assert not daemon.running
+    assert {result.repo for result in results} == {repo}
+    assert [result.outcome for result in results[:3]] == [FETCHED, SKIPPED_UNCHANGED, SKIPPED_UNCHANGED]
+    assert all(0.09 <= result.next_run <= 0.11 for result in results)
+
+
+def test_unexpected_errors_are_logged_and_retried(synced, monkeypatch):
+    from git_automation import daemon as daemon_module
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(daemon_module, "stage_and_commit", broken)
+    base, repo = synced
+    logged = []
+    results = []
+    retried = threading.Event()
+
+    def on_result(result):
+        results.append(result)
+        if len(results) >= 2:
+            retried.set()
+
+    daemon = SyncDaemon(base, policies(interval=0.05, fetch=False), on_result=on_result,
+                        log=lambda message, status="INFO": logged.append((status, message)))
+    daemon.start()
+    try:
+        assert retried.wait(30)  # Rescheduled with backoff instead of stuck in flight
+    finally:
+        daemon.stop()
+    assert [result.outcome for result in results[:2]] == [FAILED, FAILED]
+    assert results[0].error == "RuntimeError('boom')"
+    assert any(status == "ERROR" and "boom" in message for status, message in logged)
+
+
+def test_stop_cancels_a_running_fetch(synced):
+    base, repo = synced
+    git(["config", "remote.origin.uploadpack", "sleep 30; git-upload-pack"], repo)
+    results = []
+    daemon = SyncDaemon(base, policies(interval=0.1), on_result=results.append)
+    daemon.start()
+    time.sleep(1.0)  # The first cycle is now waiting on the fetch
+    start = time.monotonic()
+    daemon.stop()
+    assert time.monotonic() - start < 10
+    assert [result.outcome for result in results] == [CANCELLED]
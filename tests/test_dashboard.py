@@ -0,0 +1,60 @@
+import os
+
+from git_automation.dashboard import Dashboard, compute_state, format_states
+
+from conftest import git, write
+
+
+def test_compute_state_counts_dirty_files_and_divergence(remote, work):
+    state = compute_state(work)
+    assert (state.branch, state.dirty, state.ahead, state.behind, state.upstream) == ("main", 0, 0, 0, "origin/main")
+    write(work, "a.txt")
+    write(work, "README.md", "changed\n")
+    git(["commit", "-q", "-am", "Local"], work)
+    state = compute_state(work)
+    assert (state.dirty, state.ahead, state.behind) == (1, 1, 0)
+    git(["checkout", "-q", "--detach"], work)
+    assert compute_state(work).branch is None
+
+
+def test_unchanged_repositories_are_not_recomputed(tmp_path, work):
+    other = str(tmp_path / "other")
+    git(["init", "-q", other], str(tmp_path))
+    dashboard = Dashboard(max_workers=2)
+    seen = []
+    states = dashboard.refresh([work, other], on_state=lambda state, recomputed: seen.append(recomputed))
+    assert sorted(states) == sorted([work, other])
+    assert seen == [True, True]
+    assert dashboard.last_refresh[:2] == (2, 2)
+
+    dashboard.refresh([work, other])
+    assert dashboard.last_refresh[:2] == (2, 0)
+    write(work, "a.txt")  # A new file touches the working-tree root
+    assert dashboard.refresh([work, other])[work].dirty == 1
+    assert dashboard.last_refresh[:2] == (2, 1)
+    dashboard.refresh([work, other], force=True)
+    assert dashboard.last_refresh[:2] == (2, 2)
+
+
+def test_errors_are_reported_per_repository(tmp_path, work):
+    missing = str(tmp_path / "missing")
+    os.mkdir(missing)
+    states = Dashboard().refresh([work, missing])
+    assert states[work].error == ""
+    assert states[missing].error
+    lines = format_states(states).splitlines()
+    assert lines[0].startswith("Repository")
+    assert f"{missing}  error: " in "\n".join(lines)
+
+
+def test_repository_vanishing_while_computed_is_an_error(work, monkeypatch):
+    from git_automation import dashboard as dashboard_module
+
+    def compute_and_remove(repo_path):
+        state = compute_state(repo_path)
+        os.rename(os.path.join(repo_path, ".git"), os.path.join(repo_path, "git-moved"))
+        return state
+
+    monkeypatch.setattr(dashboard_module, "compute_state", compute_and_remove)
+    states = Dashboard().refresh([work])
+    assert states[work].error
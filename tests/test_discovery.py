@@ -0,0 +1,80 @@
+import json
+import os
+
+import pytest
+
+from git_automation.core import get_git_repos
+from git_automation.discovery import add_repo_to_index, cached_repos, discover_repos, load_index
+
+from conftest import git
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """base/{a, group/b, group/deep/c} repositories, plus a nested repo inside a and plain folders."""
+    base = tmp_path / "base"
+    for path in ("a", "group/b", "group/deep/c", "a/nested"):
+        (base / path).mkdir(parents=True)
+        git(["init", "-q", str(base / path)], str(tmp_path))
+    (base / "plain" / "empty").mkdir(parents=True)
+    (base / "node_modules" / "skipped").mkdir(parents=True)
+    git(["init", "-q", str(base / "node_modules" / "skipped")], str(tmp_path))
+    return str(base)
+
+
+def repos(base, *names):
+    return [os.path.join(base, *name.split("/")) for name in names]
+
+
+def test_stops_at_repositories_unless_nested(tree):
+    assert discover_repos(tree) == repos(tree, "a", "group/b", "group/deep/c")
+    assert discover_repos(tree, include_nested=True) == repos(tree, "a", "a/nested", "group/b", "group/deep/c")
+
+
+def test_index_is_reused_and_notices_changes(tmp_path, tree):
+    index_path = str(tmp_path / "index.json")
+    assert discover_repos(tree, index_path=index_path) == repos(tree, "a", "group/b", "group/deep/c")
+    with open(index_path, "r", encoding="utf-8") as f:
+        assert json.load(f)["base_path"] == os.path.abspath(tree)
+
+    git(["init", "-q", os.path.join(tree, "group", "new")], tree)
+    os.rename(os.path.join(tree, "a"), os.path.join(tree, "plain", "a"))
+    assert discover_repos(tree, index_path=index_path) == repos(tree, "group/b", "group/deep/c", "group/new",
+                                                                "plain/a")
+
+
+def test_index_for_other_settings_is_ignored(tmp_path, tree):
+    index_path = str(tmp_path / "index.json")
+    discover_repos(tree, index_path=index_path)
+    assert load_index(index_path, tree) != {}
+    assert load_index(index_path, tree, include_nested=True) == {}
+    assert load_index(index_path, str(tmp_path)) == {}
+    with open(index_path, "w", encoding="utf-8") as f:
+        f.write("{truncated")
+    assert load_index(index_path, tree) == {}
+    assert discover_repos(tree, index_path=index_path) == repos(tree, "a", "group/b", "group/deep/c")
+
+
+def test_add_repo_to_index_without_rescanning(tmp_path, tree):
+    index_path = str(tmp_path / "index.json")
+    discover_repos(tree, index_path=index_path)
+    new_repo = os.path.join(tree, "group", "cloned")
+    git(["init", "-q", new_repo], tree)
+    assert add_repo_to_index(index_path, tree, new_repo) == repos(tree, "a", "group/b", "group/cloned",
+                                                                  "group/deep/c")
+    assert discover_repos(tree, index_path=index_path) == repos(tree, "a", "group/b", "group/cloned",
+                                                                "group/deep/c")
+
+
+def test_streams_each_level(tree):
+    levels = []
+    assert get_git_repos(tree, on_repos=levels.append) == repos(tree, "a", "group/b", "group/deep/c")
+    assert levels == [repos(tree, "a"), repos(tree, "group/b"), repos(tree, "group/deep/c")]
+
+
+def test_cached_repos_come_from_the_last_scan(tmp_path, tree):
+    index_path = str(tmp_path / "index.json")
+    assert cached_repos(index_path, tree) == []
+    discover_repos(tree, index_path=index_path)
+    git(["init", "-q", os.path.join(tree, "late")], tree)  # Not scanned yet
+    assert cached_repos(index_path, tree) == repos(tree, "a", "group/b", "group/deep/c")
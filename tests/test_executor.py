@@ -0,0 +1,39 @@
+import threading
+
+from git_automation.executor import JobExecutor
+
+
+class Root:
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, callback, *args):
+        self.scheduled.append((ms, callback, args))
+
+
+def test_callbacks_run_only_when_polled():
+    executor = JobExecutor(max_workers=2)
+    main_thread = threading.current_thread()
+    done = []
+    future = executor.submit(lambda a, b: a + b, 1, b=2,
+                             on_done=lambda f: done.append((f.result(), threading.current_thread())))
+    assert future.result(10) == 3
+    assert done == []
+    executor.post(done.append, "posted")
+    root = Root()
+    executor.poll(root, interval_ms=5)
+    assert done == [(3, main_thread), "posted"]
+    assert [(ms, callback) for ms, callback, _ in root.scheduled] == [(5, executor.poll)]
+    executor.shutdown(wait=True)
+
+
+def test_failing_callback_keeps_the_poll_loop_armed():
+    executor = JobExecutor()
+    executor.post(lambda: 1 / 0)
+    root = Root()
+    try:
+        executor.poll(root)
+    except ZeroDivisionError:
+        pass
+    assert len(root.scheduled) == 1
+    executor.shutdown()
@@ -0,0 +1,89 @@
+import subprocess
+import threading
+import time
+
+import pytest
+
+from git_automation.gitcmd import GitCancelled, GitProgress, format_progress, parse_progress, stream_git
+
+from conftest import make_remote
+
+
+def alias(command):
+    """git arguments that run a shell command as the git process's child."""
+    return ["-c", f"alias.slow=!{command}", "slow"]
+
+
+def alive(pid):
+    try:
+        with open(f"/proc/{pid}/stat", "r", encoding="utf-8") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except OSError:
+        return False
+
+
+def test_parse_progress():
+    assert parse_progress("Receiving objects:  45% (450/1000), 1.20 MiB | 2.40 MiB/s") == GitProgress(
+        "Receiving objects", 45, 450, 1000, 1.2 * 1024 ** 2, 2.4 * 1024 ** 2
+    )
+    assert parse_progress("remote: Counting objects: 100% (5/5), done.") == GitProgress(
+        "Counting objects", 100, 5, 5, None, None
+    )
+    assert parse_progress("Writing objects: 100% (3/3), 250 bytes | 250.00 KiB/s, done.").bytes == 250
+    assert parse_progress("To /tmp/origin.git") is None
+
+
+def test_format_progress():
+    progress = GitProgress("Receiving objects", 45, 450, 1000, 1.2 * 1024 ** 2, 2.4 * 1024 ** 2)
+    assert format_progress(progress) == "Receiving objects 45% (450/1000), 1.20 MiB at 2.40 MiB/s"
+    assert format_progress(progress._replace(bytes=None, rate=None)) == "Receiving objects 45% (450/1000)"
+
+
+def test_progress_is_reported_while_cloning(tmp_path):
+    url = "file://" + make_remote(str(tmp_path), "tool")
+    updates = []
+    result = stream_git(["clone", "--progress", url, "clone"], str(tmp_path), on_progress=updates.append)
+    assert result.returncode == 0
+    assert any(update.phase == "Receiving objects" and update.percent == 100 for update in updates)
+    assert "\r" not in result.stderr
+
+
+def test_overall_timeout(tmp_path):
+    start = time.monotonic()
+    with pytest.raises(subprocess.TimeoutExpired):
+        stream_git(alias("echo working >&2; sleep 30"), str(tmp_path), timeout=0.5)
+    assert time.monotonic() - start < 10
+
+
+def test_stall_timeout_is_reset_by_output(tmp_path):
+    result = stream_git(alias("for i in 1 2 3 4; do echo tick >&2; sleep 0.3; done"), str(tmp_path),
+                        stall_timeout=1.0)
+    assert result.stderr.splitlines() == ["tick"] * 4
+    with pytest.raises(subprocess.TimeoutExpired):
+        stream_git(alias("echo tick >&2; sleep 30"), str(tmp_path), stall_timeout=0.5)
+
+
+def test_cancel_stops_the_whole_process_group(tmp_path):
+    pid_file = tmp_path / "pid"
+    cancel = threading.Event()
+
+    def cancel_when_started():
+        while not pid_file.exists() or not pid_file.read_text().strip():
+            time.sleep(0.05)
+        cancel.set()
+
+    threading.Thread(target=cancel_when_started, daemon=True).start()
+    with pytest.raises(GitCancelled):
+        stream_git(alias(f"echo $$ > '{pid_file}'; sleep 30"), str(tmp_path), cancel=cancel)
+    shell = int(pid_file.read_text())
+    deadline = time.monotonic() + 5
+    while alive(shell) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not alive(shell)
+
+
+def test_failures_raise_with_stderr(tmp_path):
+    with pytest.raises(subprocess.CalledProcessError) as error:
+        stream_git(["rev-parse", "HEAD"], str(tmp_path))
+    assert "not a git repository" in error.value.stderr
+    assert stream_git(["rev-parse", "HEAD"], str(tmp_path), check=False).returncode != 0
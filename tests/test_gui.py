@@ -0,0 +1,31 @@
+"""Tests for the Tk-independent helpers of the V1.2 GUI script (loaded without starting the window)."""
+import importlib.util
+import os
+
+import pytest
+
+from conftest import git
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                      "Git_Automation_With_Branch_V1.2.py")
+
+
+@pytest.fixture(scope="module")
+def gui():
+    pytest.importorskip("tkinter")
+    spec = importlib.util.spec_from_file_location("git_automation_gui", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_default_branch_is_the_checked_out_branch(gui, work):
+    git(["checkout", "-q", "-b", "develop"], work)
+    assert gui.default_branch(work, ["develop", "main"]) == "develop"
+
+
+def test_default_branch_on_detached_head(gui, work):
+    git(["checkout", "-q", "--detach"], work)
+    assert gui.default_branch(work, ["develop", "main"]) == "main"
+    assert gui.default_branch(work, ["develop", "release"]) == "develop"
+    assert gui.default_branch(work, []) == ""
@@ -0,0 +1,90 @@
+import time
+
+import pytest
+
+from git_automation.helpers import HelperPool
+
+from conftest import git, write
+
+
+@pytest.fixture
+def pool():
+    pool = HelperPool(max_helpers=2)
+    yield pool
+    pool.close_all()
+
+
+def test_lookups_and_reads_share_one_process(work, pool):
+    head = git(["rev-parse", "HEAD"], work)
+    info = pool.lookup(work, "HEAD")
+    assert (info.oid, info.type) == (head, "commit")
+    assert pool.lookup(work, "main:README.md").type == "blob"
+    info, content = pool.read(work, "main:README.md")
+    assert (info.size, content) == (6, b"hello\n")
+    assert pool.lookup(work, "no-such-branch") is None
+    assert pool.read(work, "no-such-branch") is None
+    assert pool.lookup(work, "HEAD\nHEAD") is None
+    assert pool.stats() == {"helpers": 1, "spawned": 2, "requests": 5, "evicted": 0}
+
+
+def test_new_refs_are_seen_without_restarting(work, pool):
+    assert pool.lookup(work, "refs/heads/topic") is None
+    write(work, "new.txt")
+    git(["add", "-A"], work)
+    git(["commit", "-q", "-m", "Topic"], work)
+    git(["branch", "topic"], work)
+    assert pool.lookup(work, "topic").oid == git(["rev-parse", "HEAD"], work)
+    assert pool.stats()["spawned"] == 1
+
+
+def test_relative_paths_are_resolved_before_picking_a_helper(tmp_path, pool, monkeypatch):
+    for name in ("a", "b"):
+        git(["init", "-q", "-b", name, str(tmp_path / name / "repo")], str(tmp_path))
+        git(["commit", "-q", "--allow-empty", "-m", name], str(tmp_path / name / "repo"))
+    heads = []
+    for name in ("a", "b"):
+        monkeypatch.chdir(tmp_path / name)
+        heads.append(pool.lookup("repo", "HEAD").oid)
+    assert heads == [git(["rev-parse", "HEAD"], str(tmp_path / name / "repo")) for name in ("a", "b")]
+    assert pool.stats()["helpers"] == 2
+
+
+def test_least_recently_used_helpers_are_evicted(tmp_path, pool):
+    repos = [str(tmp_path / name) for name in ("a", "b", "c")]
+    for repo in repos:
+        git(["init", "-q", repo], str(tmp_path))
+    first = pool.get(repos[0])
+    pool.get(repos[1])
+    pool.get(repos[0])
+    pool.get(repos[2])  # Evicts b, the least recently used
+    assert pool.get(repos[0]) is first
+    assert pool.stats()["helpers"] == 2
+    assert pool.stats()["evicted"] == 1
+
+
+def test_idle_helpers_are_closed(tmp_path, work):
+    pool = HelperPool(idle_timeout=0.2)
+    try:
+        other = str(tmp_path / "other")
+        git(["init", "-q", other], str(tmp_path))
+        helper = pool.get(work)
+        time.sleep(0.3)
+        pool.get(other)  # Using the pool closes helpers idle for longer than idle_timeout
+        assert pool.stats()["helpers"] == 1
+        with pytest.raises(OSError):
+            helper.info("HEAD")
+    finally:
+        pool.close_all()
+
+
+def test_idle_helpers_are_reaped_without_further_use(work):
+    pool = HelperPool(idle_timeout=0.2)
+    try:
+        pool.lookup(work, "HEAD")
+        deadline = time.monotonic() + 5
+        while pool.stats()["helpers"] and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert pool.stats() == {"helpers": 0, "spawned": 0, "requests": 0, "evicted": 1}
+        assert pool.close_idle() == 0
+    finally:
+        pool.close_all()
@@ -0,0 +1,104 @@
+import threading
+
+from git_automation.logsink import LogSink
+
+
+class TextWidget:
+    """Records what a Tk Text widget would hold, using its "line.column" indices."""
+
+    def __init__(self):
+        self.lines = []
+        self.inserts = 0
+
+    def insert(self, index, text):
+        assert index == "end"
+        self.inserts += 1
+        self.lines.extend(text.split("\n")[:-1])
+
+    def delete(self, start, end):
+        assert start == "1.0"
+        if end == "end":
+            self.lines.clear()
+        else:
+            del self.lines[:int(end.split(".")[0]) - 1]
+
+    def see(self, index):
+        pass
+
+
+class Root:
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, callback, *args):
+        self.scheduled.append((ms, callback, args))
+
+
+def attached(sink):
+    widget = TextWidget()
+    root = Root()
+    sink.attach(root, widget)
+    return widget, root
+
+
+def test_writes_are_flushed_in_one_insert():
+    sink = LogSink()
+    widget, root = attached(sink)
+    threads = [threading.Thread(target=sink.write, args=(f"line {i}",)) for i in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert widget.lines == []  # Nothing touches the widget until the main thread flushes
+    sink.flush()
+    assert sorted(widget.lines) == sorted(f"line {i}" for i in range(20))
+    assert widget.inserts == 1
+    sink.flush()
+    assert widget.inserts == 1
+
+
+def test_flush_loop_rearms_itself():
+    sink = LogSink(flush_interval_ms=10)
+    widget, root = attached(sink)
+    ms, callback, args = root.scheduled.pop()
+    assert ms == 10
+    sink.write("hello")
+    callback(*args)
+    assert widget.lines == ["hello"]
+    assert len(root.scheduled) == 1
+
+
+def test_panel_is_trimmed_to_max_lines():
+    sink = LogSink(max_lines=5)
+    widget, _ = attached(sink)
+    for i in range(3):
+        sink.write(f"a{i}")
+    sink.flush()
+    sink.write("multi\nline")
+    for i in range(2):
+        sink.write(f"b{i}")
+    sink.flush()
+    assert widget.lines == ["a2", "multi", "line", "b0", "b1"]
+
+
+def test_pending_lines_are_bounded_before_a_flush():
+    sink = LogSink(max_lines=3)
+    widget, _ = attached(sink)
+    for i in range(1000):
+        sink.write(f"line {i}")
+    sink.flush()
+    assert widget.lines == ["line 997", "line 998", "line 999"]
+
+
+def test_clear_drops_pending_and_shown_lines():
+    sink = LogSink()
+    widget, _ = attached(sink)
+    sink.write("old")
+    sink.flush()
+    sink.write("pending")
+    sink.clear()
+    sink.flush()
+    assert widget.lines == []
+    sink.write("new")
+    sink.flush()
+    assert widget.lines == ["new"]
@@ -0,0 +1,31 @@
+import os
+
+from git_automation.maintenance import format_maintenance, run_maintenance
+
+from conftest import git
+
+
+def test_maintenance_packs_and_enables_the_untracked_cache(tmp_path, work):
+    missing = str(tmp_path / "missing")
+    os.mkdir(missing)
+    results = run_maintenance([work, missing], max_workers=2, samples=1)
+    assert [result.repo for result in results] == [work, missing]
+    assert results[0].error == ""
+    assert results[0].tasks == ["pack_refs", "loose_objects", "multi_pack_index", "commit_graph", "fast_status"]
+    git_dir = os.path.join(work, ".git")
+    assert os.path.isfile(os.path.join(git_dir, "packed-refs"))
+    assert os.path.isfile(os.path.join(git_dir, "objects", "pack", "multi-pack-index"))
+    assert os.path.isdir(os.path.join(git_dir, "objects", "info", "commit-graphs"))
+    assert git(["config", "core.untrackedCache"], work) == "true"
+    assert results[1].error and results[1].tasks == []
+    lines = format_maintenance(results).splitlines()
+    assert lines[0].startswith("Repository") and lines[2].startswith(f"{missing}  ")
+    assert lines[-1].startswith("2 repositories:") and lines[-1].endswith(", 1 failed")
+
+
+def test_repository_without_packs_skips_the_multi_pack_index(tmp_path):
+    empty = str(tmp_path / "empty")
+    git(["init", "-q", empty], str(tmp_path))
+    [result] = run_maintenance([empty], samples=1)
+    assert result.error == ""
+    assert result.tasks == ["pack_refs", "loose_objects", "commit_graph", "fast_status"]
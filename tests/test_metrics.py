@@ -0,0 +1,100 @@
+import json
+import subprocess
+
+import pytest
+
+from git_automation.cli import main
+from git_automation.metrics import Recorder, Span, prometheus_text, recorder, write_jsonl, write_prometheus_textfile
+
+
+def test_span_records_duration_attributes_and_errors():
+    spans = Recorder()
+    with spans.span("stage", repo="r") as current:
+        current.attrs["bytes"] = 10
+    with pytest.raises(subprocess.CalledProcessError):
+        with spans.span("git"):
+            raise subprocess.CalledProcessError(128, ["git"])
+    with pytest.raises(KeyError):
+        with spans.span("lookup"):
+            raise KeyError("x")
+    ok, git_failure, error = spans.spans()
+    assert ok.attrs == {"repo": "r", "bytes": 10}
+    assert ok.duration >= 0 and not ok.failed
+    assert git_failure.attrs == {"exit_code": 128} and git_failure.failed
+    assert error.attrs == {"error": "KeyError"} and error.failed
+    assert len(spans.drain()) == 3
+    assert spans.spans() == []
+
+
+def test_recorder_is_bounded():
+    spans = Recorder(max_spans=2)
+    for i in range(5):
+        spans.record(f"s{i}", 0.0, 0.1)
+    assert [s.name for s in spans.spans()] == ["s3", "s4"]
+
+
+def test_spans_since_a_mark():
+    spans = Recorder(max_spans=3)
+    spans.record("s0", 0.0, 0.1)
+    first, mark = spans.spans_since()
+    for i in range(1, 3):
+        spans.record(f"s{i}", 0.0, 0.1)
+    later, mark = spans.spans_since(mark)
+    assert ([s.name for s in first], [s.name for s in later]) == (["s0"], ["s1", "s2"])
+    for i in range(3, 8):
+        spans.record(f"s{i}", 0.0, 0.1)
+    assert [s.name for s in spans.spans_since(mark)[0]] == ["s5", "s6", "s7"]  # s3 and s4 were dropped
+    spans.drain()
+    assert spans.spans_since(mark) == ([], 8)
+
+
+def test_prometheus_histograms_per_stage():
+    text = prometheus_text([
+        Span("push", 0, 0.2, {"bytes": 100}),
+        Span("push", 0, 3.0, {"exit_code": 1}),
+        Span("add", 0, 0.001),
+    ], buckets=(0.1, 1.0))
+    lines = text.splitlines()
+    assert "# TYPE git_automation_stage_duration_seconds histogram" in lines
+    assert 'git_automation_stage_duration_seconds_bucket{stage="push",le="0.1"} 0' in lines
+    assert 'git_automation_stage_duration_seconds_bucket{stage="push",le="1.0"} 1' in lines
+    assert 'git_automation_stage_duration_seconds_bucket{stage="push",le="+Inf"} 2' in lines
+    assert 'git_automation_stage_duration_seconds_sum{stage="push"} 3.200000' in lines
+    assert 'git_automation_stage_duration_seconds_count{stage="add"} 1' in lines
+    assert 'git_automation_stage_failures_total{stage="push"} 1' in lines
+    assert 'git_automation_stage_failures_total{stage="add"} 0' in lines
+    assert 'git_automation_stage_output_bytes_total{stage="push"} 100' in lines
+    assert text.endswith("\n")
+
+
+def test_exporters_write_files(tmp_path):
+    spans = [Span("push", 1.5, 0.2, {"repo": "/r"})]
+    jsonl = tmp_path / "spans.jsonl"
+    write_jsonl(spans, str(jsonl))
+    write_jsonl(spans, str(jsonl))
+    assert [json.loads(line) for line in jsonl.read_text().splitlines()] == [
+        {"name": "push", "start": 1.5, "duration": 0.2, "repo": "/r"}
+    ] * 2
+    prom = tmp_path / "git_automation.prom"
+    write_prometheus_textfile(spans, str(prom))
+    assert prom.read_text() == prometheus_text(spans)
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_cli_exports_recorded_spans(tmp_path, work):
+    recorder.drain()
+    jsonl = tmp_path / "spans.jsonl"
+    prom = tmp_path / "metrics.prom"
+    assert main(["--metrics-jsonl", str(jsonl), "--metrics-prom", str(prom), "branches", work]) == 0
+    names = [json.loads(line)["name"] for line in jsonl.read_text().splitlines()]
+    assert "branches" in names
+    assert 'git_automation_stage_duration_seconds_count{stage="branches"} 1' in prom.read_text().splitlines()
+
+
+def test_repeated_exports_append_each_span_once(tmp_path, work):
+    jsonl = tmp_path / "spans.jsonl"
+    args = ["--metrics-jsonl", str(jsonl), "branches", work]
+    assert main(args) == 0
+    assert main(args) == 0
+    names = [json.loads(line)["name"] for line in jsonl.read_text().splitlines()]
+    assert names.count("branches") == 2
@@ -0,0 +1,75 @@
+import os
+import threading
+import time
+
+import pytest
+
+from git_automation.clones import CLONED, CloneQueue
+from git_automation.gitcmd import GitCancelled
+from git_automation.mirrors import MirrorCache, normalize_url
+
+from conftest import git, make_remote, write
+
+
+def test_normalize_url():
+    assert normalize_url(" https://example.com/org/tool.git/ ") == "https://example.com/org/tool"
+    assert normalize_url("https://example.com/org/tool") == "https://example.com/org/tool"
+
+
+def test_clones_go_through_the_mirror_and_point_origin_upstream(tmp_path):
+    upstream = make_remote(str(tmp_path), "tool")
+    cache = MirrorCache(str(tmp_path / "cache"))
+    for name in ("first", "second"):
+        base = str(tmp_path / name)
+        os.mkdir(base)
+        results = CloneQueue(base, mirror_cache=cache).run([upstream])
+        assert [result.outcome for result in results] == [CLONED]
+        clone = os.path.join(base, "tool")
+        assert git(["config", "--get", "remote.origin.url"], clone) == upstream
+        assert os.path.isfile(os.path.join(clone, "README.md"))
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["mirrors"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 0.5
+    assert git(["rev-parse", "--is-bare-repository"], cache.mirror_path(upstream)) == "true"
+    assert MirrorCache(str(tmp_path / "cache")).stats() == stats  # Persisted
+
+
+def test_stale_mirror_is_refreshed(tmp_path):
+    upstream = make_remote(str(tmp_path), "tool")
+    cache = MirrorCache(str(tmp_path / "cache"), refresh_interval=0)
+    mirror = cache.ensure(upstream)
+    seed = str(tmp_path / "tool-seed")
+    write(seed, "new.txt")
+    git(["add", "-A"], seed)
+    git(["commit", "-q", "-m", "Second commit"], seed)
+    git(["push", "-q", upstream, "main"], seed)
+    assert cache.ensure(upstream) == mirror
+    assert git(["log", "-1", "--format=%s", "main"], mirror) == "Second commit"
+    assert cache.refresh_all() == 0
+
+
+def test_least_recently_used_mirrors_are_evicted(tmp_path):
+    upstreams = [make_remote(str(tmp_path), name) for name in ("one", "two")]
+    cache = MirrorCache(str(tmp_path / "cache"), max_bytes=1)
+    first = cache.ensure(upstreams[0])
+    second = cache.ensure(upstreams[1])
+    assert not os.path.exists(first)
+    assert os.path.isdir(second)  # The mirror just used is kept even over budget
+    assert cache.stats()["mirrors"] == 1
+
+
+def test_mirror_transfers_report_progress_and_can_be_cancelled(tmp_path):
+    upstream = "file://" + make_remote(str(tmp_path), "tool")
+    cache = MirrorCache(str(tmp_path / "cache"), refresh_interval=0)
+    updates = []
+    mirror = cache.ensure(upstream, stream={"on_progress": updates.append})
+    assert any(update.phase == "Receiving objects" for update in updates)
+
+    git(["config", "remote.origin.uploadpack", "sleep 30; git-upload-pack"], mirror)
+    cancel = threading.Event()
+    cancel.set()
+    start = time.monotonic()
+    with pytest.raises(GitCancelled):
+        cache.ensure(upstream, stream={"cancel": cancel})
+    assert cache.refresh_all(stream={"cancel": cancel}) == 1
+    assert time.monotonic() - start < 10
@@ -0,0 +1,116 @@
+import os
+import subprocess
+
+import pytest
+
+from git_automation.pipeline import (STAGING_TARGETED, changed_paths, commit_and_push, publish_to_branches,
+                                     stage_and_commit)
+from git_automation.status import iter_status
+
+from conftest import git, make_remote, write
+
+
+def remote_head(remote, branch):
+    return git(["rev-parse", "--verify", "--quiet", f"refs/heads/{branch}"], remote)
+
+
+def test_commit_and_push(remote, work):
+    logged = []
+    log = lambda message, status="INFO": logged.append(status)  # noqa: E731
+    assert commit_and_push(work, "main", log=log) == "clean"
+    write(work, "new.txt")
+    assert commit_and_push(work, "main", "Pushed", log=log) == "pushed"
+    assert git(["log", "-1", "--format=%s", "main"], remote) == "Pushed"
+    assert "SUCCESS" in logged and "ERROR" not in logged
+
+
+def test_targeted_staging_commits_exactly_the_changed_paths(work):
+    write(work, ".gitignore", "*.log\n")
+    write(work, "keep.txt")
+    git(["add", "-A"], work)
+    git(["commit", "-q", "-m", "Setup"], work)
+    os.rename(os.path.join(work, "keep.txt"), os.path.join(work, "moved.txt"))
+    os.remove(os.path.join(work, "README.md"))
+    write(work, "dir/new file.txt")
+    write(work, "debug.log")
+    entries = list(iter_status(work))
+    assert sorted(changed_paths(entries)) == ["README.md", "dir/", "keep.txt", "moved.txt"]
+
+    assert stage_and_commit(work, "Targeted", staging=STAGING_TARGETED, entries=entries) is True
+    assert sorted(git(["show", "--name-status", "--no-renames", "--format=", "HEAD"], work).splitlines()) == [
+        "A\tdir/new file.txt", "A\tmoved.txt", "D\tREADME.md", "D\tkeep.txt"
+    ]
+    assert git(["status", "--porcelain"], work) == ""
+    assert stage_and_commit(work, "Nothing", staging=STAGING_TARGETED) is False
+
+
+def test_vanished_path_falls_back_to_staging_everything(work):
+    write(work, "gone.txt")
+    write(work, "stays.txt")
+    entries = list(iter_status(work))
+    os.remove(os.path.join(work, "gone.txt"))
+    assert stage_and_commit(work, "Fallback", staging=STAGING_TARGETED, entries=entries) is True
+    assert git(["show", "--name-only", "--format=", "HEAD"], work) == "stays.txt"
+
+
+def test_publishes_to_several_branches_in_one_push(remote, work):
+    git(["branch", "release"], work)
+    git(["push", "-q", "origin", "release"], work)
+    write(work, "README.md", "changed\n")
+    write(work, "new/file.txt")
+
+    commits = publish_to_branches(work, ["main", "release", "brand-new"], "Publish")
+    for branch in ("main", "release", "brand-new"):
+        assert remote_head(remote, branch) == commits[branch]
+        assert git(["show", f"{branch}:new/file.txt"], remote) == "content"
+        assert git(["show", f"{branch}:README.md"], remote) == "changed"
+    assert git(["status", "--porcelain"], work) == ""  # The checked-out branch's index was re-synced
+
+    assert publish_to_branches(work, ["main", "release"], "Again") == {"main": None, "release": None}
+
+
+def test_publishes_from_a_relative_repository_path(remote, work, monkeypatch):
+    monkeypatch.chdir(os.path.dirname(work))
+    git(["branch", "release"], work)
+    write(work, "new.txt")
+    commits = publish_to_branches("work", ["main", "release", "brand-new"], "Relative")
+    for branch in ("main", "release", "brand-new"):
+        assert remote_head(remote, branch) == commits[branch]
+        assert git(["show", f"{branch}:new.txt"], remote) == "content"
+    assert git(["status", "--porcelain"], work) == ""
+
+
+def test_rejected_branch_aborts_the_whole_atomic_push(tmp_path, remote, work):
+    git(["branch", "release"], work)
+    git(["push", "-q", "origin", "release"], work)
+    other = str(tmp_path / "other")
+    git(["clone", "-q", "-b", "release", remote, other], str(tmp_path))
+    write(other, "other.txt")
+    git(["add", "other.txt"], other)
+    git(["commit", "-q", "-m", "Concurrent"], other)
+    git(["push", "-q", "origin", "release"], other)
+    before = remote_head(remote, "main")
+
+    write(work, "README.md", "changed\n")
+    with pytest.raises(subprocess.CalledProcessError) as excinfo:
+        publish_to_branches(work, ["main", "release"], "Publish")
+    assert "refs/heads/release" in excinfo.value.stderr
+    assert remote_head(remote, "main") == before  # Not applied because release was rejected
+
+
+def test_content_only_submodule_change_is_not_committed(tmp_path, work):
+    library = make_remote(str(tmp_path), "library")
+    git(["submodule", "add", "-q", library, "lib"], work)
+    git(["commit", "-q", "-m", "Add submodule"], work)
+    head = git(["rev-parse", "HEAD"], work)
+
+    write(work, "lib/README.md", "edited inside\n")
+    write(work, "lib/untracked.txt")
+    entries = list(iter_status(work))
+    assert [(entry.path, entry.submodule) for entry in entries] == [("lib", "S.MU")]
+    assert stage_and_commit(work, "Nothing", staging=STAGING_TARGETED) is False
+    assert git(["rev-parse", "HEAD"], work) == head
+
+    git(["commit", "-q", "-am", "Inside"], str(tmp_path / "work" / "lib"))
+    assert stage_and_commit(work, "Move submodule", staging=STAGING_TARGETED) is True
+    assert git(["diff", "--name-only", "HEAD~1", "HEAD"], work) == "lib"
@@ -0,0 +1,71 @@
+import os
+
+import pytest
+
+from git_automation.plumbing import RefUpdateConflict, expand_untracked_dirs, fast_commit
+from git_automation.status import iter_status
+
+from conftest import git, write
+
+
+def committed_files(repo, rev):
+    return sorted(git(["ls-tree", "-r", "--name-only", rev], repo).split("\n"))
+
+
+def test_fast_commit_expands_collapsed_untracked_directories(work):
+    write(work, "newdir/x.txt")
+    write(work, "newdir/deep/y.txt")
+    write(work, "top.txt")
+    entries = list(iter_status(work))
+    assert sorted(entry.path for entry in entries) == ["newdir/", "top.txt"]
+
+    commit = fast_commit(work, "main", "Add files", entries)
+    assert git(["rev-parse", "main"], work) == commit
+    assert committed_files(work, commit) == ["README.md", "newdir/deep/y.txt", "newdir/x.txt", "top.txt"]
+    assert git(["status", "--porcelain"], work) == ""
+
+
+def test_fast_commit_rejects_embedded_repositories(work):
+    git(["init", "-q", "embedded"], work)
+    write(work, "embedded/file.txt")
+    entries = list(iter_status(work))
+    with pytest.raises(ValueError, match="embedded/"):
+        expand_untracked_dirs(work, entries)
+    with pytest.raises(ValueError):
+        fast_commit(work, "main", "Add embedded", entries)
+
+
+def test_fast_commit_to_other_branch_leaves_checkout_alone(work):
+    git(["branch", "topic"], work)
+    write(work, "README.md", "changed\n")
+    commit = fast_commit(work, "topic", "On topic")
+    assert git(["show", "topic:README.md"], work) == "changed"
+    assert git(["rev-parse", "topic~1"], work) == git(["rev-parse", "main"], work)
+    assert git(["status", "--porcelain"], work) == "M README.md"
+    assert fast_commit(work, "topic", "Same again") is None
+    assert git(["rev-parse", "topic"], work) == commit
+
+
+def test_fast_commit_accepts_a_relative_repository_path(work, monkeypatch):
+    monkeypatch.chdir(os.path.dirname(work))
+    write(work, "README.md", "changed\n")
+    commit = fast_commit("work", "main", "Relative")
+    assert git(["rev-parse", "main"], work) == commit
+    assert git(["status", "--porcelain"], work) == ""
+
+
+def test_fast_commit_detects_a_moved_branch(work, monkeypatch):
+    from git_automation import plumbing
+
+    write(work, "README.md", "changed\n")
+    real_rev_parse = plumbing.rev_parse
+
+    def racing_rev_parse(repo_path, rev):
+        result = real_rev_parse(repo_path, rev)
+        if rev == "refs/heads/main^{commit}":
+            git(["commit", "-q", "--allow-empty", "-m", "Concurrent"], work)
+        return result
+
+    monkeypatch.setattr(plumbing, "rev_parse", racing_rev_parse)
+    with pytest.raises(RefUpdateConflict):
+        fast_commit(work, "main", "Lost race")
@@ -0,0 +1,46 @@
+import os
+
+from git_automation.refs import clear_cache, common_dir, find_git_dir, list_branches, read_head
+
+from conftest import git
+
+
+def test_lists_packed_and_loose_branches(work):
+    git(["branch", "packed/one"], work)
+    git(["branch", "packed/two"], work)
+    git(["pack-refs", "--all"], work)
+    git(["branch", "loose"], work)
+    git(["branch", "packed/two", "-f", "HEAD"], work)  # Now both packed and loose
+    assert list_branches(work) == ["loose", "main", "packed/one", "packed/two"]
+    assert sorted(list_branches(work)) == sorted(git(["for-each-ref", "--format=%(refname:strip=2)",
+                                                      "refs/heads"], work).split("\n"))
+
+
+def test_cache_sees_new_and_deleted_branches(work):
+    assert list_branches(work) == ["main"]
+    git(["branch", "feature/new"], work)  # Creates a new refs/heads subdirectory
+    assert list_branches(work) == ["feature/new", "main"]
+    git(["pack-refs", "--all"], work)
+    git(["branch", "-D", "feature/new"], work)  # Rewrites packed-refs
+    assert list_branches(work) == ["main"]
+    clear_cache(work)
+    assert list_branches(work) == ["main"]
+
+
+def test_read_head_on_branch_and_detached(work):
+    assert read_head(work) == ("main", None)
+    sha = git(["rev-parse", "HEAD"], work)
+    git(["checkout", "-q", "--detach"], work)
+    assert read_head(work) == (None, sha)
+
+
+def test_linked_worktree_shares_branches_but_has_its_own_head(tmp_path, work):
+    worktree = str(tmp_path / "wt")
+    git(["worktree", "add", "-q", "-b", "topic", worktree], work)
+    git_dir = find_git_dir(worktree)
+    assert os.path.isfile(os.path.join(worktree, ".git"))
+    assert os.path.samefile(common_dir(git_dir), os.path.join(work, ".git"))
+    assert read_head(worktree) == ("topic", None)
+    assert read_head(work) == ("main", None)
+    git(["branch", "from-main"], work)
+    assert list_branches(worktree) == ["from-main", "main", "topic"]
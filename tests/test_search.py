@@ -0,0 +1,81 @@
+from git_automation import search
+from git_automation.search import SearchIndex, load_recent, save_recent
+
+REPOS = [
+    "/src/tools/git-automation",
+    "/src/web/frontend",
+    "/src/web/frontend-legacy",
+    "/src/apps/automation",
+    "/src/infra/terraform",
+    "/src/tools/autom",
+]
+
+
+def test_ranks_exact_then_prefix_then_word_then_substring_then_fuzzy():
+    index = SearchIndex(REPOS + ["/src/x/pre-automation", "/src/x/homeautomation"])
+    assert index.search("automation") == [
+        "/src/apps/automation",  # Basename equals the query
+        "/src/x/pre-automation",  # Query starts a word
+        "/src/tools/git-automation",
+        "/src/x/homeautomation",  # Anywhere
+    ]
+    assert index.search("autom")[:2] == ["/src/tools/autom", "/src/apps/automation"]
+    assert index.search("frntnd") == ["/src/web/frontend", "/src/web/frontend-legacy"]
+
+
+def test_empty_query_lists_recent_items_first():
+    index = SearchIndex(REPOS)
+    recent = ["/src/infra/terraform", "/not/indexed"]
+    assert index.search("", limit=3, recent=recent) == ["/src/infra/terraform", REPOS[0], REPOS[1]]
+    assert index.search("front", recent=["/src/web/frontend-legacy"])[0] == "/src/web/frontend-legacy"
+
+
+def test_short_queries_and_limit():
+    index = SearchIndex(REPOS)
+    assert index.search("er")[0] == "/src/infra/terraform"  # Fuzzy matches such as w-e-b/f-r-ontend follow
+    assert set(index.search("au", limit=2)) <= set(REPOS)
+    assert len(index.search("src", limit=2)) == 2
+
+
+def test_incremental_add_remove_and_sync():
+    index = SearchIndex(REPOS[:2])
+    assert index.add(REPOS) == 4
+    assert index.add(REPOS) == 0
+    assert len(index) == len(REPOS)
+    assert index.search("terraform") == ["/src/infra/terraform"]
+    assert index.remove(["/src/infra/terraform"]) == 1
+    assert index.search("terraform") == []
+    assert "/src/infra/terraform" not in index
+    index.sync(["/src/infra/terraform", "/src/web/frontend"])
+    assert index.items() == ["/src/web/frontend", "/src/infra/terraform"]
+    assert index.search("front") == ["/src/web/frontend"]
+    assert index.longest == max(len(repo) for repo in REPOS)
+
+
+def test_narrowing_query_after_changes_is_not_stale():
+    index = SearchIndex(REPOS)
+    assert index.search("fro")[:2] == ["/src/web/frontend", "/src/web/frontend-legacy"]
+    index.add(["/src/new/frozen"])
+    assert index.search("froz") == ["/src/new/frozen"]
+
+
+def test_key_and_newlines_in_items():
+    index = SearchIndex(["/base/one/repo", "/base/two/repo\nname"], key=lambda item: item[len("/base/"):])
+    assert index.search("base") == []
+    assert index.search("two") == ["/base/two/repo\nname"]
+    assert index.search("one/repo") == ["/base/one/repo"]
+
+
+def test_many_candidates_are_capped(monkeypatch):
+    monkeypatch.setattr(search, "MAX_CANDIDATES", 50)
+    index = SearchIndex([f"/repos/project{i:04d}" for i in range(500)])
+    assert index.search("project", limit=5) == [f"/repos/project{i:04d}" for i in range(5)]
+
+
+def test_recent_list_round_trip(tmp_path):
+    path = str(tmp_path / "state" / "recent.json")
+    assert load_recent(path) == []
+    save_recent(["/a", "/b"], path)
+    save_recent(["main"], path, name="branches")
+    assert load_recent(path) == ["/a", "/b"]
+    assert load_recent(path, name="branches") == ["main"]
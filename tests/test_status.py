@@ -0,0 +1,98 @@
+import os
+
+from git_automation.status import (entry_category, format_entry, is_content_only_submodule, iter_status,
+                                   parse_records, refresh_paths)
+
+from conftest import git, write
+
+
+def parse(records):
+    return list(parse_records(iter(records.split(b"\0"))))
+
+
+def fields(entries):
+    return [(entry.xy, entry.path, entry.orig_path) for entry in entries]
+
+
+def test_parses_ordinary_rename_and_untracked_records():
+    records = (
+        b"1 .M N... 100644 100644 100644 aaaa bbbb a.txt\0"
+        b"2 R. N... 100644 100644 100644 aaaa aaaa R100 new name.txt\0old name.txt\0"
+        b"? dir/\0"
+        b"! build/\0"
+    )
+    assert fields(parse(records)) == [
+        (" M", "a.txt", None),
+        ("R ", "new name.txt", "old name.txt"),
+        ("??", "dir/", None),
+        ("!!", "build/", None),
+    ]
+
+
+def test_parses_unmerged_records():
+    records = b"u UU N... 100644 100644 100644 100644 aaaa bbbb cccc conflict file.txt\0"
+    assert fields(parse(records)) == [("UU", "conflict file.txt", None)]
+
+
+def test_real_status_with_rename_and_newline_in_path(work):
+    git(["mv", "README.md", "RENAMED.md"], work)
+    write(work, "line\nbreak.txt")
+    write(work, "with space.txt")
+    entries = sorted(iter_status(work), key=lambda entry: entry.path)
+    assert fields(entries) == [
+        ("R ", "RENAMED.md", "README.md"),
+        ("??", "line\nbreak.txt", None),
+        ("??", "with space.txt", None),
+    ]
+    assert [format_entry(entry) for entry in entries[:1]] == ["R  README.md -> RENAMED.md"]
+
+
+def test_refresh_paths_requeries_only_changed_paths(work):
+    write(work, "a.txt")
+    write(work, "b.txt")
+    entries = {entry.path: entry for entry in iter_status(work)}
+    write(work, "README.md", "changed\n")
+    write(work, "c.txt")
+    os.remove(os.path.join(work, "a.txt"))
+    updated = refresh_paths(work, entries, ["README.md", "a.txt", "c.txt"])
+    assert sorted(fields(updated.values())) == [(" M", "README.md", None), ("??", "b.txt", None),
+                                               ("??", "c.txt", None)]
+
+
+def test_entry_categories():
+    entries = parse(
+        b"1 .M N... 100644 100644 100644 aaaa bbbb modified\0"
+        b"1 A. N... 000000 100644 100644 0000 bbbb added\0"
+        b"1 .D N... 100644 100644 000000 aaaa aaaa deleted\0"
+        b"2 R. N... 100644 100644 100644 aaaa aaaa R100 renamed\0old\0"
+        b"u UU N... 100644 100644 100644 100644 aaaa bbbb cccc conflicted\0"
+        b"? untracked\0"
+        b"! ignored\0"
+    )
+    assert [entry_category(entry) for entry in entries] == [entry.path for entry in entries]
+
+
+def test_collapsed_and_expanded_untracked_directories(work):
+    write(work, "newdir/a.txt")
+    write(work, "newdir/deep/b.txt")
+    assert [entry.path for entry in iter_status(work)] == ["newdir/"]
+    expanded = sorted(entry.path for entry in iter_status(work, untracked_files="all"))
+    assert expanded == ["newdir/a.txt", "newdir/deep/b.txt"]
+
+
+def test_branch_headers():
+    headers = {}
+    records = b"# branch.oid abcd\0# branch.head main\0# branch.ab +1 -2\0? x\0"
+    assert fields(parse_records(iter(records.split(b"\0")), headers)) == [("??", "x", None)]
+    assert headers == {"branch.oid": "abcd", "branch.head": "main", "branch.ab": "+1 -2"}
+
+
+def test_keeps_submodule_state():
+    entries = parse(
+        b"1 .M S.M. 160000 160000 160000 aaaa aaaa sub-edited\0"
+        b"1 .M SC.. 160000 160000 160000 aaaa aaaa sub-moved\0"
+        b"1 M. SC.. 160000 160000 160000 aaaa bbbb sub-staged\0"
+        b"1 .M N... 100644 100644 100644 aaaa bbbb file\0"
+    )
+    assert [entry.submodule for entry in entries] == ["S.M.", "SC..", "SC..", None]
+    assert [is_content_only_submodule(entry) for entry in entries] == [True, False, False, False]
@@ -0,0 +1,47 @@
+import pytest
+
+tk = pytest.importorskip("tkinter")
+
+
+@pytest.fixture
+def root():
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        pytest.skip("no display available")
+    root.withdraw()
+    yield root
+    root.destroy()
+
+
+def shown(virtual_list):
+    return virtual_list._text.get("1.0", "end-1c").split("\n")
+
+
+def test_renders_only_the_visible_rows(root):
+    from git_automation.virtual_list import VirtualList
+    virtual_list = VirtualList(root, height=5, formatter=lambda item: f"item {item}")
+    virtual_list.set_items(range(100000))
+    assert shown(virtual_list) == [f"item {i}" for i in range(5)]
+    virtual_list.scroll(10)
+    assert shown(virtual_list) == [f"item {i}" for i in range(10, 15)]
+    virtual_list.scroll(10 ** 6)
+    assert shown(virtual_list) == [f"item {i}" for i in range(99995, 100000)]
+    virtual_list.scroll(-(10 ** 6))
+    assert shown(virtual_list)[0] == "item 0"
+
+
+def test_filter_sort_and_counts(root):
+    from git_automation.virtual_list import VirtualList
+    virtual_list = VirtualList(root, height=3, empty_text="Nothing here")
+    assert shown(virtual_list) == [""]
+    virtual_list.set_items([])
+    assert shown(virtual_list) == ["Nothing here"]
+    virtual_list.set_items(range(10))
+    virtual_list.set_filter(lambda item: item % 2)
+    virtual_list.set_sort(lambda item: item, reverse=True)
+    assert virtual_list.counts() == (5, 10)
+    assert shown(virtual_list) == ["9", "7", "5"]
+    virtual_list.set_filter(lambda item: item > 100)
+    assert virtual_list.counts() == (0, 10)
+    assert shown(virtual_list) == [""]
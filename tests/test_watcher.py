@@ -0,0 +1,76 @@
+import os
+import queue
+
+import pytest
+
+from git_automation.watcher import RepoWatcher
+
+from conftest import git, write
+
+
+@pytest.fixture(params=[False, True], ids=["native", "polling"])
+def watch(request, work):
+    """Starts a RepoWatcher on the work fixture and returns a queue of its batches."""
+    batches = queue.Queue()
+    watcher = RepoWatcher(work, batches.put, debounce=0.2, max_latency=5.0, poll_interval=0.1,
+                          force_polling=request.param)
+    watcher.start()
+    yield batches
+    watcher.stop()
+    watcher.stop()
+
+
+def test_changed_paths_are_reported(work, watch):
+    write(work, "a.txt")
+    write(work, "dir/b.txt")
+    write(work, "README.md", "changed\n")
+    paths = set()
+    while not {"a.txt", "dir", "README.md"} <= paths:  # New directories are reported themselves
+        batch = watch.get(timeout=10)
+        assert batch is not None
+        paths |= batch
+
+
+def test_index_changes_ask_for_a_full_refresh(work, watch):
+    write(work, "a.txt")
+    while True:
+        batch = watch.get(timeout=10)
+        if batch is not None and "a.txt" in batch:
+            break
+    git(["add", "a.txt"], work)
+    assert watch.get(timeout=10) is None
+
+
+@pytest.mark.parametrize("force_polling", [False, True], ids=["native", "polling"])
+def test_failing_handler_is_logged_and_watching_continues(work, force_polling):
+    batches = queue.Queue()
+    logged = []
+
+    def on_change(paths):
+        batches.put(paths)
+        if paths is not None and "a.txt" in paths:
+            raise RuntimeError("handler broke")
+
+    watcher = RepoWatcher(work, on_change, debounce=0.2, max_latency=5.0, poll_interval=0.1,
+                          force_polling=force_polling, log=lambda message, status="INFO": logged.append(status))
+    watcher.start()
+    try:
+        write(work, "a.txt")
+        while "a.txt" not in (batches.get(timeout=10) or ()):
+            pass
+        write(work, "b.txt")
+        while "b.txt" not in (batches.get(timeout=10) or ()):
+            pass
+    finally:
+        watcher.stop()
+    assert "ERROR" in logged
+
+
+def test_stop_releases_descriptors_with_or_without_start(work):
+    before = len(os.listdir("/proc/self/fd"))
+    RepoWatcher(work, lambda paths: None).stop()
+    watcher = RepoWatcher(work, lambda paths: None)
+    watcher.start()
+    watcher.stop()
+    watcher.stop()
+    assert len(os.listdir("/proc/self/fd")) == before